@@ -15,7 +15,9 @@
 
 import os
 import io
+import hashlib
 import yaml
+from collections import OrderedDict
 from contextlib import contextmanager
 import urllib.error
 import json
@@ -51,6 +53,65 @@ class YamlNodeStack(object):
             return "unknown"
 
 
+class ComposedYamlCache(object):
+    """ composed yaml documents keyed by the checksum of their text, so text that was already parsed
+        is not parsed again. Disabled by default, enabled by the warm server (instl serve) where each
+        command runs in a forked process that inherits the documents composed by the server.
+        Texts that were not found in the cache are recorded in self.misses as (path, checksum)
+        so the server can add them to it's own cache.
+        Also enabled when the defaults bundle is loaded, in that case keep_misses is False so texts that are not
+        in the bundle, such as big index files, are not kept in memory.
+    """
+    def __init__(self, max_texts=64) -> None:
+        self.enabled = False
+        self.keep_misses = True
+        self.max_texts = max_texts
+        self.nodes_by_checksum = OrderedDict()
+        self.misses: List[Tuple[str, str]] = list()
+
+    @staticmethod
+    def checksum(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def __contains__(self, checksum):
+        return checksum in self.nodes_by_checksum
+
+    def compose_all(self, the_stream):
+        """ return a list of the documents in the_stream (io.StringIO), from the cache if possible """
+        checksum = self.checksum(the_stream.getvalue())
+        retVal = self.nodes_by_checksum.get(checksum)
+        if retVal is None:
+            retVal = list(yaml.compose_all(the_stream))
+            if self.keep_misses:
+                self.add(checksum, retVal)
+            self.misses.append((os.fspath(getattr(the_stream, 'name', "")), checksum))
+        else:
+            self.nodes_by_checksum.move_to_end(checksum)
+        return retVal
+
+    def add(self, checksum, nodes):
+        self.nodes_by_checksum[checksum] = nodes
+        while len(self.nodes_by_checksum) > self.max_texts:
+            self.nodes_by_checksum.popitem(last=False)
+
+    def add_file(self, file_path):
+        """ compose a local yaml file and add it to the cache, return the checksum of it's text """
+        buffer, actual_file_path = utils.read_file_or_url_utf8(file_path, None)
+        checksum = self.checksum(buffer)
+        if checksum not in self.nodes_by_checksum:
+            the_stream = io.StringIO(buffer)
+            the_stream.name = actual_file_path
+            self.add(checksum, list(yaml.compose_all(the_stream)))
+        return checksum
+
+    def clear(self):
+        self.nodes_by_checksum.clear()
+        self.misses.clear()
+
+
+composed_yaml_cache = ComposedYamlCache()
+
+
 class YamlReader(object):
     def __init__(self, config_vars) -> None:
         self.config_vars = config_vars
@@ -96,7 +157,7 @@ class YamlReader(object):
             with self.allow_reading_of_internal_vars(allow=allow_reading_of_internal_vars):
                 self.file_read_stack.append(os.fspath(file_path))
                 # utils.add_to_actions_stack(f"""reading yaml file: {file_path}'""")
-                buffer, actual_file_path = utils.read_file_or_url_utf8(file_path, config_vars=self.config_vars, path_searcher=self.path_searcher, connection_obj=kwargs.get('connection_obj', None))
+                buffer, actual_file_path = utils.read_file_or_url_utf8(file_path, config_vars=self.config_vars, path_searcher=self.path_searcher, connection_obj=kwargs.get('connection_obj', None), cache_folder=kwargs.get('cache_folder', None))
                 self.config_vars["READ_YAML_FILES"].append(os.fspath(actual_file_path))
                 prog_message = f"reading {os.fspath(file_path)}"
                 if os.fspath(file_path) != os.fspath(kwargs['original-path-to-file']):
@@ -148,7 +209,11 @@ class YamlReader(object):
         pass
 
     def read_yaml_from_stream(self, the_stream, *args, **kwargs):
-        for a_node in yaml.compose_all(the_stream):
+        if composed_yaml_cache.enabled and hasattr(the_stream, 'getvalue'):
+            nodes = composed_yaml_cache.compose_all(the_stream)
+        else:
+            nodes = yaml.compose_all(the_stream)
+        for a_node in nodes:
             with kwargs['node-stack'](a_node):
                 try:
                     self.read_yaml_from_node(a_node, *args, **kwargs)
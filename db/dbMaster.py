@@ -51,6 +51,9 @@ class Statistic():
 
 
 class DBMaster(object):
+    # ddl folder -> path to a db file created from the ddl files in that folder, see pyinstl/defaultsBundle.py
+    schema_templates = dict()
+
     def __init__(self, db_url: str, ddl_folder: Path) -> None:
         self.top_user_version = 1  # user_version is a standard pragma tha defaults to 0
         if db_url == ":memory:":
@@ -92,6 +95,8 @@ class DBMaster(object):
                 create_new_db = True
             db_path_for_sqlite = ":memory:" if self.memory_db else os.fspath(self.db_file_path)
             self.__conn = sqlite3.connect(db_path_for_sqlite)
+            if self.memory_db and os.fspath(self.ddl_files_dir) in DBMaster.schema_templates:
+                create_new_db = not self.copy_from_schema_template(DBMaster.schema_templates[os.fspath(self.ddl_files_dir)])
 
             self.__curs = self.__conn.cursor()
             self.configure_db()
@@ -104,6 +109,34 @@ class DBMaster(object):
                 pass
                 #self.progress(f"reused existing db file {db_base_self.db_file_path}")
 
+    @classmethod
+    def set_schema_template(cls, ddl_folder, template_db_path):
+        """ new memory dbs for ddl_folder will be copied from template_db_path instead of running the ddl files """
+        cls.schema_templates[os.fspath(ddl_folder)] = os.fspath(template_db_path)
+
+    def copy_from_schema_template(self, template_db_path):
+        """ copy the template db to this db, return False if the template could not be copied """
+        retVal = False
+        try:
+            template_conn = sqlite3.connect(Path(template_db_path).resolve().as_uri() + "?mode=ro", uri=True)
+            try:
+                template_conn.backup(self.__conn)
+                retVal = True
+            finally:
+                template_conn.close()
+        except sqlite3.Error as ex:
+            log.debug(f"db schema template {template_db_path} was not copied, {ex}")
+        return retVal
+
+    def backup_to_file(self, db_file_path):
+        """ write the db to db_file_path, replacing an existing file """
+        utils.safe_remove_file(db_file_path)
+        file_conn = sqlite3.connect(os.fspath(db_file_path))
+        try:
+            self.__conn.backup(file_conn)
+        finally:
+            file_conn.close()
+
     def set_db_file_owner(self):
         # utils.add_to_actions_stack(f"""chmod db path {self.db_file_path} '""")
         if not self.memory_db and self.db_file_path.is_file():
@@ -476,9 +509,7 @@ class DBManager(object):
 
     @classmethod
     def reset_db(cls):
-        if cls.db:
-            cls.db.close_and_delete()
-        cls.db = DBAccess()
-        cls.info_map_table = TableAccess(SVNTable)
-        cls.items_table = TableAccess(IndexItemsTable)
+        """ close the db and forget the tables, next access will create them again """
+        for access_name in ("items_table", "info_map_table", "db"):
+            DBManager.__dict__[access_name].__delete__(None)
         cls.refresh_db_file = False
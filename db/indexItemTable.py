@@ -58,7 +58,11 @@ class IndexItemsTable(object):
         self.drop_views()
         with self.db.transaction() as curs:
             curs.execute("""DELETE FROM index_item_detail_t""")
+            curs.execute("""DELETE FROM install_source_leaf_t""")
             curs.execute("""DELETE FROM index_item_t""")
+        # triggers are dropped only for the deletes, items read after clearing need them
+        self.add_triggers()
+        self.add_views()
 
     def add_triggers(self) -> None:
         self.db.exec_script_file("create-triggers.ddl")
@@ -902,23 +906,26 @@ class IndexItemsTable(object):
             retVal[iid] = self.repr_item_for_yaml(iid, resolve)
         return retVal
 
-    def versions_report(self, report_only_installed=False, progress_callback=None):
+    versions_report_field_names = ("IID", "guid", "name", "installed version", "latest version", "uninstall guid", "size mac", "size win")
+
+    def iter_versions_report(self, report_only_installed=False, progress_callback=None):
+        """ yield the field names and then one tuple for each item, straight from report_versions_view """
         query_text = """
-            SELECT *
-            FROM 'report_versions_view'
+            SELECT owner_iid, guid, name, require_version, remote_version, secondary_guid, size_mac, size_win
+            FROM report_versions_view
             """
         if report_only_installed:
             query_text += """
             WHERE require_version != '_'
             AND remote_version != '_'
             """
-        results = self.db.select_and_fetchall(query_text, query_params={}, progress_callback=progress_callback)
-        field_names = ("IID", "guid", "name", "installed version", "latest version", "uninstall guid", "size mac", "size win")
-        retVal = [field_names]  # first entry is the field names
-        num_fields_to_take = min(len(results[0]), len(field_names))
-        retVal.extend([mm[:num_fields_to_take] for mm in results])
-        return retVal
+        yield self.versions_report_field_names
+        with self.db.selection(description="versions_report", progress_callback=progress_callback) as curs:
+            for row in curs.execute(query_text):
+                yield tuple(row)
 
+    def versions_report(self, report_only_installed=False, progress_callback=None):
+        retVal = list(self.iter_versions_report(report_only_installed, progress_callback))  # first entry is the field names
         return retVal
 
     def iids_from_guids(self, guid_list):
@@ -1562,6 +1569,25 @@ class IndexItemsTable(object):
         retVal = self.db.select_and_fetchall(query_text)
         return retVal
 
+    def get_data_for_resolved_short_index(self, detail_names):
+        """ get resolved details of all iids for all oses, each iid's own details before inherited details
+            returns iid, os_name, detail_name, detail_value, tag
+        """
+        query_text = f"""
+            SELECT index_item_detail_t.owner_iid,
+                   active_operating_systems_t.name,
+                   index_item_detail_t.detail_name,
+                   index_item_detail_t.detail_value,
+                   index_item_detail_t.tag
+            FROM index_item_detail_t
+            JOIN active_operating_systems_t
+                ON active_operating_systems_t._id=index_item_detail_t.os_id
+            WHERE index_item_detail_t.detail_name IN {utils.quoteme_single_list_for_sql(detail_names)}
+            ORDER BY index_item_detail_t.owner_iid, index_item_detail_t.generation, index_item_detail_t._id
+            """
+        retVal = self.db.select_and_fetchall(query_text)
+        return retVal
+
     def get_all_actions_from_index(self):
         action_string = "','".join(self.action_types)
         action_string = "'" + action_string + "'"
@@ -72,6 +72,12 @@ __GITHUB_BRANCH__: {}
 """.format(str(datetime.datetime.now()), socket.gethostname(), platform.node(), PyInstallerVersion, git_branch))
 a.datas += [("defaults/compile-info.yaml", compile_info_path, "DATA")]
 
+# defaults yaml files already parsed and db schema already created, loaded on start instead of reading them
+defaults_bundle_path = os.path.join("build", "defaults.bundle")
+check_output([sys.executable, "instl", "defaults-bundle", "--out", defaults_bundle_path, "--no-system-log"])
+a.datas += [("defaults/defaults.bundle", defaults_bundle_path, "DATA"),
+            ("defaults/defaults.bundle.db", defaults_bundle_path + ".db", "DATA")]
+
 
 instl_help_path = os.path.join("help")
 for help_file in os.listdir(instl_help_path):
@@ -6,12 +6,12 @@ from .conditionalBatchCommands import If, IsFile, IsDir, IsSymlink, IsEq, IsNotE
     IsEnvironVarEq, IsEnvironVarNotEq, IsConfigVarDefined, ForInConfigVar
 from .copyBatchCommands import CopyDirContentsToDir, CopyDirToDir, CopyFileToDir, CopyFileToFile, MoveDirToDir, \
     RenameFile, CopyBundle, CopyGlobToDir, MoveFileToDir
-from .downloadBatchCommands import DownloadFileAndCheckChecksum, DownloadManager
+from .downloadBatchCommands import DownloadFileAndCheckChecksum, DownloadManager, DownloadQueueRun
 from .fileSystemBatchCommands import AppendFileToFile, Cd, ChFlags, Chmod, Chown, MakeDir, MakeRandomDirs, \
     MakeRandomDataFile, touch, Touch, Unlock, Ls, FileSizes, SplitFile, FixAllPermissions, Glober
 from .info_mapBatchCommands import CheckDownloadFolderChecksum, SetExecPermissionsInSyncFolder, CreateSyncFolders, \
     InfoMapFullWriter, InfoMapSplitWriter, SetBaseRevision, IndexYamlReader, CopySpecificRepoRev, CreateRepoRevFile, \
-    ShortIndexYamlCreator
+    ShortIndexYamlCreator, UploadRepoRevToS3
 from .removeBatchCommands import RmDir, RmFile, RmFileOrDir, RemoveEmptyFolders, RmGlob, RmGlobs, RmDirContents
 from .reportingBatchCommands import AnonymousAccum, Echo, Progress, Remark, Stage, ConfigVarAssign, ConfigVarPrint, \
     PythonVarAssign, PythonBatchRuntime, RaiseException, PythonDoSomething, ResolveConfigVarsInFile, \
@@ -20,8 +20,8 @@ from .reportingBatchCommands import AnonymousAccum, Echo, Progress, Remark, Stag
 from .subprocessBatchCommands import ParallelRun, ShellCommands, ShellCommand, CUrl, ScriptCommand, Exec, RunInThread, \
     Subprocess, ExternalPythonExec, SysExit, Raise, KillProcess, CurlWithInternalParallel
 from .svnBatchCommands import SVNClient, SVNLastRepoRev, SVNCheckout, SVNInfo, SVNPropList, SVNAdd, SVNRemove, \
-    SVNInfoReader, SVNSetProp, SVNDelProp, SVNCleanup
-from .wtarBatchCommands import Wtar, Unwtar, Wzip, Unwzip, ZipFlat, UnZip
+    SVNInfoReader, SVNInfoXMLReader, SVNSetProp, SVNDelProp, SVNCleanup
+from .wtarBatchCommands import Wtar, ParallelWtar, Unwtar, Wzip, Unwzip, ZipFlat, UnZip
 
 # from .fileSystemBatchCommands import AdvisoryFileLock
 
@@ -102,6 +102,17 @@ class PythonBatchCommandBase(abc.ABC):
         if kwargs_defaults:
             cls.kwargs_defaults.update(kwargs_defaults)
 
+    @classmethod
+    def reset_class_state(cls):
+        """ return the class members that change during runtime to their initial values,
+            used when a forked process should start as if it was a new process (instl serve)
+        """
+        PythonBatchCommandBase.stage_stack.clear()
+        PythonBatchCommandBase.instance_counter = 0
+        PythonBatchCommandBase.total_progress = 0
+        PythonBatchCommandBase.running_progress = 0
+        PythonBatchCommandBase.runtime_duration_by_progress.clear()
+
     @classmethod
     def get_derived_class_names(cls):
         """ get list of names of classes deriving from this class """
@@ -180,6 +191,11 @@ class PythonBatchCommandBase(abc.ABC):
     def stage_str(self) -> str:
         return ""
 
+    @staticmethod
+    def stage_path_str() -> str:
+        """ return the names of all stages in PythonBatchCommandBase.stage_stack joined with '.' """
+        return ".".join(filter(None, (stage.stage_str() for stage in PythonBatchCommandBase.stage_stack)))
+
     def major_stage_str(self) -> str:
         """ return the top most stage name in PythonBatchCommandBase.stage_stack that is not None or empty
             if PythonBatchCommandBase.stage_stack is empty return the class name
@@ -318,7 +334,7 @@ class PythonBatchCommandBase(abc.ABC):
             'python_version': ".".join((str(v) for v in sys.version_info)),
             'doing': self.doing,
             'major_stage': self.major_stage_str(),
-            'stage': ".".join(filter(None, (stage.stage_str() for stage in PythonBatchCommandBase.stage_stack))),
+            'stage': self.stage_path_str(),
             'instl_class': repr(self),
             'obj__dict__': self.representative_dict(),
             'local_time': time.strftime("%Y-%m-%d_%H.%M.%S"),
@@ -450,6 +466,10 @@ class PythonBatchCommandBase(abc.ABC):
             if prog_msg is None:
                 prog_msg = self.progress_msg_self()
             log.info(f"{prog_counter_msg} {prog_msg}")
+            if utils.progress_events.listening and utils.progress_events.due("progress"):
+                utils.progress_events.emit("progress", progress=PythonBatchCommandBase.running_progress,
+                                           total=PythonBatchCommandBase.total_progress, stage=self.stage_path_str(),
+                                           command=self.__class__.__name__, doing=prog_msg)
 
     def exit_timing_measure(self):
         self.exit_time = time.perf_counter()
@@ -102,6 +102,7 @@ class PythonBatchCommandAccum(PythonBatchCommandBase):
         opening_code_lines.append(f"""if __name__ == '__main__':""")
         opening_code_lines.append(f"""    from utils import log_utils""")
         opening_code_lines.append(f"""    log_utils.config_logger()""")
+        opening_code_lines.append(f"""    utils.progress_events.open_from_environment()""")
 
         the_oc = "\n".join(opening_code_lines)
         the_oc += "\n\n"
@@ -12,12 +12,9 @@ log = logging.getLogger(__name__)
 info_xml_version_re = re.compile(r'<Version>(?P<version>\d+\.\d+\.\d+(\.\d+)?)</Version>')
 info_plist_version_re = re.compile(r'<key>CFBundleShortVersionString</key>\s+<string>(?P<version>\d+\.\d+\.\d+(\.\d+)?)</string>', re.DOTALL)
 
-def _fast_copy_file(src, dst):
-    # since python3.8 shutil.copyfile uses the fastest file copy available each specific operating system
-    try:
-        shutil.copyfile(src, dst, follow_symlinks=False)
-    except shutil.SameFileError:
-        pass
+def _fast_copy_file(src, dst, try_clone=True):
+    # try copy-on-write clone and copy_file_range before shutil.copyfile, return the method used
+    return utils.clone_or_copy_file(src, dst, try_clone=try_clone)
 
 
 class RsyncClone(PythonBatchCommandBase):
@@ -89,6 +86,7 @@ no_flags_patterns: if a file matching one of these patterns exists in the destin
         self.local_no_flags_patterns = sorted(no_flags_patterns.copy())
         self.hard_links = hard_links
         self.hard_links_failed = False  # remember if hard linking failed once so save time not to try again
+        self.clone_failed_devices = set()  # (src device, dst device) pairs where copy-on-write cloning failed, so save time not to try again
         self.ignore_dangling_symlinks = ignore_dangling_symlinks
         self.delete_extraneous_files = delete_extraneous_files
         self.copy_owner = copy_owner
@@ -114,6 +112,10 @@ no_flags_patterns: if a file matching one of these patterns exists in the destin
         self.__all_ignore_patterns = sorted(list(set(self.__global_ignore_patterns + self.local_ignore_patterns)))
         self.__all_no_hard_link_patterns = sorted(list(set(self.__global_no_hard_link_patterns + self.local_no_hard_link_patterns)))
         self.__all_no_flags_patterns = sorted(list(set(self.__global_no_flags_patterns + self.local_no_flags_patterns)))
+        # patterns are compiled once, instead of calling Path.match for each pattern and each file
+        self.__ignore_matcher = utils.PathPatternMatcher(self.__all_ignore_patterns)
+        self.__no_hard_link_matcher = utils.PathPatternMatcher(self.__all_no_hard_link_patterns)
+        self.__no_flags_matcher = utils.PathPatternMatcher(self.__all_no_flags_patterns)
 
     def repr_own_args(self, all_args: List[str]) -> None:
         params = list()
@@ -160,36 +162,26 @@ no_flags_patterns: if a file matching one of these patterns exists in the destin
         self.copy_tree(self.src, self.dst)
 
     def should_ignore_file(self, file_path: str):
-        retVal = False
-        if not isinstance(file_path, Path):
-            file_path = Path(file_path)
-        for ignore_pattern in self.__all_ignore_patterns:
-            if file_path.match(ignore_pattern):
-                log.debug(f"ignoring {file_path} because it matches pattern {ignore_pattern}")
-                retVal = True
-                break
+        retVal = self.__ignore_matcher.match(file_path)
+        if retVal and log.isEnabledFor(logging.DEBUG):
+            log.debug(f"ignoring {file_path} because it matches pattern {self.__ignore_matcher.matching_pattern(file_path)}")
         return retVal
 
     def should_hard_link_file(self, file_path: Path):
         assert isinstance(file_path, Path)
         retVal = False
         if self.hard_links and not self.hard_links_failed and not file_path.is_symlink():
-            for no_hard_link_pattern in self.__all_no_hard_link_patterns:
-                if file_path.match(no_hard_link_pattern):
-                    log.debug(f"not hard linking {file_path} because it matches pattern {no_hard_link_pattern}")
-                    break
+            if self.__no_hard_link_matcher.match(file_path):
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(f"not hard linking {file_path} because it matches pattern {self.__no_hard_link_matcher.matching_pattern(file_path)}")
             else:
                 retVal = True
         return retVal
 
     def should_no_flags_file(self, file_path: Path):
-        retVal = True
-        for no_flags_pattern in self.__all_no_flags_patterns:
-            if file_path.match(no_flags_pattern):
-                log.debug(f"removing flags from {file_path} because it matches pattern {no_flags_pattern}")
-                break
-        else:
-            retVal = False
+        retVal = self.__no_flags_matcher.match(file_path)
+        if retVal and log.isEnabledFor(logging.DEBUG):
+            log.debug(f"removing flags from {file_path} because it matches pattern {self.__no_flags_matcher.matching_pattern(file_path)}")
         return retVal
 
     def remove_extraneous_files(self, dst: Path, src_item_names):
@@ -272,6 +264,20 @@ no_flags_patterns: if a file matching one of these patterns exists in the destin
                 retVal = True
         return retVal
 
+    def copy_file_contents(self, src: Path, dst: Path):
+        """ copy src to dst with the fastest method available and record the method
+            in self.statistics as copy_clone, copy_copy_file_range, copy_copyfile or copy_same_file
+        """
+        devices = None  # symlinks are not cloned
+        if not src.is_symlink():
+            devices = (os.stat(src).st_dev, os.stat(dst.parent).st_dev)
+        copy_method = _fast_copy_file(src, dst, try_clone=devices not in self.clone_failed_devices)
+        if copy_method in ("copy_file_range", "copyfile") and devices is not None:
+            self.clone_failed_devices.add(devices)
+        log.debug(f"copied file '{src}' to '{dst}' using {copy_method}")
+        self.statistics[f'copy_{copy_method}'] += 1
+        return copy_method
+
     def copy_file_to_file(self, src: Path, dst: Path, follow_symlinks=True):
         """ copy the file src to the file dst. dst should either be an existing file
             or not exists at all - i.e. dst cannot be a folder. The parent folder of dst
@@ -285,7 +291,7 @@ no_flags_patterns: if a file matching one of these patterns exists in the destin
                 if not self.should_hard_link_file(src):
                     log.debug(f"copy file '{self.last_src}' to '{self.last_dst}'")
                     if not self.dry_run:
-                        _fast_copy_file(src, dst)
+                        self.copy_file_contents(src, dst)
                         if self.copy_stat:
                             shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
                 else:  # try to create hard link
@@ -298,7 +304,7 @@ no_flags_patterns: if a file matching one of these patterns exists in the destin
                         log.debug(f"copy file '{self.last_src}' to '{self.last_dst}'")
 
                         if not self.dry_run:
-                            _fast_copy_file(src, dst)
+                            self.copy_file_contents(src, dst)
                             if self.copy_stat:
                                 shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
                 if self.copy_owner and self.has_chown:
@@ -1,16 +1,18 @@
+import threading
+import time
 from typing import List
 from pathlib import Path
 
-import requests
 from http.cookies import SimpleCookie
 
-from requests.cookies import cookiejar_from_dict
-
 from configVar import config_vars
 from .baseClasses import PythonBatchCommandBase
 from .fileSystemBatchCommands import MakeDir
 import utils
 
+import logging
+log = logging.getLogger()
+
 
 # this class can be used internally, it will create the session ar the init phase and will only need
 # the cookie, the rest of the params will be passed to the call method, this way it will allow this class
@@ -63,6 +65,8 @@ class DownloadManager(PythonBatchCommandBase):
         return cookies
 
     def download_session(self):
+        import requests  # imported here so commands that do not download do not pay for importing requests
+        from requests.cookies import cookiejar_from_dict
         session = requests.Session()
         cookies = self.get_cookie_dict_from_str(self.cookie)
         session.cookies = cookiejar_from_dict(cookies)
@@ -88,3 +92,91 @@ class DownloadFileAndCheckChecksum(DownloadManager):
     def __call__(self, *args, **kwargs):
         with DownloadManager(cookie=self.cookie, report_own_progress=False) as downloader:
             downloader(url=self.url, path=self.path, checksum=self.checksum)
+
+
+class DownloadQueueRun(PythonBatchCommandBase):
+    """ download the files listed in a queue file created by utils.DownloadQueue.save, highest priority first.
+        Downloading can be cancelled while running:
+        - all files: if abort_file was given and is removed
+        - specific files: by writing their paths, one per line, to cancel_file
+        Files downloaded before an abort are recorded next to the queue file and are skipped when running again.
+        Up to max_workers files are downloaded in parallel, the number of parallel downloads from each host adapts to
+        throughput and errors unless adaptive is False. If max_bytes_per_second > 0 total download rate is capped.
+    """
+    def __init__(self, queue_file, max_workers: int = 8, cancel_file=None, abort_file=None, adaptive: bool = True,
+                 max_bytes_per_second: int = 0, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.queue_file = queue_file
+        self.max_workers = max_workers
+        self.cancel_file = cancel_file
+        self.abort_file = abort_file
+        self.adaptive = adaptive
+        self.max_bytes_per_second = max_bytes_per_second
+
+    def repr_own_args(self, all_args: List[str]) -> None:
+        all_args.append(self.unnamed__init__param(self.queue_file))
+        all_args.append(self.named__init__param("max_workers", self.max_workers))
+        if self.cancel_file:
+            all_args.append(self.named__init__param("cancel_file", self.cancel_file))
+        if self.abort_file:
+            all_args.append(self.named__init__param("abort_file", self.abort_file))
+        if not self.adaptive:
+            all_args.append(self.named__init__param("adaptive", self.adaptive))
+        if self.max_bytes_per_second:
+            all_args.append(self.named__init__param("max_bytes_per_second", self.max_bytes_per_second))
+
+    def progress_msg_self(self) -> str:
+        return f'''Downloading files in {self.queue_file}'''
+
+    def watch_cancel_and_abort_files(self, queue: utils.DownloadQueue, stop_watching: threading.Event) -> None:
+        cancel_file = utils.ExpandAndResolvePath(self.cancel_file) if self.cancel_file else None
+        abort_file = utils.ExpandAndResolvePath(self.abort_file) if self.abort_file else None
+        while not stop_watching.wait(1):
+            if abort_file is not None and not abort_file.is_file():
+                log.info(f"aborting download because abort file not found {abort_file}")
+                queue.cancel()
+            if cancel_file is not None and cancel_file.is_file():
+                with utils.utf8_open_for_read(cancel_file, "r") as rfd:
+                    for line in rfd:
+                        if line.strip():
+                            queue.cancel(line.strip())
+
+    def __call__(self, *args, **kwargs):
+        PythonBatchCommandBase.__call__(self, *args, **kwargs)
+        resolved_queue_file = utils.ExpandAndResolvePath(self.queue_file)
+        self.doing = f"""reading download queue '{resolved_queue_file}'"""
+        queue = utils.DownloadQueue.load(resolved_queue_file)
+        total_files = len(queue)
+
+        headers = None
+        cookie_text = config_vars.get("COOKIE_FOR_SYNC_URLS", "").str()
+        if cookie_text:
+            headers = {"Cookie": cookie_text}
+
+        last_report_time = 0.0
+
+        def report_progress(item, statistics):
+            nonlocal last_report_time
+            handled_files = sum(statistics.values())
+            if time.monotonic() - last_report_time > 1.0 or handled_files == total_files:
+                last_report_time = time.monotonic()
+                log.info(f"Progress ... of ...; Downloaded {statistics['downloaded']+statistics['skipped']} of {total_files} files")
+            if utils.progress_events.listening and (utils.progress_events.due("download") or handled_files == total_files):
+                utils.progress_events.emit("download", command=self.__class__.__name__, files=statistics['downloaded']+statistics['skipped'],
+                                           total_files=total_files, **statistics)
+
+        stop_watching = threading.Event()
+        watcher = threading.Thread(target=self.watch_cancel_and_abort_files, args=(queue, stop_watching), daemon=True, name="download queue watcher")
+        watcher.start()
+        try:
+            self.doing = f"""downloading {total_files} files from queue '{resolved_queue_file}' with {self.max_workers} threads"""
+            queue.run(max_workers=self.max_workers, headers=headers,
+                      verify_ssl=utils.http_verify_ssl(config_vars), max_retries=utils.http_max_retries(config_vars),
+                      progress_callback=report_progress, adaptive=self.adaptive, max_bytes_per_second=self.max_bytes_per_second)
+        finally:
+            stop_watching.set()
+            watcher.join()
+            log.info(f"download queue statistics: {dict(queue.statistics)}, parallel downloads per host: {({host: concurrency.limit for host, concurrency in queue.hosts.items()})}")
+            if utils.progress_events.listening:
+                utils.progress_events.emit("download_end", command=self.__class__.__name__, total_files=total_files, **queue.statistics)
+            self.increment_progress()
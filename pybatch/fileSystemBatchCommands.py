@@ -6,6 +6,7 @@ import random
 import re
 import stat
 import string
+from concurrent import futures
 from pathlib import Path
 from typing import Union
 
@@ -829,6 +830,7 @@ class SplitFile(PythonBatchCommandBase):
         self.max_size = max_size
         self.remove_original = remove_original
         self.num_parts = 0
+        self.part_checksums = list()  # (part path, sha1 checksum) for each part, filled while splitting
 
     def repr_own_args(self, all_args: List[str]) -> None:
         all_args.append(self.named__init__param("file_to_split", self.file_to_split))
@@ -871,17 +873,33 @@ class SplitFile(PythonBatchCommandBase):
                 remaining_size -= part_size
         return retVal
 
+    @staticmethod
+    def write_part(file_to_split, offset, part_size, part_path):
+        """ copy part_size bytes starting at offset to part_path, return the checksum of the part """
+        with open(file_to_split, "rb", buffering=0) as fts, open(part_path, "wb", buffering=0) as pfd:
+            utils.chown_chmod_on_fd(pfd)
+            fts.seek(offset)
+            retVal = utils.copy_file_portion(fts, pfd, part_size, checksum=True)
+        return retVal
+
     def __call__(self, *args, **kwargs):
         original_size = self.file_to_split.stat().st_size
         splits = self.calc_splits(original_size)
         print(
             f"original: {original_size}, max_size: {self.max_size}, self.num_parts: {len(splits)}, part_size: {splits[0][0]} naive total {len(splits) * splits[0][0]}")
         print("\n   ".join(str(s[1]) for s in splits))
-        with open(self.file_to_split, "rb") as fts:
+        # parts are independent of each other so they are written in parallel,
+        # each part is streamed with a fixed size buffer and checksummed while written
+        max_workers = min(len(splits), config_vars.get("SPLIT_JOIN_MAX_PARALLEL_PARTS", 4).int()) or 1
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            offset = 0
+            part_futures = list()
             for part_size, part_path in splits:
-                with open(part_path, "wb") as pfd:
-                    utils.chown_chmod_on_fd(pfd)
-                    pfd.write(fts.read(part_size))
+                part_futures.append(executor.submit(self.write_part, self.file_to_split, offset, part_size, part_path))
+                offset += part_size
+            self.part_checksums = [(part_path, part_future.result()) for (_, part_path), part_future in zip(splits, part_futures)]
+        for part_path, part_checksum in self.part_checksums:
+            log.debug(f"{part_path} checksum {part_checksum}")
         if self.remove_original:
             with RmFile(self.file_to_split, report_own_progress=False) as rf:
                 rf()
@@ -901,16 +919,32 @@ class JoinFile(PythonBatchCommandBase):
         the_progress_msg = f"join file {self.file_to_join}"
         return the_progress_msg
 
+    @staticmethod
+    def read_part(part_file, joined_file_path, offset, part_size):
+        """ copy a part to it's place in the joined file """
+        with open(part_file, "rb", buffering=0) as rfd, open(joined_file_path, "r+b", buffering=0) as wfd:
+            wfd.seek(offset)
+            utils.copy_file_portion(rfd, wfd, part_size)
+
     def __call__(self, *args, **kwargs):
         if not self.file_to_join.name.endswith(".aa"):
             raise ValueError(f"name of file to join must end with .aa not: {self.file_to_join.name}")
         files_to_join = utils.find_split_files(self.file_to_join)
         joined_file_path = self.file_to_join.parent.joinpath(self.file_to_join.stem)
+        part_sizes = [part_file.stat().st_size for part_file in files_to_join]
+        # create the joined file in it's final size, so each part can be copied to it's place in parallel
         with open(joined_file_path, "wb") as wfd:
             utils.chown_chmod_on_fd(wfd)
-            for part_file in files_to_join:
-                with open(part_file, "rb") as rfd:
-                    wfd.write(rfd.read())
+            wfd.truncate(sum(part_sizes))
+        max_workers = min(len(files_to_join), config_vars.get("SPLIT_JOIN_MAX_PARALLEL_PARTS", 4).int()) or 1
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            offset = 0
+            part_futures = list()
+            for part_file, part_size in zip(files_to_join, part_sizes):
+                part_futures.append(executor.submit(self.read_part, part_file, joined_file_path, offset, part_size))
+                offset += part_size
+            for part_future in part_futures:
+                part_future.result()
         if self.remove_parts:
             for part_file in files_to_join:
                 with RmFile(part_file, report_own_progress=False) as part_remover:
@@ -1003,11 +1037,17 @@ class Glober(PythonBatchCommandBase):
         if not self.target_param_name:
             self.argv_for_glob_handler.insert(0, None)
 
-        excluded_items = []
-        for excluded_item in self.excludes:
-            excluded_item = str(Path(self.glob_pattern).parent) + "/" + excluded_item
-            excluded_items.extend(glob.glob(excluded_item))
-        paths = set(glob.glob(self.glob_pattern)) - set(excluded_items)
+        # all paths returned by glob are in the folder of glob_pattern, so excludes - which are relative to that folder -
+        # can be matched against the names, instead of calling glob for each exclude.
+        # like glob, names starting with '.' are only matched by excludes starting with '.'
+        excludes_matcher = utils.PathPatternMatcher(self.excludes)
+        hidden_excludes_matcher = utils.PathPatternMatcher([exclude for exclude in self.excludes if exclude.startswith(".")])
+        paths = set()
+        for a_path in glob.glob(self.glob_pattern):
+            a_name = os.path.basename(a_path)
+            matcher = hidden_excludes_matcher if a_name.startswith(".") else excludes_matcher
+            if not matcher.match_name(a_name):
+                paths.add(a_path)
 
         for a_path in paths:
             if self.target_param_name:
@@ -1,6 +1,5 @@
 from http.cookies import SimpleCookie
-from requests.cookies import cookiejar_from_dict
-from typing import List, Any
+from typing import List, Dict, Any
 import os
 import sys
 import stat
@@ -8,9 +7,10 @@ import zlib
 from collections import defaultdict
 from pathlib import Path
 import logging
-import requests
 import time
 import datetime
+import mimetypes
+from concurrent import futures
 
 log = logging.getLogger(__name__)
 
@@ -254,12 +254,24 @@ class InfoMapSplitWriter(DBManager, PythonBatchCommandBase):
     def progress_msg_self(self) -> str:
         return f'''Create split info_map files'''
 
+    def open_info_map_writer(self, infomap_file_name):
+        """ open a writer for an info_map file and it's wzip, and write the info_map_table comments """
+        zip_infomap_file_name = config_vars.resolve_str(infomap_file_name + "$(WZLIB_EXTENSION)")
+        zlib_compression_level = int(config_vars.get("ZLIB_COMPRESSION_LEVEL", "8"))
+        retVal = utils.TextAndWzipWriter(self.work_folder.joinpath(infomap_file_name),
+                                         self.work_folder.joinpath(zip_infomap_file_name),
+                                         compression_level=zlib_compression_level)
+        retVal.open()
+        if self.info_map_table.comments:
+            retVal.write("".join(f"# {comment}\n" for comment in self.info_map_table.comments) + "\n")
+        return retVal
+
     def __call__(self, *args, **kwargs) -> None:
         # fill the iid_to_svn_item_t table
         self.info_map_table.populate_IIDToSVNItem()
 
         # get the list of info map file names
-        info_map_to_item = dict()
+        info_map_names_to_create = list()
         all_info_map_names = self.items_table.get_unique_detail_values('info_map')
         for infomap_file_name in all_info_map_names:
             info_map_file_path = self.work_folder.joinpath(infomap_file_name)
@@ -272,42 +284,49 @@ class InfoMapSplitWriter(DBManager, PythonBatchCommandBase):
                 if not zip_info_map_file_path.is_file():
                     raise FileNotFoundError(f"found {info_map_file_path} but not {zip_info_map_file_path}")
             else:
-                self.info_map_table.mark_items_required_by_infomap(infomap_file_name)
-                info_map_items = self.info_map_table.get_required_items()
-                info_map_to_item[infomap_file_name] = info_map_items
-
-        files_to_add_to_default_info_map = list()  # the named info_map files and their wzip version should be added to the default info_map
-        # write each info map to file
-        for infomap_file_name, info_map_items in info_map_to_item.items():
-            if info_map_items:  # could be that no items are linked to the info map file
-                info_map_file_path = self.work_folder.joinpath(infomap_file_name)
-                self.info_map_table.write_to_file(in_file=info_map_file_path, items_list=info_map_items,
-                                                  field_to_write=self.fields_relevant_to_info_map)
-                files_to_add_to_default_info_map.append(info_map_file_path)
+                info_map_names_to_create.append(infomap_file_name)
 
-                zip_infomap_file_name = config_vars.resolve_str(infomap_file_name + "$(WZLIB_EXTENSION)")
-                zip_info_map_file_path = self.work_folder.joinpath(zip_infomap_file_name)
-                with Wzip(info_map_file_path, self.work_folder, own_progress_count=0) as wzipper:
-                    wzipper()
-                files_to_add_to_default_info_map.append(zip_info_map_file_path)
+        # write all info maps in one pass over the items, each info map is written together with it's wzip
+        # and a file is created only if some items are linked to the info map.
+        writers = dict()
+        lines_per_info_map = defaultdict(list)
+        try:
+            for infomap_file_name, item in self.info_map_table.iter_items_for_info_maps(info_map_names_to_create):
+                lines = lines_per_info_map[infomap_file_name]
+                lines.append(f"{item.str_specific_fields(self.fields_relevant_to_info_map)}\n")
+                if len(lines) == 8192:
+                    if infomap_file_name not in writers:
+                        writers[infomap_file_name] = self.open_info_map_writer(infomap_file_name)
+                    writers[infomap_file_name].write("".join(lines))
+                    lines.clear()
+            for infomap_file_name, lines in lines_per_info_map.items():
+                if lines:
+                    if infomap_file_name not in writers:
+                        writers[infomap_file_name] = self.open_info_map_writer(infomap_file_name)
+                    writers[infomap_file_name].write("".join(lines))
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        # the named info_map files and their wzip version should be added to the default info_map
+        lines_for_main_info_map = list()
+        for infomap_file_name in info_map_names_to_create:
+            if infomap_file_name in writers:
+                writer = writers[infomap_file_name]
+                # todo: make path relative
+                lines_for_main_info_map.append(f"instl/{Path(writer.name).name}, f, {config_vars['TARGET_REPO_REV'].str()}, {writer.text_checksum()}, {writer.text_size}\n")
+                lines_for_main_info_map.append(f"instl/{Path(writer.wzip_name).name}, f, {config_vars['TARGET_REPO_REV'].str()}, {writer.wzip_checksum()}, {writer.wzip_size}\n")
 
         # add the default info map
         default_info_map_file_name = str(config_vars["MAIN_INFO_MAP_FILE_NAME"])
-        default_info_map_file_path = self.work_folder.joinpath(default_info_map_file_name)
-        info_map_items = self.info_map_table.get_items_for_default_infomap()
-        self.info_map_table.write_to_file(in_file=default_info_map_file_path, items_list=info_map_items,
-                                          field_to_write=self.fields_relevant_to_info_map)
-        with Wzip(default_info_map_file_path, self.work_folder, own_progress_count=0) as wzipper:
-            wzipper()
+        with self.open_info_map_writer(default_info_map_file_name) as wfd:
+            for items in utils.iter_grouper(8192, self.info_map_table.iter_items_for_default_infomap()):
+                wfd.write("".join([f"{item.str_specific_fields(self.fields_relevant_to_info_map)}\n" for item in items]))
 
         # add a line to default info map for each non default info_map created above
-        with utils.utf8_open_for_read(default_info_map_file_path, "a") as wfd:
-            for file_to_add in files_to_add_to_default_info_map:
-                file_checksum = utils.get_file_checksum(file_to_add)
-                file_size = file_to_add.stat().st_size
-                # todo: make path relative
-                line_for_main_info_map = f"instl/{file_to_add.name}, f, {config_vars['TARGET_REPO_REV'].str()}, {file_checksum}, {file_size}\n"
-                wfd.write(line_for_main_info_map)
+        # the lines are not added to the wzip of the default info map
+        with utils.utf8_open_for_read(self.work_folder.joinpath(default_info_map_file_name), "a") as wfd:
+            wfd.write("".join(lines_for_main_info_map))
 
 
 class IndexYamlReader(DBManager, PythonBatchCommandBase):
@@ -339,12 +358,14 @@ class ShortIndexYamlCreator(DBManager, PythonBatchCommandBase):
     """ Create short_index.yaml from index.yaml
         Admin pybatch class, used in deployment, not during installation
     """
-    def __init__(self, short_index_yaml_path, **kwargs):
+    def __init__(self, short_index_yaml_path, resolved_short_index_path=None, **kwargs):
         super().__init__(**kwargs)
         self.short_index_yaml_path = Path(short_index_yaml_path)
+        self.resolved_short_index_path = Path(resolved_short_index_path) if resolved_short_index_path else None
 
     def repr_own_args(self, all_args: List[str]) -> None:
         all_args.append(self.unnamed__init__param(self.short_index_yaml_path))
+        all_args.append(self.optional_named__init__param("resolved_short_index_path", self.resolved_short_index_path))
 
     def progress_msg_self(self) -> str:
         return f'''write short index.yaml to {self.short_index_yaml_path}'''
@@ -394,6 +415,22 @@ class ShortIndexYamlCreator(DBManager, PythonBatchCommandBase):
             aYaml.writeAsYaml(defines_yaml_doc, wfd)
             aYaml.writeAsYaml(index_yaml_doc, wfd)
 
+        if self.resolved_short_index_path:
+            self.write_resolved_short_index(short_index_data, builtin_iids)
+
+    def write_resolved_short_index(self, short_index_data, builtin_iids):
+        """ resolved short index has all resolved details needed for client side queries, see ResolvedShortIndex """
+        from pyinstl.resolvedShortIndex import ResolvedShortIndex
+        details = self.items_table.get_data_for_resolved_short_index(ResolvedShortIndex.published_details)
+        sizes = [(data_line['iid'], data_line['size_mac'], data_line['size_win']) for data_line in short_index_data]
+        defines = dict()
+        for var_name in list(config_vars.get('SHORT_INDEX_FILE_VARS', [])):
+            if var_name in config_vars:
+                var_values = config_vars[var_name].list()
+                defines[var_name] = var_values[0] if len(var_values) == 1 else var_values
+        resolved_short_index = ResolvedShortIndex.from_details(details, sizes, defines, ignore_iids=builtin_iids)
+        resolved_short_index.write(self.resolved_short_index_path)
+
 
 class CopySpecificRepoRev(DBManager, PythonBatchCommandBase):
     """ Copy files marked are "required" to the repo-rev folder
@@ -500,3 +537,130 @@ class CreateRepoRevFile(PythonBatchCommandBase):
         with utils.utf8_open_for_write(repo_rev_file_path, "w") as wfd:
             aYaml.writeAsYaml(repo_rev_yaml_doc, out_stream=wfd, indentor=None, sort=True)
             log.info(f"""create {repo_rev_file_path}""")
+
+
+class UploadRepoRevToS3(DBManager, PythonBatchCommandBase):
+    """ upload the files of a repo-rev folder to s3
+        The list of files to upload is not the result of comparing the folder to the bucket (as 'aws s3 sync' does)
+        but the files of the repo-rev in info_map table - the files copied by CopySpecificRepoRev - and the repo-rev's
+        instl folder. Files are taken by their revision rather than by the required marks, because InfoMapSplitWriter
+        changes these marks before the upload. The instl folder is walked since most of its files are created
+        during the upload and are not in info_map table.
+        A file is not uploaded if s3 already has an object with the same ETag, ETags of existing objects are listed
+        in one pass over the key prefix. Files are uploaded in parallel and big files are uploaded in multiple parts.
+        Admin pybatch class, used in deployment, not during installation
+    """
+    s3_client_factory = None  # callable returning an s3 client, when None a boto3 client is created
+
+    def __init__(self, repo_rev_folder, repo_rev, bucket_name, key_prefix,
+                 multipart_threshold=8*1024*1024, multipart_chunksize=8*1024*1024, **kwargs):
+        super().__init__(**kwargs)
+        self.repo_rev_folder = Path(repo_rev_folder)
+        self.repo_rev = repo_rev
+        self.bucket_name = bucket_name
+        self.key_prefix = key_prefix
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        self.num_uploaded = 0
+        self.num_skipped = 0
+
+    def repr_own_args(self, all_args: List[str]) -> None:
+        all_args.append(self.unnamed__init__param(self.repo_rev_folder))
+        all_args.append(self.unnamed__init__param(self.repo_rev))
+        all_args.append(self.unnamed__init__param(self.bucket_name))
+        all_args.append(self.unnamed__init__param(self.key_prefix))
+        all_args.append(self.optional_named__init__param("multipart_threshold", self.multipart_threshold, 8*1024*1024))
+        all_args.append(self.optional_named__init__param("multipart_chunksize", self.multipart_chunksize, 8*1024*1024))
+
+    def progress_msg_self(self) -> str:
+        return f'''Upload {self.repo_rev_folder} to s3://{self.bucket_name}/{self.key_prefix}'''
+
+    def get_s3_client(self):
+        if UploadRepoRevToS3.s3_client_factory is not None:
+            retVal = UploadRepoRevToS3.s3_client_factory()
+        else:
+            import boto3
+            retVal = boto3.client("s3")
+        return retVal
+
+    def get_transfer_config(self):
+        """ boto3.s3.transfer.TransferConfig or None if s3 client was created by s3_client_factory """
+        retVal = None
+        if UploadRepoRevToS3.s3_client_factory is None:
+            from boto3.s3.transfer import TransferConfig
+            retVal = TransferConfig(multipart_threshold=self.multipart_threshold,
+                                    multipart_chunksize=self.multipart_chunksize,
+                                    max_concurrency=config_vars.get("S3_UPLOAD_MAX_CONCURRENCY_PER_FILE", 4).int())
+        return retVal
+
+    def upload_manifest(self) -> List[Path]:
+        """ relative paths of the files to upload """
+        retVal = [Path(file_path) for file_path in self.info_map_table.get_file_paths_of_revision(self.repo_rev)
+                  if not file_path.startswith("instl/")]
+        instl_folder = self.repo_rev_folder.joinpath("instl")
+        for root, dirs, files in os.walk(instl_folder, followlinks=False):
+            for a_file in files:
+                if a_file == ".DS_Store":
+                    continue
+                retVal.append(Path(root, a_file).relative_to(self.repo_rev_folder))
+        return retVal
+
+    def s3_etags(self, s3_client) -> Dict[str, str]:
+        """ ETags of all objects under key_prefix by key, listed with list_objects_v2 1000 keys at a time """
+        retVal = dict()
+        list_kwargs = {"Bucket": self.bucket_name, "Prefix": self.key_prefix + "/"}
+        while True:
+            response = s3_client.list_objects_v2(**list_kwargs)
+            for s3_object in response.get("Contents", []):
+                retVal[s3_object["Key"]] = s3_object["ETag"]
+            if not response.get("IsTruncated"):
+                break
+            list_kwargs["ContinuationToken"] = response["NextContinuationToken"]
+        return retVal
+
+    def upload_one_file(self, s3_client, transfer_config, relative_path, s3_etags) -> bool:
+        """ upload a single file, unless s3 already has it
+            return True if the file was uploaded, False if skipped
+        """
+        local_path = self.repo_rev_folder.joinpath(relative_path)
+        key = "/".join((self.key_prefix, relative_path.as_posix()))
+        s3_etag = s3_etags.get(key)
+        if s3_etag is not None:
+            local_etag = utils.get_file_s3_etag(local_path, self.multipart_threshold, self.multipart_chunksize)
+            if s3_etag == local_etag:
+                return False
+
+        extra_args = dict()
+        content_type, _ = mimetypes.guess_type(local_path.name)
+        if content_type:
+            extra_args["ContentType"] = content_type
+        upload_kwargs = {"ExtraArgs": extra_args}
+        if transfer_config is not None:
+            upload_kwargs["Config"] = transfer_config
+        s3_client.upload_file(os.fspath(local_path), self.bucket_name, key, **upload_kwargs)
+        return True
+
+    def __call__(self, *args, **kwargs) -> None:
+        PythonBatchCommandBase.__call__(self, *args, **kwargs)
+        max_workers = config_vars.get("S3_UPLOAD_MAX_PARALLEL_FILES", 16).int()
+
+        files_to_upload = self.upload_manifest()
+        s3_client = self.get_s3_client()
+        transfer_config = self.get_transfer_config()
+        s3_etags = self.s3_etags(s3_client)
+        self.doing = f"""uploading {len(files_to_upload)} files to s3://{self.bucket_name}/{self.key_prefix}"""
+        with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            upload_futures = {executor.submit(self.upload_one_file, s3_client, transfer_config, relative_path, s3_etags): relative_path
+                              for relative_path in files_to_upload}
+            for a_future in futures.as_completed(upload_futures):
+                try:
+                    uploaded = a_future.result()
+                except Exception:
+                    for pending_future in upload_futures:
+                        pending_future.cancel()
+                    raise
+                if uploaded:
+                    self.num_uploaded += 1
+                else:
+                    self.num_skipped += 1
+        log.info(f"""uploaded {self.num_uploaded} files to s3://{self.bucket_name}/{self.key_prefix}, {self.num_skipped} files were already uploaded""")
@@ -104,11 +104,21 @@ class Stage(pybatch.PythonBatchCommandBase, essential=False, call__call__=False,
     def __call__(self, *args, **kwargs):
         pass
 
+    def enter_self(self) -> None:
+        # only sections (sync, copy...) are reported as stage events, inner stages are part of the progress event's stage
+        if utils.progress_events.listening and self.stage_name in pybatch.PythonBatchCommandAccum.section_order:
+            utils.progress_events.emit("stage_start", stage=self.stage_name, progress=pybatch.PythonBatchCommandBase.running_progress,
+                                       total=pybatch.PythonBatchCommandBase.total_progress)
+
     def __exit__(self, exc_type, exc_val, exc_tb):
-        super().__exit__(exc_type, exc_val, exc_tb)
+        suppress_exception = super().__exit__(exc_type, exc_val, exc_tb)
         if self.stage_name in pybatch.PythonBatchCommandAccum.section_order:
             config_var_name = f"__TIMING_{self.stage_name}_sec__".upper()
             config_vars[config_var_name] = self.command_time_sec
+            if utils.progress_events.listening:
+                utils.progress_events.emit("stage_end", stage=self.stage_name, progress=pybatch.PythonBatchCommandBase.running_progress,
+                                           total=pybatch.PythonBatchCommandBase.total_progress, duration_sec=round(self.command_time_sec, 3),
+                                           error=None if suppress_exception else exc_type.__name__)
 
 
 class Progress(pybatch.PythonBatchCommandBase, essential=False, call__call__=True, is_context_manager=False):
@@ -332,6 +342,8 @@ class PythonBatchRuntime(pybatch.PythonBatchCommandBase, call__call__=False, is_
             error_dict = self.error_dict(exc_type, exc_val, exc_tb)
         error_json = json.dumps(error_dict, separators=(',', ':'), sort_keys=True, default=utils.extra_json_serializer)
         log.error(f"---\n{error_json}\n...\n")
+        if utils.progress_events.listening:
+            utils.progress_events.emit("error", **error_dict)
 
     def repr_own_args(self, all_args: List[str]) -> None:
         all_args.append(self.unnamed__init__param(self.name))
@@ -634,6 +646,7 @@ class PatchPyBatchWithTimings(pybatch.PythonBatchCommandBase):
         progress_comment_re = re.compile(""".+prog_num=(?P<progress>\d+).+\s+$""")
         py_batch_with_timings = self.path_to_py_batch.with_suffix(".timings.py")
         last_progress_reported = 0
+        timings = dict()  # same timings as written to the file, for the progress events stream
         with utils.utf8_open_for_read(self.path_to_py_batch) as rfd, utils.utf8_open_for_write(py_batch_with_timings, "w") as wfd:
             for line in rfd.readlines():
                 line_to_print = line
@@ -658,9 +671,13 @@ class PatchPyBatchWithTimings(pybatch.PythonBatchCommandBase):
                     bytes_per_second = int(bytes_to_download / download_time_sec)
                     sync_timing_line = f"# downloaded {bytes_to_download} bytes in {convertSeconds(download_time_sec)}, {bytes_per_second} bytes per second\n"
                     wfd.write(sync_timing_line)
+                    timings.update({"download_bytes": bytes_to_download, "sync_sec": round(download_time_sec, 3), "bytes_per_second": bytes_per_second})
             for stage in ('copy', 'remove', 'doit'):
                 stage_timing_config_var_name = f"__TIMING_{stage}_SEC__".upper()
                 if stage_timing_config_var_name in config_vars:
                     stage_time_sec = config_vars[stage_timing_config_var_name].float()
                     stage_timing_line = f"# {stage} time {convertSeconds(stage_time_sec)}\n"
                     wfd.write(stage_timing_line)
+                    timings[f"{stage}_sec"] = round(stage_time_sec, 3)
+        if utils.progress_events.listening:
+            utils.progress_events.emit("timings", **timings)
@@ -12,8 +12,6 @@ from pathlib import Path
 from threading import Thread
 from typing import List
 
-import psutil
-
 import utils
 from configVar import config_vars
 from .baseClasses import PythonBatchCommandBase
@@ -515,6 +513,7 @@ class KillProcess(PythonBatchCommandBase):
         all_args.append(self.optional_named__init__param("sleep_sec", self.sleep_sec, 1))
 
     def __call__(self, *args, **kwargs):
+        import psutil
         PythonBatchCommandBase.__call__(self, *args, **kwargs)
         found_process = False
         look_for = [self.process_name]
@@ -577,6 +576,19 @@ class CurlWithInternalParallel(PythonBatchCommandBase):
 
         return f"{formatted_number}{suffixes[magnitude]}"
 
+    # converts curl's human-readable size to number of bytes
+    # 123 => 123
+    # 1.5k => 1536
+    # returns None for sizes curl reports as "--"
+    def string_to_bytes(self, size_str):
+        multipliers = {'k': 1024, 'm': 1024**2, 'g': 1024**3, 't': 1024**4, 'p': 1024**5}
+        try:
+            multiplier = multipliers.get(size_str[-1:].lower(), 1)
+            number_str = size_str[:-1] if multiplier > 1 else size_str
+            return int(float(number_str) * multiplier)
+        except ValueError:
+            return None
+
     def progress_msg_self(self) -> str:
         return f'''CurlInternalParallel {self.config_file_path}'''
 
@@ -642,8 +654,16 @@ class CurlWithInternalParallel(PythonBatchCommandBase):
                               f"Downloaded {match.group('Dled')} of {bytes_to_download_str}, " \
                               f"Speed {match.group('Speed')}"
                     log.info(message)
+                    if utils.progress_events.listening and utils.progress_events.due("download"):
+                        utils.progress_events.emit("download", command=self.__class__.__name__,
+                                                   files=downloaded_files, total_files=self.total_files_to_download,
+                                                   bytes=self.string_to_bytes(match.group('Dled')), total_bytes=self.total_bytes_to_download,
+                                                   bytes_per_second=self.string_to_bytes(match.group('Speed')))
 
         process.stdout.close()
         process.wait()
         print(f"Curl ended {process.returncode}")
+        if utils.progress_events.listening:
+            utils.progress_events.emit("download_end", command=self.__class__.__name__, total_files=self.total_files_to_download,
+                                       total_bytes=self.total_bytes_to_download, exit_code=process.returncode)
         self.increment_progress()
@@ -143,30 +143,42 @@ class SVNCheckout(SVNClient):
 
 class SVNInfo(SVNClient):
     """ calls svn info
+        xml=True will output xml which can be read by SVNInfoXMLReader
         Admin pybatch class, used in deployment, not during installation
     """
-    def __init__(self, **kwargs):
+    def __init__(self, xml=False, **kwargs):
         super().__init__("info", **kwargs)
+        self.xml = xml
 
     def repr_own_args(self, all_args: List[str]) -> None:
-        pass
+        all_args.append(self.optional_named__init__param("xml", self.xml, False))
+
+    def get_run_args(self, run_args) -> None:
+        super().get_run_args(run_args)
+        if self.xml:
+            run_args.append("--xml")
 
 
 class SVNPropList(SVNClient):
     """ calls svn proplist
+        xml=True will output xml which can be read by SVNInfoXMLReader
         Admin pybatch class, used in deployment, not during installation
     """
-    def __init__(self, with_values=False, **kwargs):
+    def __init__(self, with_values=False, xml=False, **kwargs):
         super().__init__("proplist", **kwargs)
         self.with_values = with_values
+        self.xml = xml
 
     def repr_own_args(self, all_args: List[str]) -> None:
         all_args.append(self.optional_named__init__param("with_values", self.with_values, False))
+        all_args.append(self.optional_named__init__param("xml", self.xml, False))
 
     def get_run_args(self, run_args) -> None:
         super().get_run_args(run_args)
         if self.with_values:
             run_args.append("--verbose")
+        if self.xml:
+            run_args.append("--xml")
 
 
 class SVNAdd(SVNClient):
@@ -226,3 +238,31 @@ class SVNInfoReader(DBManager, PythonBatchCommandBase, kwargs_defaults={"disable
         PythonBatchCommandBase.__call__(self, *args, **kwargs)
         resolved_info_map_path = utils.ExpandAndResolvePath(self.file_to_read)
         self.info_map_table.read_from_file(resolved_info_map_path, a_format=self.format, disable_indexes_during_read=self.disable_indexes_during_read)
+
+
+class SVNInfoXMLReader(DBManager, PythonBatchCommandBase):
+    """
+    read, in one pass, files created by SVNInfo(xml=True), SVNPropList(xml=True) and FileSizes
+    same as reading them with SVNInfoReader formats "info", "props", "file-sizes" - only faster
+        Admin pybatch class, used in deployment, not during installation
+    """
+    def __init__(self, info_file, props_file=None, file_sizes_file=None, **kwargs):
+        super().__init__(**kwargs)
+        self.info_file = info_file
+        self.props_file = props_file
+        self.file_sizes_file = file_sizes_file
+
+    def repr_own_args(self, all_args: List[str]) -> None:
+        all_args.append(self.unnamed__init__param(self.info_file))
+        all_args.append(self.optional_named__init__param("props_file", self.props_file))
+        all_args.append(self.optional_named__init__param("file_sizes_file", self.file_sizes_file))
+
+    def progress_msg_self(self) -> str:
+        return f'''reading {self.info_file}'''
+
+    def __call__(self, *args, **kwargs) -> None:
+        PythonBatchCommandBase.__call__(self, *args, **kwargs)
+        resolved_paths = [utils.ExpandAndResolvePath(a_path) if a_path else None
+                          for a_path in (self.info_file, self.props_file, self.file_sizes_file)]
+        with self.info_map_table.reading_files_context():
+            self.info_map_table.read_from_svn_info_xml(*resolved_paths)
@@ -176,7 +176,8 @@ class TestPythonBatch(object):
         with open(self.path_inside_test_folder(file_name), "w") as wfd:
             wfd.write(contents)
 
-    def exec_and_capture_output(self, test_name=None, expected_exception=None):
+    def write_python_batch_file(self, test_name=None):
+        """ write batch_accum to a python batch file, return the test name and the batch code """
         self.sub_test_counter += 1
         if test_name is None:
             test_name = self.which_test
@@ -188,6 +189,10 @@ class TestPythonBatch(object):
         bc_repr = repr(self.batch_accum)
         with open(self.python_batch_file_path, "w", encoding='utf-8', errors='replace') as wfd:
             wfd.write(bc_repr)
+        return test_name, bc_repr
+
+    def exec_and_capture_output(self, test_name=None, expected_exception=None):
+        test_name, bc_repr = self.write_python_batch_file(test_name)
         bc_compiled = compile(bc_repr, self.python_batch_file_path, 'exec')
         output_file_name = self.path_inside_test_folder(f'{test_name}_output.txt')
         if output_file_name != self.output_file_name:
@@ -93,6 +93,33 @@ class TestPythonBatchCopy(unittest.TestCase):
         dir_comp_with_ignore = filecmp.dircmp(dir_to_copy_from, dir_to_copy_to_with_ignore)
         is_identical_dircomp_with_ignore(dir_comp_with_ignore, file_names_to_ignore)
 
+    def test_RsyncClone_copy_method(self):
+        """ files copied without hard links should be cloned or copied with copy_file_range or copyfile,
+            and the method used for each file recorded in RsyncClone.statistics
+        """
+        dir_to_copy_from = self.pbt.path_inside_test_folder("copy-method-source")
+        dir_to_copy_to = self.pbt.path_inside_test_folder("copy-method-target")
+
+        self.pbt.batch_accum.clear(section_name="doit")
+        self.pbt.batch_accum += MakeDir(dir_to_copy_from)
+        with self.pbt.batch_accum.sub_accum(Cd(dir_to_copy_from)) as sub_bc:
+            sub_bc += MakeRandomDirs(num_levels=2, num_dirs_per_level=2, num_files_per_dir=3, file_size=70000)
+        self.pbt.exec_and_capture_output()
+
+        with RsyncClone(dir_to_copy_from, dir_to_copy_to, hard_links=False, report_own_progress=False) as rc:
+            rc()
+        dir_comp = filecmp.dircmp(dir_to_copy_from, dir_to_copy_to)
+        self.assertTrue(is_identical_dircmp(dir_comp), f"{self.pbt.which_test}: source and target dirs are not the same")
+        num_copied = sum(rc.statistics[copy_method] for copy_method in ("copy_clone", "copy_copy_file_range", "copy_copyfile"))
+        self.assertEqual(num_copied, rc.statistics['files'])
+        self.assertGreater(num_copied, 0)
+
+        # copying a file on itself should not truncate it
+        a_file = next(a_path for a_path in Path(dir_to_copy_to).rglob("*") if a_path.is_file())
+        size_before = a_file.stat().st_size
+        self.assertEqual(utils.clone_or_copy_file(a_file, a_file), "same_file")
+        self.assertEqual(a_file.stat().st_size, size_before)
+
     def test_CopyDirToDir_repr(self):
         dir_from = r"\p\o\i"
         dir_to = "/q/w/r"
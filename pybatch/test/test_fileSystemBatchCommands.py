@@ -623,6 +623,31 @@ class TestPythonBatchFileSystem(unittest.TestCase):
         are_files_the_same = filecmp.cmp(file_to_split_before, file_to_split, shallow=False)
         self.assertTrue(are_files_the_same, f"{self.pbt.which_test}: before split and after join fies are not the same")
 
+    def test_SplitJoinFile_big(self):
+        file_size = 5 * 1024 * 1024 + 17  # bigger than the copy buffer and not a round number
+        part_size = 2 * 1024 * 1024
+
+        file_to_split: Path = (self.pbt.path_inside_test_folder("file_to_split"))
+        file_to_split_before: Path = (self.pbt.path_inside_test_folder("file_to_split.before"))
+        first_split_file: Path = (self.pbt.path_inside_test_folder("file_to_split.aa"))
+
+        with MakeRandomDataFile(file_to_split, file_size, report_own_progress=False) as mrdf:
+            mrdf()
+        with CopyFileToFile(file_to_split, file_to_split_before, report_own_progress=False) as cftf:
+            cftf()
+        with SplitFile(file_to_split, part_size, report_own_progress=False) as sf:
+            sf()
+        self.assertFalse(file_to_split.exists(), f"{self.pbt.which_test}: {file_to_split} should have been removed")
+        self.assertEqual(len(sf.part_checksums), 3)
+        for part_path, part_checksum in sf.part_checksums:
+            self.assertEqual(part_checksum, utils.get_file_checksum(part_path))
+
+        with JoinFile(first_split_file, report_own_progress=False) as jf:
+            jf()
+        are_files_the_same = filecmp.cmp(file_to_split_before, file_to_split, shallow=False)
+        self.assertTrue(are_files_the_same, f"{self.pbt.which_test}: before split and after join fies are not the same")
+        self.assertFalse(first_split_file.exists(), f"{self.pbt.which_test}: {first_split_file} should have been removed")
+
     def test_Glober_repr(self):
         self.pbt.reprs_test_runner(Glober('rumba/*', Print, "shoshana"),
                                    Glober('rumba/*', Print, "shoshana", "banana"),
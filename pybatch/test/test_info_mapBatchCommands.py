@@ -2,6 +2,8 @@
 
 
 import unittest
+import zlib
+import hashlib
 import logging
 log = logging.getLogger(__name__)
 
@@ -9,6 +11,59 @@ from pybatch import *
 
 
 from .test_PythonBatchBase import *
+from db import DBManager
+
+
+class FileSystemS3Client:
+    """ minimal stand-in for boto3 s3 client, keeps a bucket's objects as files under a folder """
+    class NotFound(Exception):
+        def __init__(self):
+            super().__init__("Not Found")
+            self.response = {"Error": {"Code": "404"}}
+
+    def __init__(self, bucket_folder, multipart_threshold, multipart_chunksize, max_keys=1000):
+        self.bucket_folder = Path(bucket_folder)
+        self.multipart_threshold = multipart_threshold
+        self.multipart_chunksize = multipart_chunksize
+        self.max_keys = max_keys
+        self.uploaded_keys = list()
+        self.num_list_requests = 0
+
+    def etag(self, object_path):
+        """ ETag as s3 assigns it: md5 of the contents for objects uploaded in one part,
+            md5 of the parts' md5s followed by -<number of parts> for objects uploaded in parts
+        """
+        contents = object_path.read_bytes()
+        if len(contents) < self.multipart_threshold:
+            etag = hashlib.md5(contents).hexdigest()
+        else:
+            parts = [contents[i:i+self.multipart_chunksize] for i in range(0, len(contents), self.multipart_chunksize)]
+            etag = f"{hashlib.md5(b''.join(hashlib.md5(part).digest() for part in parts)).hexdigest()}-{len(parts)}"
+        return f'"{etag}"'
+
+    def head_object(self, Bucket, Key):
+        object_path = self.bucket_folder.joinpath(Bucket, Key)
+        if not object_path.is_file():
+            raise FileSystemS3Client.NotFound()
+        return {"ETag": self.etag(object_path)}
+
+    def list_objects_v2(self, Bucket, Prefix, ContinuationToken=None):
+        """ keys in lexicographic order, max_keys at a time, ContinuationToken is the last key of the previous page """
+        self.num_list_requests += 1
+        bucket_path = self.bucket_folder.joinpath(Bucket)
+        all_keys = sorted(object_path.relative_to(bucket_path).as_posix() for object_path in bucket_path.rglob("*") if object_path.is_file())
+        keys = [key for key in all_keys if key.startswith(Prefix) and (ContinuationToken is None or key > ContinuationToken)]
+        retVal = {"Contents": [{"Key": key, "ETag": self.etag(bucket_path.joinpath(key))} for key in keys[:self.max_keys]],
+                  "IsTruncated": len(keys) > self.max_keys}
+        if retVal["IsTruncated"]:
+            retVal["NextContinuationToken"] = keys[self.max_keys - 1]
+        return retVal
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        object_path = self.bucket_folder.joinpath(Bucket, Key)
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(Filename, object_path)
+        self.uploaded_keys.append(Key)
 
 
 class TestPythonBatchInfoMap(unittest.TestCase):
@@ -46,6 +101,139 @@ class TestPythonBatchInfoMap(unittest.TestCase):
     def test_CreateSyncFolders(self):
         pass
 
+    def test_UploadRepoRevToS3_repr(self):
+        self.pbt.reprs_test_runner(UploadRepoRevToS3("/a/b/c", 34, "the-bucket", "V9/02/34"),
+                                   UploadRepoRevToS3("/a/b/c", 34, "the-bucket", "V9/02/34", multipart_threshold=64, multipart_chunksize=32))
+
+    def test_UploadRepoRevToS3(self):
+        config_vars["__INSTL_DEFAULTS_FOLDER__"] = Path(os.path.dirname(__file__), "../..", "defaults")
+        repo_rev_folder = self.pbt.path_inside_test_folder("repo-rev")
+        bucket_folder = self.pbt.path_inside_test_folder("s3")
+        info_map_text = "Mac, d, 1\nMac/old.txt, f, 1, 0, 0\nMac/new.txt, f, 2, 0, 0\nMac/big.bin, f, 2, 0, 0\ninstl, d, 2\n"
+        files_in_repo_rev = {"Mac/new.txt": "new file", "Mac/big.bin": "big file " * 20, "instl/info_map.txt": info_map_text}
+        for file_path, file_contents in files_in_repo_rev.items():
+            repo_rev_folder.joinpath(file_path).parent.mkdir(parents=True, exist_ok=True)
+            repo_rev_folder.joinpath(file_path).write_text(file_contents)
+        # not in info_map table, so not part of the repo-rev
+        repo_rev_folder.joinpath("Mac/unversioned.txt").write_text("unversioned file")
+        expected_keys = ["V9/00/02/Mac/new.txt", "V9/00/02/Mac/big.bin", "V9/00/02/instl/info_map.txt"]
+
+        info_map_table = DBManager().info_map_table
+        info_map_table.clear_all()
+        info_map_text_file = io.StringIO(info_map_text)
+        info_map_text_file.name = "info_map.txt"
+        info_map_table.read_from_text(info_map_text_file)
+
+        # files bigger than the threshold are uploaded in parts and their s3 ETag is not the md5 of the contents
+        s3_client = FileSystemS3Client(bucket_folder, 64, 32, max_keys=2)
+        UploadRepoRevToS3.s3_client_factory = lambda: s3_client
+        try:
+            self.pbt.batch_accum.clear(section_name="doit")
+            self.pbt.batch_accum += UploadRepoRevToS3(repo_rev_folder, 2, "the-bucket", "V9/00/02", multipart_threshold=64, multipart_chunksize=32)
+            self.pbt.exec_and_capture_output("first_upload")
+            self.assertCountEqual(s3_client.uploaded_keys, expected_keys)
+            self.assertEqual(s3_client.num_list_requests, 1)
+            for file_path, file_contents in files_in_repo_rev.items():
+                self.assertEqual(bucket_folder.joinpath("the-bucket", "V9/00/02", file_path).read_text(), file_contents)
+            self.assertTrue(s3_client.head_object("the-bucket", "V9/00/02/Mac/big.bin")["ETag"].endswith('-6"'))
+
+            # second upload should skip files that did not change, including the multipart one
+            repo_rev_folder.joinpath("Mac/new.txt").write_text("new file changed")
+            s3_client.uploaded_keys.clear()
+            s3_client.num_list_requests = 0
+            self.pbt.exec_and_capture_output("second_upload")
+            self.assertEqual(s3_client.uploaded_keys, ["V9/00/02/Mac/new.txt"])
+            self.assertEqual(s3_client.num_list_requests, 2)  # 3 keys, 2 keys per list request
+
+            repo_rev_folder.joinpath("Mac/big.bin").write_text("big file changed " * 20)
+            s3_client.uploaded_keys.clear()
+            self.pbt.exec_and_capture_output("third_upload")
+            self.assertEqual(s3_client.uploaded_keys, ["V9/00/02/Mac/big.bin"])
+        finally:
+            UploadRepoRevToS3.s3_client_factory = None
+            info_map_table.clear_all()
+
+    def test_InfoMapSplitWriter_repr(self):
+        self.pbt.reprs_test_runner(InfoMapSplitWriter("/a/b/c"), InfoMapSplitWriter("/a/b/c", in_format='text'))
+
+    def test_InfoMapSplitWriter(self):
+        config_vars["__INSTL_DEFAULTS_FOLDER__"] = Path(os.path.dirname(__file__), "../..", "defaults")
+        config_vars["TARGET_REPO_REV"] = "7"
+        config_vars["MAIN_INFO_MAP_FILE_NAME"] = "info_map.txt"
+        config_vars["WZLIB_EXTENSION"] = ".wzip"
+        work_folder = self.pbt.path_inside_test_folder("instl")
+        index_path = self.pbt.path_inside_test_folder("index.yaml")
+        index_path.write_text("""--- !index
+A_IID:
+    name: AAA
+    install_sources: A
+    info_map: A_info_map.txt
+B_IID:
+    name: BBB
+    install_sources:
+        - B
+        - Common
+    info_map: B_info_map.txt
+C_IID:
+    name: CCC
+    install_sources: C
+""")
+        info_map_text = ("Mac, d, 1\nMac/A, d, 1\nMac/A/a.txt, f, 1, 11, 1\nMac/B, d, 2\nMac/B/b.txt, f, 2, 22, 2\n"
+                         "Mac/C, d, 3\nMac/C/c.txt, f, 3, 33, 3\nMac/Common, d, 4\nMac/Common/common.txt, f, 4, 44, 4\n")
+        db_manager = DBManager()
+        db_manager.info_map_table.clear_all()
+        db_manager.items_table.clear_tables()
+        info_map_text_file = io.StringIO(info_map_text)
+        info_map_text_file.name = "info_map.txt"
+        db_manager.info_map_table.read_from_text(info_map_text_file)
+        try:
+            with IndexYamlReader(index_path, report_own_progress=False) as iyr:
+                iyr()
+            with InfoMapSplitWriter(work_folder, report_own_progress=False) as imsw:
+                imsw()
+
+            def info_map_lines(file_name):
+                return work_folder.joinpath(file_name).read_text().splitlines()
+
+            self.assertEqual(info_map_lines("A_info_map.txt"), ["Mac/A, d, 1", "Mac/A/a.txt, f, 1, 11, 1"])
+            self.assertEqual(info_map_lines("B_info_map.txt"), ["Mac/B, d, 2", "Mac/B/b.txt, f, 2, 22, 2", "Mac/Common, d, 4", "Mac/Common/common.txt, f, 4, 44, 4"])
+            main_info_map_lines = info_map_lines("info_map.txt")
+            self.assertEqual(main_info_map_lines[:3], ["Mac, d, 1", "Mac/C, d, 3", "Mac/C/c.txt, f, 3, 33, 3"])
+            self.assertEqual(len(main_info_map_lines), 7)
+            for file_name in ("A_info_map.txt", "A_info_map.txt.wzip", "B_info_map.txt", "B_info_map.txt.wzip"):
+                file_path = work_folder.joinpath(file_name)
+                expected_line = f"instl/{file_name}, f, 7, {utils.get_file_checksum(file_path)}, {file_path.stat().st_size}"
+                self.assertIn(expected_line, main_info_map_lines)
+            for file_name in ("A_info_map.txt", "B_info_map.txt", "info_map.txt"):
+                unzipped = zlib.decompress(work_folder.joinpath(file_name + ".wzip").read_bytes()).decode()
+                self.assertEqual(unzipped.splitlines(), [line for line in info_map_lines(file_name) if not line.startswith("instl/")])
+        finally:
+            with db_manager.db.transaction() as curs:
+                curs.execute("""DELETE FROM iid_to_svn_item_t""")
+            db_manager.info_map_table.clear_all()
+            db_manager.items_table.clear_tables()
+
+    def test_read_wzip_info_map(self):
+        """ reading a .wzip info_map should give the same items as reading the uncompressed info_map """
+        info_map_text = "".join(f"Mac/folder_{i // 100}/file_{i}.txt, f, {i}, {i:040x}, {i * 7}\n" for i in range(5000))
+        info_map_path = self.pbt.path_inside_test_folder("info_map.txt")
+        info_map_path.write_text(info_map_text)
+        info_map_wzip_path = self.pbt.path_inside_test_folder("info_map.txt.wzip")
+        info_map_wzip_path.write_bytes(zlib.compress(info_map_text.encode()))
+
+        info_map_table = DBManager().info_map_table
+        try:
+            info_map_table.clear_all()
+            info_map_table.read_from_file(info_map_path)
+            items_from_text = [item.str_specific_fields(["path", "flags", "revision", "checksum", "size"]) for item in info_map_table.iter_items()]
+            info_map_table.clear_all()
+            info_map_table.read_from_file(info_map_wzip_path)
+            items_from_wzip = [item.str_specific_fields(["path", "flags", "revision", "checksum", "size"]) for item in info_map_table.iter_items()]
+            self.assertEqual(len(items_from_text), 5000)
+            self.assertEqual(items_from_text, items_from_wzip)
+        finally:
+            info_map_table.clear_all()
+
     @unittest.skip("too local to be a general test")
     def test_create_short_index(self):
         self.pbt.batch_accum.clear(section_name="doit")
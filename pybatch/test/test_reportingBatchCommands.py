@@ -13,6 +13,7 @@ import contextlib
 import filecmp
 import random
 import string
+import json
 from collections import namedtuple
 
 import utils
@@ -20,6 +21,7 @@ from pybatch import *
 from pybatch import PythonBatchCommandAccum
 from pybatch.copyBatchCommands import RsyncClone
 from configVar import config_vars
+from utils.progress_stream import default_progress_events_interval_sec
 
 current_os_names = utils.get_current_os_names()
 os_family_name = current_os_names[0]
@@ -73,6 +75,29 @@ class TestPythonBatchReporting(unittest.TestCase):
     def test_Stage(self):
         pass
 
+    def test_Stage_progress_events(self):
+        """ test that sections and commands report to the progress events stream
+        """
+        events_file = self.pbt.path_inside_test_folder("progress-events.jsonl")
+        self.pbt.batch_accum.clear(section_name="doit")
+        self.pbt.batch_accum += Progress("Tuti")
+        self.pbt.batch_accum += Progress("Fruti")
+        utils.progress_events.open_from_environment({"INSTL_PROGRESS_EVENTS": os.fspath(events_file), "INSTL_PROGRESS_EVENTS_INTERVAL_MS": "0"})
+        try:
+            self.pbt.exec_and_capture_output()
+        finally:
+            utils.progress_events.close()
+            utils.progress_events.min_interval_sec = default_progress_events_interval_sec
+        with open(events_file, "r", encoding='utf-8') as rfd:
+            events = [json.loads(line) for line in rfd]
+        self.assertEqual([event["stage"] for event in events if event["event"] == "stage_start"], ["doit", "epilog"])
+        self.assertEqual([event["stage"] for event in events if event["event"] == "stage_end"], ["doit", "epilog"])
+        self.assertIn("doit_sec", [event for event in events if event["event"] == "timings"][0])
+        progress_events = [event for event in events if event["event"] == "progress"]
+        self.assertEqual([event["doing"] for event in progress_events if event["command"] == "Progress"], ["Tuti", "Fruti"])
+        self.assertTrue(all(event["stage"].startswith("doit") for event in progress_events if event["command"] == "Progress"))
+        self.assertIsNone(events[-1]["error"])
+
     def test_Progress_repr(self):
         """ test that Progress.__repr__ is implemented correctly to fully
             reconstruct the object
@@ -31,6 +31,8 @@ config_vars["__CURRENT_OS_NAMES__"] = current_os_names
 
 
 from .test_PythonBatchBase import *
+from db import DBManager
+from svnTree.svnTable import SVNRow, SVNTable
 
 """
     Tests in the file are preformed against apache.org SVN servers.
@@ -134,3 +136,85 @@ class TestPythonBatchSVN(unittest.TestCase):
 
     def test_SVNCheckout_repr(self):
         self.pbt.reprs_test_runner(SVNCheckout(where="here", url="http://svn.apache.org/repos/asf/spamassassin/trunk", out_file="somewhere"))
+
+    def test_SVNInfoXMLReader_repr(self):
+        self.pbt.reprs_test_runner(SVNInfoXMLReader("info.xml"),
+                                   SVNInfoXMLReader("info.xml", props_file="props.xml", file_sizes_file="file-sizes.txt"))
+
+    def test_SVNInfoXMLReader(self):
+        """ reading svn info & proplist xml should give the same results as reading the text formats """
+        config_vars["__INSTL_DEFAULTS_FOLDER__"] = Path(os.path.dirname(__file__), "../..", "defaults")
+        info_text = """Path: .
+Revision: 9
+Node Kind: directory
+Last Changed Rev: 9
+
+Path: Mac
+Revision: 9
+Node Kind: directory
+Last Changed Rev: 7
+
+Path: Mac/a.txt
+Revision: 9
+Node Kind: file
+Last Changed Rev: 5
+Checksum: 5985e53ba61348d78a067b944f1e57c67f865162
+
+Path: Mac/b.wtar.aa
+Revision: 9
+Node Kind: file
+Last Changed Rev: 7
+Checksum: 1985e53ba61348d78a067b944f1e57c67f865162
+
+"""
+        info_xml = """<?xml version="1.0" encoding="UTF-8"?>
+<info>
+<entry kind="dir" path="." revision="9"><wc-info><depth>infinity</depth></wc-info><commit revision="9"><author>a</author></commit></entry>
+<entry kind="dir" path="Mac" revision="9"><wc-info><depth>infinity</depth></wc-info><commit revision="7"><author>a</author></commit></entry>
+<entry kind="file" path="Mac/a.txt" revision="9"><wc-info><checksum>5985e53ba61348d78a067b944f1e57c67f865162</checksum></wc-info><commit revision="5"><author>a</author></commit></entry>
+<entry kind="file" path="Mac/b.wtar.aa" revision="9"><wc-info><checksum>1985e53ba61348d78a067b944f1e57c67f865162</checksum></wc-info><commit revision="7"><author>a</author></commit></entry>
+</info>
+"""
+        props_text = """Properties on 'Mac/a.txt':
+  svn:executable
+  svn:mime-type
+  svn:keywords
+"""
+        props_xml = """<?xml version="1.0" encoding="UTF-8"?>
+<properties>
+<target path="Mac/a.txt"><property name="svn:executable"/><property name="svn:mime-type"/><property name="svn:keywords"/></target>
+</properties>
+"""
+        file_sizes_text = "Mac/a.txt, 17\nMac/b.wtar.aa, 1024\n"
+        files = {"info.txt": info_text, "info.xml": info_xml, "props.txt": props_text, "props.xml": props_xml, "file-sizes.txt": file_sizes_text}
+        for file_name, file_text in files.items():
+            self.pbt.path_inside_test_folder(file_name).write_text(file_text)
+
+        info_map_table = DBManager().info_map_table
+        try:
+            info_map_table.clear_all()
+            for file_name, a_format in (("info.txt", "info"), ("props.txt", "props"), ("file-sizes.txt", "file-sizes")):
+                info_map_table.read_from_file(self.pbt.path_inside_test_folder(file_name, assert_not_exist=False), a_format=a_format)
+            # _id & parent_id are not compared since they depend on the order of reading and indexing
+            fields_to_compare = [slot for slot in SVNRow.__slots__ if slot not in ("_id", "parent_id")]
+            items_from_text = [[getattr(item, field) for field in fields_to_compare] for item in info_map_table.get_items()]
+
+            info_map_table.clear_all()
+            self.pbt.batch_accum.clear(section_name="doit")
+            self.pbt.batch_accum += SVNInfoXMLReader(self.pbt.path_inside_test_folder("info.xml", assert_not_exist=False),
+                                                     props_file=self.pbt.path_inside_test_folder("props.xml", assert_not_exist=False),
+                                                     file_sizes_file=self.pbt.path_inside_test_folder("file-sizes.txt", assert_not_exist=False))
+            self.pbt.exec_and_capture_output()
+            items_from_xml = [[getattr(item, field) for field in fields_to_compare] for item in info_map_table.get_items()]
+
+            self.assertEqual(len(items_from_xml), 3)
+            self.assertEqual(items_from_text, items_from_xml)
+            self.assertEqual(info_map_table.comments, [f"Original file {self.pbt.path_inside_test_folder(file_name, assert_not_exist=False)}"
+                                                       for file_name in ("info.xml", "props.xml", "file-sizes.txt")])
+        finally:
+            info_map_table.clear_all()
+
+    def test_read_file_sizes_to_dict(self):
+        file_sizes_path = self.pbt.path_inside_test_folder("file-sizes.txt")
+        file_sizes_path.write_text("# comment\nMac/a, b.txt, 17\nweird line\nMac/c.txt, 1024\n")
+        self.assertEqual(SVNTable.read_file_sizes_to_dict(file_sizes_path), {"Mac/a, b.txt": 17, "Mac/c.txt": 1024})
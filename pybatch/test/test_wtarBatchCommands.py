@@ -1,6 +1,8 @@
 #!/usr/bin/env python3.9
 
 
+import subprocess
+import sys
 import unittest
 
 from pybatch import *
@@ -73,6 +75,61 @@ class TestPythonBatchWtar(unittest.TestCase):
         dir_wtar_unwtar_diff = filecmp.dircmp(folder_to_wtar, unwtared_folder, ignore=['.DS_Store'])
         self.assertTrue(is_identical_dircmp(dir_wtar_unwtar_diff), f"{self.pbt.which_test} : before wtar and after unwtar dirs are not the same")
 
+    def test_ParallelWtar_repr(self):
+        list_of_objs = list()
+        list_of_objs.append(ParallelWtar(["/the/memphis/belle"]))
+        list_of_objs.append(ParallelWtar(["/the/memphis/belle", "/the/enola/gay"], split_threshold=1024))
+        list_of_objs.append(ParallelWtar(["/the/memphis/belle"], remove_original=True, max_processes=3))
+        self.pbt.reprs_test_runner(*list_of_objs)
+
+    def test_ParallelWtar(self):
+        """ wtar some folders serially and in parallel and check the results are byte-identical """
+        folders_to_wtar = [self.pbt.path_inside_test_folder(f"folder-to-wtar-{i}") for i in range(4)]
+        serial_folder = self.pbt.path_inside_test_folder("serial")
+
+        self.pbt.batch_accum.clear(section_name="doit")
+        self.pbt.batch_accum += MakeDir(serial_folder)
+        for i, folder_to_wtar in enumerate(folders_to_wtar):
+            self.pbt.batch_accum += MakeDir(folder_to_wtar)
+            with self.pbt.batch_accum.sub_accum(Cd(folder_to_wtar)) as cd_accum:
+                cd_accum += MakeRandomDirs(num_levels=2, num_dirs_per_level=i+1, num_files_per_dir=3, file_size=1024)
+        for folder_to_wtar in folders_to_wtar:
+            self.pbt.batch_accum += Wtar(folder_to_wtar, serial_folder, split_threshold=4096)
+        self.pbt.batch_accum += ParallelWtar(folders_to_wtar, split_threshold=4096, max_processes=2)
+        self.pbt.exec_and_capture_output("wtar serially and in parallel")
+
+        for folder_to_wtar in folders_to_wtar:
+            self.assertTrue(folder_to_wtar.is_dir(), f"{folder_to_wtar} should not have been removed")
+            parallel_parts = utils.find_split_files(folder_to_wtar.parent.joinpath(folder_to_wtar.name+".wtar.aa"))
+            serial_parts = utils.find_split_files(serial_folder.joinpath(folder_to_wtar.name+".wtar.aa"))
+            self.assertEqual([p.name for p in serial_parts], [p.name for p in parallel_parts])
+            for serial_part, parallel_part in zip(serial_parts, parallel_parts):
+                self.assertTrue(filecmp.cmp(serial_part, parallel_part, shallow=False), f"'{serial_part}' and '{parallel_part}' should be identical")
+
+    def test_ParallelWtar_standalone_script(self):
+        """ run a batch file with ParallelWtar as a script, workers must not run the batch file again """
+        folders_to_wtar = [self.pbt.path_inside_test_folder(f"folder-to-wtar-{i}") for i in range(3)]
+        run_count_file = self.pbt.path_inside_test_folder("run-count.txt")
+
+        self.pbt.batch_accum.clear(section_name="doit")
+        self.pbt.batch_accum += AppendFileToFile(self.pbt.path_inside_test_folder("one-line.txt"), run_count_file)
+        for i, folder_to_wtar in enumerate(folders_to_wtar):
+            self.pbt.batch_accum += MakeDir(folder_to_wtar)
+            with self.pbt.batch_accum.sub_accum(Cd(folder_to_wtar)) as cd_accum:
+                cd_accum += MakeRandomDirs(num_levels=1, num_dirs_per_level=i+1, num_files_per_dir=2, file_size=512)
+        self.pbt.batch_accum += ParallelWtar(folders_to_wtar, max_processes=2)
+        self.pbt.path_inside_test_folder("one-line.txt").write_text("ran\n")
+        self.pbt.write_python_batch_file("parallel wtar as a script")
+
+        # when instl runs a batch file these are set by InvocationReporter, but logging is configured before that
+        environ = dict(os.environ, VENDOR_NAME="Waves Audio", APPLICATION_NAME="instl",
+                       XDG_DATA_HOME=os.fspath(self.pbt.path_inside_test_folder("data-home")))
+        completed = subprocess.run([sys.executable, self.pbt.python_batch_file_path], env=environ, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, timeout=120)
+        self.assertEqual(completed.returncode, 0, completed.stdout.decode(errors='replace'))
+        self.assertEqual(run_count_file.read_text(), "ran\n")
+        for folder_to_wtar in folders_to_wtar:
+            self.assertTrue(folder_to_wtar.parent.joinpath(folder_to_wtar.name+".wtar.aa").is_file())
+
     def test_Wzip_repr(self):
         list_of_objs = list()
         list_of_objs.append(Wzip("/the/memphis/belle"))
@@ -1,10 +1,12 @@
 import filecmp
 import logging
+import multiprocessing
 import os
 import stat
 import tarfile
 import zipfile
 from collections import OrderedDict
+from concurrent import futures
 from pathlib import Path
 from typing import List
 
@@ -14,7 +16,7 @@ import utils
 from configVar import config_vars
 from .baseClasses import PythonBatchCommandBase
 from .fileSystemBatchCommands import SplitFile, FixAllPermissions, MakeDir
-from .removeBatchCommands import RmDir, RmFile
+from .removeBatchCommands import RmDir, RmFile, RmFileOrDir
 
 log = logging.getLogger(__name__)
 
@@ -168,6 +170,137 @@ class Wtar(PythonBatchCommandBase):
                 log.debug(f"{resolved_what_to_wtar.name} skipped since {resolved_what_to_wtar.name}.wtar already exists and has the same contents")
 
 
+# config vars that Wtar reads at runtime and must therefore be passed to ParallelWtar worker processes
+config_vars_for_wtar_workers = ("WTAR_IGNORE_FILES", "FIX_ALL_PERMISSIONS_SYMBOLIC_MODE", "ACTING_UID", "ACTING_GID")
+
+
+def _wtar_workers_context():
+    """ multiprocessing context for ParallelWtar worker processes, or None if workers cannot be used.
+        Workers are forked, spawned workers would re-import the __main__ module, which for a batch file
+        run as a script, or for a frozen instl, means running the batch again in each worker.
+    """
+    retVal = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        retVal = multiprocessing.get_context("fork")
+    return retVal
+
+
+def _init_wtar_worker(config_vars_values):
+    """ initializer for ParallelWtar worker processes, config_vars needed by Wtar are set explicitly
+        so workers do not depend on the state config_vars had when the pool was created
+    """
+    PythonBatchCommandBase.ignore_progress = True
+    for var_name, var_values in config_vars_values.items():
+        config_vars[var_name] = var_values
+    utils.set_acting_ids(config_vars.get("ACTING_UID", -1).int(), config_vars.get("ACTING_GID", -1).int())
+
+
+def _wtar_one_item(what_to_wtar, split_threshold, remove_original):
+    """ wtar a single file or folder exactly as Wtar does when run serially """
+    with Wtar(what_to_wtar, split_threshold=split_threshold, report_own_progress=False) as wtarer:
+        wtarer()
+    if remove_original:
+        with RmFileOrDir(what_to_wtar, report_own_progress=False) as remover:
+            remover()
+    return what_to_wtar
+
+
+def disk_item_size(item_path):
+    """ size of a file, or total size of files under a folder. Used to order wtar jobs largest first """
+    retVal = 0
+    try:
+        if os.path.isdir(item_path):
+            for item in utils.scandir_walk(item_path, report_dirs=False):
+                retVal += item.stat(follow_symlinks=False).st_size
+        else:
+            retVal = os.lstat(item_path).st_size
+    except OSError:
+        pass
+    return retVal
+
+
+class ParallelWtar(PythonBatchCommandBase):
+    """ wtar a list of files and folders inplace, using a pool of processes.
+        Each item is wtarred by Wtar in exactly the same way as when Wtar is called serially,
+        so the resulting archives are byte-identical.
+        Items are sorted by size and the largest are submitted first, so a big item
+        started last does not leave the other processes idle at the end.
+        The number of processes is max_processes, or if 0 WTAR_MAX_PARALLEL_PROCESSES, or if 0 the number of cpus.
+        Where processes cannot be forked (Windows) items are wtarred serially, Wtar changes the current
+        directory so threads cannot be used instead.
+        At most max_processes items are in flight at any time to bound memory usage.
+        If remove_original is True each item is removed after it was wtarred.
+    """
+    def __init__(self, items_to_wtar, split_threshold=0, remove_original=False, max_processes=0, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.items_to_wtar = list(items_to_wtar)
+        self.split_threshold = split_threshold
+        self.remove_original = remove_original
+        self.max_processes = max_processes
+
+    def repr_own_args(self, all_args: List[str]) -> None:
+        all_args.append(self.named__init__param("items_to_wtar", self.items_to_wtar))
+        all_args.append(self.optional_named__init__param("split_threshold", self.split_threshold, 0))
+        all_args.append(self.optional_named__init__param("remove_original", self.remove_original, False))
+        all_args.append(self.optional_named__init__param("max_processes", self.max_processes, 0))
+
+    def progress_msg_self(self) -> str:
+        return f"""Compress {len(self.items_to_wtar)} items inplace"""
+
+    def get_num_processes(self):
+        retVal = self.max_processes
+        if retVal <= 0:
+            retVal = int(config_vars.get("WTAR_MAX_PARALLEL_PROCESSES", "0"))
+        if retVal <= 0:
+            retVal = os.cpu_count() or 1
+        return retVal
+
+    def __call__(self, *args, **kwargs) -> None:
+        PythonBatchCommandBase.__call__(self, *args, **kwargs)
+        resolved_items = [utils.ExpandAndResolvePath(item) for item in self.items_to_wtar]
+        self.doing = f"""calculating size of {len(resolved_items)} items to wtar"""
+        jobs = sorted(((disk_item_size(item), item) for item in resolved_items), key=lambda job: job[0], reverse=True)
+        num_processes = min(self.get_num_processes(), max(len(jobs), 1))
+        workers_context = _wtar_workers_context()
+
+        if num_processes <= 1 or workers_context is None:
+            for _, item in jobs:
+                self.doing = f"""wtarring '{item}'"""
+                _wtar_one_item(item, self.split_threshold, self.remove_original)
+            return
+
+        config_vars_values = {var_name: config_vars[var_name].list() for var_name in config_vars_for_wtar_workers if var_name in config_vars}
+        self.doing = f"""wtarring {len(jobs)} items with {num_processes} processes"""
+        log.info(self.doing)
+        jobs_iter = iter(jobs)
+        num_done = 0
+        with futures.ProcessPoolExecutor(max_workers=num_processes,
+                                         mp_context=workers_context,
+                                         initializer=_init_wtar_worker,
+                                         initargs=(config_vars_values,)) as executor:
+            in_flight = dict()
+            try:
+                while True:
+                    while len(in_flight) < num_processes:
+                        job = next(jobs_iter, None)
+                        if job is None:
+                            break
+                        in_flight[executor.submit(_wtar_one_item, job[1], self.split_threshold, self.remove_original)] = job[1]
+                    if not in_flight:
+                        break
+                    done, _ = futures.wait(in_flight, return_when=futures.FIRST_COMPLETED)
+                    for a_future in done:
+                        item = in_flight.pop(a_future)
+                        self.doing = f"""wtarring '{item}'"""
+                        a_future.result()  # will raise if wtarring the item failed
+                        num_done += 1
+                        log.info(f"wtarred {num_done} of {len(jobs)} '{item}'")
+            except BaseException:
+                for a_future in in_flight:
+                    a_future.cancel()
+                raise
+
+
 class Unwtar(PythonBatchCommandBase):
     """ uncompress a wtar archive
     """
@@ -399,8 +532,7 @@ class Unwzip(PythonBatchCommandBase):
 
         self.doing = f"""unzipping '{resolved_what_to_unwzip}' to '{target_unwzip_file}''"""
         with open(resolved_what_to_unwzip, "rb") as rfd, open(target_unwzip_file, "wb") as wfd:
-            decompressed = zlib.decompress(rfd.read())
-            wfd.write(decompressed)
+            utils.unwzip_fd_to_fd(rfd, wfd)
 
 
 class ZipFlat(PythonBatchCommandBase):
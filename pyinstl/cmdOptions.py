@@ -67,7 +67,13 @@ class CommandLineOptions(object):
     __RUN_AS_ADMIN__ = OptionToConfigVar()
     __RUN_BATCH__ = OptionToConfigVar()
     __RUN_COMMAND_LIST_IN_PARALLEL__ = OptionToConfigVar()
+    __SERVER_SOCKET__ = OptionToConfigVar()
+    __SERVER_WARM_FILES__ = OptionToConfigVar()
     __SHA1_CHECKSUM__ = OptionToConfigVar()
+    __SHORT_INDEX_QUERY__ = OptionToConfigVar()
+    __SHORT_INDEX_QUERY_IIDS__ = OptionToConfigVar()
+    __SHORT_INDEX_QUERY_OSES__ = OptionToConfigVar()
+    __SHORT_INDEX_QUERY_REQUIRE__ = OptionToConfigVar()
     __SHORTCUT_PATH__ = OptionToConfigVar()
     __SHORTCUT_TARGET_PATH__ = OptionToConfigVar()
     __START_DYNAMIC_PROGRESS__ = OptionToConfigVar()
@@ -118,13 +124,16 @@ def prepare_args_parser(in_command):
             'check-checksum':       {'mode': 'do_something', 'options': ('in', 'prog',), 'help':  'check checksum for a list of files from info_map file'},
             'checksum':             {'mode': 'do_something', 'options': ('in',), 'help':  'calculate checksum for a file or folder'},
             'command-list':         {'mode': 'do_something', 'options': ('conf', 'prog', 'parallel'), 'help': 'do a list of commands from a file'},
+            'defaults-bundle':      {'mode': 'do_something', 'options': ('out',), 'help': 'create defaults.bundle with the defaults yaml files already parsed and the db schema already created'},
             'exec':                 {'mode': 'do_something', 'options': ('in', 'out', 'conf_opt'), 'help':  'Execute a python scrip'},
             'fail':                 {'mode': 'do_something', 'options': (), 'help': "fail and return exit code"},
             'help':                 {'mode': 'do_something', 'options': (), 'help':  'help'},
             'ls':                   {'mode': 'do_something', 'options': ('in', 'out', 'limit'), 'help':  'create a directory listing'},
             'parallel-run':         {'mode': 'do_something', 'options': ('in', ), 'help':  'Run processes in parallel'},
+            'query-short-index':    {'mode': 'do_something', 'options': ('in', 'out', 'output_format'), 'help':  'answer versions report, dependencies and what would change from resolved short index, local file or url'},
             'resolve':              {'mode': 'do_something', 'options': ('in', 'out', 'conf'), 'help':  'read --in file resolve $() style variables and write result to --out, definitions are given in --config-file'},
             'run-process':          {'mode': 'do_something', 'options': ('in_opt',), 'help':  'Run a processes with optional abort file'},
+            'serve':                {'mode': 'do_something', 'options': (), 'help':  'run commands sent to a unix socket from a warm process'},
             'test-import':          {'mode': 'do_something', 'options': (), 'help':  'test the import of required modules'},
             'translate_url':        {'mode': 'do_something', 'options': ('in',  'cred'), 'help':  'translate a url to be compatible with current connection'},
             'unwtar':               {'mode': 'do_something', 'options': ('in_opt', 'prog', 'out'), 'help':  'uncompress .wtar files in current (or in the --out) folder'},
@@ -368,6 +377,55 @@ def prepare_args_parser(in_command):
                                 dest='which_revision',
                                 help="all==work on all revisions even if above repo-rev, num=work on specific revision")
 
+    elif 'query-short-index' == in_command:
+        query_options = command_parser.add_argument_group(description=in_command+' arguments:')
+        query_options.add_argument('--query',
+                                required=False,
+                                nargs=1,
+                                default=['report'],
+                                choices=('report', 'changes', 'depends'),
+                                dest='__SHORT_INDEX_QUERY__',
+                                help="report: versions report, changes: what installing --iids would do, depends: dependencies of --iids")
+        query_options.add_argument('--iids',
+                                required=False,
+                                nargs='+',
+                                metavar='IID',
+                                dest='__SHORT_INDEX_QUERY_IIDS__',
+                                help="iids for changes and depends queries")
+        query_options.add_argument('--target-os', '--target_os',
+                                required=False,
+                                nargs='+',
+                                metavar='os-name',
+                                dest='__SHORT_INDEX_QUERY_OSES__',
+                                help="operating systems to query, default is the current os")
+        query_options.add_argument('--require',
+                                required=False,
+                                nargs=1,
+                                metavar='path-to-require-yaml',
+                                dest='__SHORT_INDEX_QUERY_REQUIRE__',
+                                help="require.yaml with the installed versions")
+    elif 'short-index' == in_command:
+        short_index_options = command_parser.add_argument_group(description=in_command+' arguments:')
+        short_index_options.add_argument('--resolved-out', '--resolved_out',
+                                required=False,
+                                nargs=1,
+                                metavar='path-to-resolved-short-index',
+                                dest='__RESOLVED_SHORT_INDEX_OUT__',
+                                help="also write resolved short index (json) for query-short-index to this path")
+    elif 'serve' == in_command:
+        serve_options = command_parser.add_argument_group(description=in_command+' arguments:')
+        serve_options.add_argument('--socket',
+                                required=True,
+                                nargs=1,
+                                metavar='path-to-unix-socket',
+                                dest='__SERVER_SOCKET__',
+                                help="unix socket to listen on, clients should set INSTL_SERVER_SOCKET to this path")
+        serve_options.add_argument('--warm',
+                                required=False,
+                                nargs='+',
+                                metavar='path-to-yaml-file',
+                                dest='__SERVER_WARM_FILES__',
+                                help="yaml files, such as index.yaml, to parse in advance")
     elif 'ls' == in_command:
         ls_options = command_parser.add_argument_group(description='output_format arguments:')
         ls_options.add_argument('--output-format','--output_format',
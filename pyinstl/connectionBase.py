@@ -6,13 +6,12 @@ import json
 import urllib.error
 import urllib.parse
 
-import requests
+import utils
 
 import logging
 
 log = logging.getLogger()
 
-from typing import Dict
 
 have_boto = False
 # try:
@@ -71,7 +70,6 @@ class ConnectionBase(object):
 class ConnectionHTTP(ConnectionBase):
     def __init__(self, config_vars) -> None:
         super().__init__(config_vars)
-        self.sessions: Dict[str, requests.Session] = dict()
 
     def open_connection(self, credentials):
         pass
@@ -87,14 +85,10 @@ class ConnectionHTTP(ConnectionBase):
         return retVal
 
     def get_session(self, url):
+        """ return the shared keep-alive session for url's netloc, see utils.get_http_session """
         netloc = urllib.parse.urlparse(url).netloc
-        session = self.sessions.get(netloc, None)
-        if session is None:
-            session = requests.Session()
-            session.verify=False
-            self.sessions[netloc] = session
-            headers = self.get_custom_headers(netloc)
-            session.headers.update(headers)
+        session = utils.get_http_session(url, verify_ssl=self.config_vars.get("VERIFY_SSL_CERTIFICATES", False).bool())
+        session.headers.update(self.get_custom_headers(netloc))
         return session
 
 
@@ -7,8 +7,6 @@ import itertools
 import subprocess
 from pathlib import Path, PurePath
 import sys
-from distutils.version import StrictVersion
-import functools
 import logging
 import re
 
@@ -111,8 +109,8 @@ cookie = {cookie_text}
                 match = re.search(r"curl\s+([0-9.]+)\s", proc.stdout.read())
 
                 if match is not None and len(match.groups()) > 0:
-                    curl_version = StrictVersion(match.group(1))
-                    min_version = StrictVersion(CUrlHelper.min_supported_parallel_curl_version)
+                    curl_version = tuple(int(part) for part in match.group(1).strip(".").split("."))
+                    min_version = tuple(int(part) for part in CUrlHelper.min_supported_parallel_curl_version.split("."))
                     if min_version > curl_version:
                         log.info(f"Detected a legacy curl version {match.group(1)}")
                     else:
@@ -124,15 +122,22 @@ cookie = {cookie_text}
     def use_internal_parallel(self):
         return config_vars["PARALLEL_DOWNLOAD_METHOD"].str() == "internal" and self.is_internal_parallel_supported()
 
-    def add_download_url(self, url, path, verbatim=False, size=0, download_last=False):
+    def use_download_queue(self):
+        """ download with instl's own prioritized and cancelable download queue instead of curl """
+        return config_vars.get("PARALLEL_DOWNLOAD_METHOD", "").str() == "queue"
+
+    def add_download_url(self, url, path, verbatim=False, size=0, download_last=False, priority=0, checksum=None):
+        """ priority: files with lower priority are downloaded first
+            checksum: if given, files downloaded with the download queue are verified against it
+        """
         if verbatim:
             translated_url = url
         else:
             translated_url = connectionBase.connection_factory(config_vars).translate_url(url)
         if download_last:
-            self.urls_to_download_last.append((translated_url, path, size))
+            self.urls_to_download_last.append((translated_url, path, size, priority, checksum))
         else:
-            self.urls_to_download.append((translated_url, path, size))
+            self.urls_to_download.append((translated_url, path, size, priority, checksum))
 
     def get_num_urls_to_download(self):
         return len(self.urls_to_download)+len(self.urls_to_download_last)
@@ -171,6 +176,21 @@ cookie = {cookie_text}
             fixed_path = short_file_path.replace("\\", "\\\\")
         return fixed_path
 
+    def max_bytes_per_second(self) -> int:
+        """ total bandwidth cap for downloading, 0 means no cap """
+        return max(0, config_vars.get("DOWNLOAD_MAX_BYTES_PER_SECOND", 0).int())
+
+    def curl_rate_limit_text(self, num_parallel_transfers) -> str:
+        """ curl's limit-rate is per transfer, so the total bandwidth cap is divided between parallel transfers """
+        retVal = ""
+        max_bytes_per_second = self.max_bytes_per_second()
+        if max_bytes_per_second > 0:
+            num_parallel_transfers = max(1, num_parallel_transfers)
+            retVal = f"limit-rate = {max(1, max_bytes_per_second // num_parallel_transfers)}\n"
+            if self.use_internal_parallel():
+                retVal += f"parallel-max = {num_parallel_transfers}\n"
+        return retVal
+
     def create_config_files(self, curl_config_folder, num_config_files):
         config_file_list = list()
 
@@ -193,6 +213,9 @@ cookie = {cookie_text}
             confi_file_text = self.external_parallel_header_text
             actual_num_config_files = int(max(0, min(len(self.urls_to_download), num_config_files)))
 
+        # internal parallel runs num_config_files transfers in a single curl process, external runs one transfer per process
+        rate_limit_text = self.curl_rate_limit_text(num_config_files if self.use_internal_parallel() else actual_num_config_files)
+
         if self.urls_to_download_last:
             actual_num_config_files += 1
 
@@ -209,21 +232,15 @@ cookie = {cookie_text}
             curl_config_header = confi_file_text.format(**config_options)
             # write the header in each file
             a_file.wfd.write(curl_config_header)
+            a_file.wfd.write(rate_limit_text)
 
         last_file = None
         if self.urls_to_download_last:
             last_file = config_file_list.pop()
 
-        def url_sorter(l, r):
-            """ smaller files should be downloaded first so the progress bar gets moving early. """
-            return l[2] - r[2]  # non Info.xml files are sorted by size
-
         cfig_file_cycler = itertools.cycle(config_file_list)
         total_url_num = 0
-        # No sorting for curl's parallel as the progress looks better when there are mixed sizes
-        sorted_by_size = self.urls_to_download if self.use_internal_parallel() else sorted(self.urls_to_download, key=functools.cmp_to_key(url_sorter))
-
-        for url, path, size in sorted_by_size:
+        for url, path, size, priority, checksum in self.sorted_urls_to_download():
             fixed_path = self.fix_path(path)
             file_details = next(cfig_file_cycler)
             file_details.wfd.write(f'''url = "{url}"\noutput = "{fixed_path}"\n\n''')
@@ -236,7 +253,7 @@ cookie = {cookie_text}
 
         if last_file:
             # write urls for files that should be downloaded last
-            for url, path, size in self.urls_to_download_last:
+            for url, path, size, priority, checksum in sorted(self.urls_to_download_last, key=lambda u: u[3]):
                 fixed_path = self.fix_path(path)
                 last_file.wfd.write(f'''url = "{url}"\noutput = "{fixed_path}"\n\n''')
                 last_file.num_urls += 1
@@ -252,6 +269,26 @@ cookie = {cookie_text}
 
         return config_file_list
 
+    def sorted_urls_to_download(self):
+        """ files with lower priority are downloaded first.
+            Within the same priority smaller files are downloaded first so the progress bar gets moving early.
+            No sorting by size for curl's parallel as the progress looks better when there are mixed sizes
+        """
+        if self.use_internal_parallel():
+            retVal = sorted(self.urls_to_download, key=lambda u: u[3])
+        else:
+            retVal = sorted(self.urls_to_download, key=lambda u: (u[3], u[2]))
+        return retVal
+
+    def create_download_queue_file(self, queue_file_path):
+        """ write all urls to a queue file to be downloaded by DownloadQueueRun """
+        queue = utils.DownloadQueue()
+        for url, path, size, priority, checksum in self.sorted_urls_to_download():
+            queue.add(url, path, size=size, priority=priority, checksum=checksum)
+        for url, path, size, priority, checksum in self.urls_to_download_last:
+            queue.add(url, path, size=size, priority=priority, last=True, checksum=checksum)
+        queue.save(queue_file_path)
+
     def create_download_instructions(self, dl_commands):
         """ Download is done be creating files with instructions for curl - curl config files.
             Another file is created containing invocations of curl with each of the config files
@@ -267,12 +304,17 @@ cookie = {cookie_text}
         MakeDir(curl_config_folder, chowner=True, own_progress_count=0, report_own_progress=False)()
 
         num_config_files = int(config_vars["PARALLEL_SYNC"])
-        # TODO: Move class someplace else
-        config_file_list = self.create_config_files(curl_config_folder, num_config_files)
-
-        actual_num_config_files = len(config_file_list)
+        if self.use_download_queue():  # no curl config files when downloading with the download queue
+            config_file_list = list()
+            actual_num_config_files = min(num_config_files, self.get_num_urls_to_download())
+        else:
+            # TODO: Move class someplace else
+            config_file_list = self.create_config_files(curl_config_folder, num_config_files)
+            actual_num_config_files = len(config_file_list)
         if actual_num_config_files > 0:
-            if num_config_files > 1:
+            if self.use_download_queue():
+                dl_start_message = f"Downloading with {actual_num_config_files} threads in parallel"
+            elif num_config_files > 1:
                 dl_start_message = f"Downloading with {num_config_files} processes in parallel"
             else:
                 dl_start_message = "Downloading with 1 process"
@@ -281,7 +323,17 @@ cookie = {cookie_text}
             total_files_to_download = int(config_vars["__NUM_FILES_TO_DOWNLOAD__"])
             total_bytes_to_download = int(config_vars["__NUM_BYTES_TO_DOWNLOAD__"])
 
-            if self.use_internal_parallel():
+            if self.use_download_queue():
+                queue_file_path = curl_config_folder.joinpath(config_vars.resolve_str("$(CURL_CONFIG_FILE_NAME).queue"))
+                self.create_download_queue_file(queue_file_path)
+                dl_commands += DownloadQueueRun(queue_file_path, max_workers=num_config_files,
+                                                cancel_file=config_vars.get("DOWNLOAD_CANCEL_FILE", "").str() or None,
+                                                abort_file=config_vars.get("ABORT_FILE", "").str() or None,
+                                                adaptive=config_vars.get("DOWNLOAD_ADAPTIVE_CONCURRENCY", True).bool(),
+                                                max_bytes_per_second=self.max_bytes_per_second(),
+                                                own_progress_count=total_files_to_download,
+                                                report_own_progress=False)
+            elif self.use_internal_parallel():
                 dl_commands += Progress(f"Downloading with curl parallel")
                 previously_downloaded_files = 0
                 for config_file in config_file_list:
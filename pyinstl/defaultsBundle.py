@@ -0,0 +1,109 @@
+#!/usr/bin/env python3.9
+
+""" defaults bundle: the yaml files of the defaults folder already composed, pickled to one file, and a template
+    db created from the create-*.ddl files, written next to it. Created by instl defaults-bundle when instl is compiled,
+    and loaded on start instead of parsing the yaml and ddl files.
+    Composed documents are found by the checksum of the file's text, so a yaml file that was changed
+    after the bundle was created is parsed as usual. New memory dbs are copied from the template db
+    with sqlite3.Connection.backup, only if the checksums of the ddl files did not change.
+    Documents are kept as composed and not as config var values, because values of !define_Mac/!define_Win
+    documents and __if__ conditions depend on the os and the command line, and are decided while reading.
+"""
+
+import os
+import sys
+import pickle
+import sqlite3
+from pathlib import Path
+import logging
+
+import yaml
+import aYaml
+import utils
+from db.dbMaster import DBMaster
+
+log = logging.getLogger()
+
+defaults_bundle_file_name = "defaults.bundle"
+schema_template_suffix = ".db"
+defaults_bundle_format_version = 2
+# same ddl files DBMaster.open runs for a new db
+schema_ddl_file_names = ("create-tables.ddl", "init-values.ddl", "create-indexes.ddl")
+
+loaded_bundle_paths = set()
+
+
+def bundle_compatibility():
+    """ a bundle can be loaded only by the python, pyyaml and sqlite versions that created it """
+    return {"format_version": defaults_bundle_format_version,
+            "python_version": list(sys.version_info[:2]),
+            "yaml_version": yaml.__version__,
+            "sqlite_version": sqlite3.sqlite_version}
+
+
+def schema_ddl_checksums(defaults_folder):
+    return {ddl_file_name: utils.get_file_checksum(Path(defaults_folder, ddl_file_name))
+            for ddl_file_name in schema_ddl_file_names}
+
+
+def schema_template_path(bundle_path):
+    return Path(bundle_path).with_name(Path(bundle_path).name + schema_template_suffix)
+
+
+def create_defaults_bundle(defaults_folder, bundle_path):
+    """ compose all yaml files in defaults_folder and pickle them to bundle_path,
+        create a db from the ddl files and write it next to bundle_path
+    """
+    yaml_file_paths = sorted(Path(defaults_folder).glob("*.yaml"))
+    composed_yaml = aYaml.ComposedYamlCache(max_texts=len(yaml_file_paths))
+    for yaml_file_path in yaml_file_paths:
+        composed_yaml.add_file(yaml_file_path)
+
+    bundle_path = Path(bundle_path)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    DBMaster.schema_templates.pop(os.fspath(defaults_folder), None)  # create the template from the ddl files, not from a previous bundle
+    schema_db = DBMaster(":memory:", Path(defaults_folder))
+    schema_db.open()
+    schema_db.backup_to_file(schema_template_path(bundle_path))
+    schema_db.close()
+
+    bundle = {"compatibility": bundle_compatibility(),
+              "composed_yaml": dict(composed_yaml.nodes_by_checksum),
+              "schema_ddl_checksums": schema_ddl_checksums(defaults_folder)}
+    temp_bundle_path = bundle_path.with_name(bundle_path.name + ".tmp")
+    with open(temp_bundle_path, "wb") as wfd:
+        pickle.dump(bundle, wfd, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_bundle_path, bundle_path)
+    return bundle
+
+
+def load_defaults_bundle(defaults_folder):
+    """ load defaults_folder/defaults.bundle if it exists and was created by compatible versions,
+        once per process. Return True if the bundle was loaded.
+    """
+    bundle_path = Path(defaults_folder, defaults_bundle_file_name)
+    if os.fspath(bundle_path) in loaded_bundle_paths:
+        return True
+    if not bundle_path.is_file():
+        return False
+    try:
+        with open(bundle_path, "rb") as rfd:
+            bundle = pickle.load(rfd)
+        if bundle["compatibility"] != bundle_compatibility():
+            log.debug(f"defaults bundle {bundle_path} was created by {bundle['compatibility']} not loading it")
+            return False
+        ddl_checksums_match = bundle["schema_ddl_checksums"] == schema_ddl_checksums(defaults_folder)
+    except Exception as ex:
+        log.debug(f"defaults bundle {bundle_path} was not loaded, {ex}")
+        return False
+
+    if not aYaml.composed_yaml_cache.enabled:
+        aYaml.composed_yaml_cache.enabled = True
+        aYaml.composed_yaml_cache.keep_misses = False
+    for checksum, nodes in bundle["composed_yaml"].items():
+        if checksum not in aYaml.composed_yaml_cache:
+            aYaml.composed_yaml_cache.add(checksum, nodes)
+    if ddl_checksums_match and schema_template_path(bundle_path).is_file():
+        DBMaster.set_schema_template(defaults_folder, schema_template_path(bundle_path))
+    loaded_bundle_paths.add(os.fspath(bundle_path))
+    return True
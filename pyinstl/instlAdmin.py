@@ -11,10 +11,11 @@ import multiprocessing as mp
 import time
 import datetime
 import re
-import redis
-import boto3
+# redis and boto3 are imported by the functions that use them, so other admin commands do not pay for importing them
 import threading
 import io
+import signal
+from collections import deque
 
 from dataclasses import dataclass
 import dictdiffer
@@ -33,6 +34,7 @@ def start_redis_heartbeat_thread(redis_host, redis_port, heartbeat_key, heartbea
     """
     def heartbeat_redis(redis_host, redis_port, heartbeat_key, heartbeat_interval):
         try:
+            import redis
             r = redis.StrictRedis(host=redis_host, port=redis_port, charset="utf-8", decode_responses=True)
             while True:
                 now_time = time.time()
@@ -48,6 +50,63 @@ def start_redis_heartbeat_thread(redis_host, redis_port, heartbeat_key, heartbea
     x.start()
 
 
+class ActionTriggerWorkerPool(object):
+    """ run action triggers in child processes, at most max_workers at the same time.
+        Triggers with the same serialization key (domain & major version) are run one after the other,
+        in the order they were submitted, so conflicting uploads still queue.
+        While a worker is running, a redis key heartbeat_redis_key:<worker name> is periodically set to the current time.
+    """
+    def __init__(self, max_workers, redis_instance, heartbeat_redis_key=None) -> None:
+        self.max_workers = max(max_workers, 1)
+        self.redis_instance = redis_instance
+        self.heartbeat_redis_key = heartbeat_redis_key
+        self.pending = deque()  # (serialization_key, process) waiting to be started
+        self.running = dict()   # serialization_key -> process
+
+    def can_accept(self):
+        return len(self.running) < self.max_workers and len(self.pending) < self.max_workers
+
+    def is_idle(self):
+        return not self.running and not self.pending
+
+    def submit(self, serialization_key, process):
+        self.pending.append((serialization_key, process))
+        self.schedule()
+
+    def worker_heartbeat_key(self, process):
+        return f"{self.heartbeat_redis_key}:{process.name}"
+
+    def schedule(self):
+        """ join finished workers, start pending workers if possible and beat the heart of the running ones """
+        for serialization_key, process in list(self.running.items()):
+            if not process.is_alive():
+                process.join()
+                del self.running[serialization_key]
+                log.info(f"{process.name} finished with exit code {process.exitcode}")
+                if self.heartbeat_redis_key:
+                    self.redis_instance.delete(self.worker_heartbeat_key(process))
+
+        still_pending = deque()
+        while self.pending:
+            serialization_key, process = self.pending.popleft()
+            if len(self.running) < self.max_workers and serialization_key not in self.running:
+                log.info(f"starting {process.name}")
+                process.start()
+                self.running[serialization_key] = process
+            else:
+                still_pending.append((serialization_key, process))
+        self.pending = still_pending
+
+        if self.heartbeat_redis_key:
+            now_str = str(datetime.datetime.now())
+            for process in self.running.values():
+                self.redis_instance.set(self.worker_heartbeat_key(process), now_str)
+
+    def in_progress_str(self):
+        retVal = ", ".join(process.name for process in self.running.values())
+        return retVal
+
+
 def smart_merge_dicts(by_os_dict):
     """ merge dicts by OS according to instl conventions
         by_os_dict is in the form {"Linux": {...}, "Mac": {...}, "Win": {...}}
@@ -221,25 +280,21 @@ class InstlAdmin(InstlInstanceBase):
             self.progress(cd_repo_folder.progress_msg())
             cd_repo_folder()
 
-            props_file = work_folder_path.joinpath("svn-proplist-for-fix-props.txt")
+            props_file = work_folder_path.joinpath("svn-proplist-for-fix-props.xml")
             self.progress(f"get svn proplist to {props_file}")
-            with SVNPropList(out_file=props_file) as props_getter:
+            with SVNPropList(xml=True, out_file=props_file) as props_getter:
                 self.progress(props_getter.progress_msg_self())
                 props_getter()
 
-            info_file = work_folder_path.joinpath("svn-info-for-fix-props.txt")
+            info_file = work_folder_path.joinpath("svn-info-for-fix-props.xml")
             self.progress(f"get svn info to {info_file}")
-            with SVNInfo(out_file=info_file) as info_getter:
+            with SVNInfo(xml=True, out_file=info_file) as info_getter:
                 self.progress(info_getter.progress_msg_self())
                 info_getter()
 
-        with SVNInfoReader(info_file, format='info') as info_reader:
+        with SVNInfoXMLReader(info_file, props_file=props_file) as info_reader:
             self.progress(info_reader.progress_msg_self())
             info_reader()
-
-        with SVNInfoReader(props_file, format='props') as props_reader:
-            self.progress(props_reader.progress_msg_self())
-            props_reader()
         PythonBatchCommandBase.ignore_progress = False
 
         should_be_exec_regex_list = list(config_vars["EXEC_PROP_REGEX"])
@@ -489,29 +544,16 @@ class InstlAdmin(InstlInstanceBase):
             pass
         return _should_wtar, _already_tarred
 
-    def do_wtar_staging_folder(self):
-        self.batch_accum.set_current_section('admin')
-        self.prepare_conditions_for_wtar()
-
-        stage_folder = config_vars["STAGING_FOLDER"].Path()
-        items_to_check = self.prepare_list_of_dirs_to_work_on(stage_folder)
-        if tuple(items_to_check) == (stage_folder,):
-            self.progress("wtar for the whole repository")
-        else:
-            self.progress("wtar limited to ", "; ".join([os.fspath(i) for i in items_to_check]))
-
-        for a_folder in items_to_check:
-            self.batch_accum += Unlock(a_folder, recursive=True)
-            self.batch_accum += RmGlob(a_folder, '**/.DS_Store')
-            self.batch_accum += RmGlob(a_folder, '**/*~*')
-            self.batch_accum += Progress(f"delete ignored files in {a_folder}")
-
-        total_items_to_tar = 0
-        total_redundant_wtar_files = 0
+    def plan_wtar_jobs(self, items_to_check):
+        """ walk the items in items_to_check and decide which items should be wtarred
+            and which old .wtar files should be deleted.
+            return a tuple: (list of items to wtar, list of old wtar files to delete)
+        """
+        items_to_check = list(items_to_check)
+        items_to_tar = list()
+        items_to_delete = list()  # these are .wtar files for items that no longer need wtarring, or will be re-wtarred
         while len(items_to_check) > 0:
             item_to_check = items_to_check.pop(0)
-            items_to_tar = list()
-            items_to_delete = list()  # these are .wtar files for items that no longer need wtarring
             if not self.already_wtarred_regex.search(os.fspath(item_to_check)) and not item_to_check.is_symlink():
 
                 # the item is not a wtar file, so whether it needs wtarring or not,
@@ -528,20 +570,37 @@ class InstlAdmin(InstlInstanceBase):
                     if item_to_check.is_dir():
                         more_paths_to_check = [Path(ent) for ent in sorted(list(os.scandir(item_to_check)), key=lambda i: i.is_dir())]
                         items_to_check.extend(more_paths_to_check)
+        return items_to_tar, items_to_delete
 
-                if items_to_tar or items_to_delete:
-                    total_items_to_tar += len(items_to_tar)
+    def do_wtar_staging_folder(self):
+        self.batch_accum.set_current_section('admin')
+        self.prepare_conditions_for_wtar()
 
-                    for item_to_delete in items_to_delete:
-                        self.batch_accum += RmFile(item_to_delete)
+        stage_folder = config_vars["STAGING_FOLDER"].Path()
+        items_to_check = self.prepare_list_of_dirs_to_work_on(stage_folder)
+        if tuple(items_to_check) == (stage_folder,):
+            self.progress("wtar for the whole repository")
+        else:
+            self.progress("wtar limited to ", "; ".join([os.fspath(i) for i in items_to_check]))
 
-                    for item_to_tar in items_to_tar:
-                        self.batch_accum += Wtar(item_to_tar, split_threshold=self.min_file_size_to_wtar)
-                        self.batch_accum += RmFileOrDir(item_to_tar)
+        for a_folder in items_to_check:
+            self.batch_accum += Unlock(a_folder, recursive=True)
+            self.batch_accum += RmGlob(a_folder, '**/.DS_Store')
+            self.batch_accum += RmGlob(a_folder, '**/*~*')
+            self.batch_accum += Progress(f"delete ignored files in {a_folder}")
+
+        items_to_tar, items_to_delete = self.plan_wtar_jobs(items_to_check)
+
+        # all old wtar parts are removed before any wtarring starts, since the wtar jobs run in parallel
+        for item_to_delete in items_to_delete:
+            self.batch_accum += RmFile(item_to_delete)
 
-        self.progress("found", total_items_to_tar, "to wtar")
-        if total_redundant_wtar_files:
-            self.progress(total_redundant_wtar_files, "redundant wtar files will be removed")
+        if items_to_tar:
+            self.batch_accum += ParallelWtar(items_to_tar, split_threshold=self.min_file_size_to_wtar, remove_original=True)
+
+        self.progress("found", len(items_to_tar), "to wtar")
+        if items_to_delete:
+            self.progress(len(items_to_delete), "redundant wtar files will be removed")
 
         self.write_batch_file(self.batch_accum)
         if bool(config_vars["__RUN_BATCH__"]):
@@ -928,6 +987,7 @@ class InstlAdmin(InstlInstanceBase):
         redis_host = config_vars['REDIS_HOST'].str()  # redis-server ip
         redis_port = config_vars['REDIS_PORT'].int()  # redis-server port
 
+        import redis
         r = redis.StrictRedis(host=redis_host, port=redis_port, charset="utf-8", decode_responses=True)
         try:
 
@@ -943,6 +1003,7 @@ class InstlAdmin(InstlInstanceBase):
 
             revision_instl_index_path = Path(config_vars["UPLOAD_REVISION_INDEX_FILE"])
             checkout_folder_short_index_path = Path(config_vars["UPLOAD_REVISION_SHORT_INDEX_FILE"])
+            resolved_short_index_path = checkout_folder_short_index_path.parent.joinpath(config_vars["RESOLVED_SHORT_INDEX_FILE_NAME"].str())
 
             batch_accum.set_current_section('admin')
             # checkout specific repo-rev to base folder
@@ -952,7 +1013,7 @@ class InstlAdmin(InstlInstanceBase):
             skip_some_actions = False  # to save time during debugging
 
             batch_accum += IndexYamlReader(revision_instl_index_path)
-            batch_accum += ShortIndexYamlCreator(checkout_folder_short_index_path)
+            batch_accum += ShortIndexYamlCreator(checkout_folder_short_index_path, resolved_short_index_path=resolved_short_index_path)
             base_rev = int(config_vars["BASE_REPO_REV"])
             if base_rev > 0:
                 batch_accum += SetBaseRevision(base_rev)
@@ -961,6 +1022,7 @@ class InstlAdmin(InstlInstanceBase):
             if not skip_some_actions:
                 with batch_accum.sub_accum(Cd(revision_folder_path)) as sub_accum:
                     sub_accum += Subprocess("aws", "s3", "cp", os.fspath(checkout_folder_short_index_path), "s3://$(S3_BUCKET_NAME)/$(REPO_NAME)/$(__CURR_REPO_FOLDER_HIERARCHY__)/instl/"+checkout_folder_short_index_path.name, "--content-type", 'text/plain')
+                    sub_accum += Subprocess("aws", "s3", "cp", os.fspath(resolved_short_index_path), "s3://$(S3_BUCKET_NAME)/$(REPO_NAME)/$(__CURR_REPO_FOLDER_HIERARCHY__)/instl/"+resolved_short_index_path.name, "--content-type", 'application/json')
                     repo_rev_file_path = config_vars["UPLOAD_REVISION_REPO_REV_FILE"].Path()
                     sub_accum += Subprocess("aws", "s3", "cp", os.fspath(repo_rev_file_path), "s3://$(S3_BUCKET_NAME)/admin/"+repo_rev_file_path.name, "--content-type", 'text/plain')
                     sub_accum += Subprocess("aws", "s3", "cp", os.fspath(repo_rev_file_path), "s3://$(S3_BUCKET_NAME)/$(REPO_NAME)/$(__CURR_REPO_FOLDER_HIERARCHY__)/instl/"+repo_rev_file_path.name, "--content-type", 'text/plain')
@@ -987,6 +1049,7 @@ class InstlAdmin(InstlInstanceBase):
         redis_host = config_vars['REDIS_HOST'].str()  # redis-server ip
         redis_port = config_vars['REDIS_PORT'].int()  # redis-server port
 
+        import redis
         r = redis.StrictRedis(host=redis_host, port=redis_port, charset="utf-8", decode_responses=True)
         try:
 
@@ -1006,8 +1069,9 @@ class InstlAdmin(InstlInstanceBase):
             revision_instl_index_path = Path(config_vars["UPLOAD_REVISION_INDEX_FILE"])
 
             checkout_folder_short_index_path = revision_instl_folder_path.joinpath("short-index.yaml")
-            info_map_info_path = revision_instl_folder_path.joinpath("info_map.info")
-            info_map_props_path = revision_instl_folder_path.joinpath("info_map.props")
+            resolved_short_index_path = revision_instl_folder_path.joinpath(config_vars["RESOLVED_SHORT_INDEX_FILE_NAME"].str())
+            info_map_info_path = revision_instl_folder_path.joinpath("info_map.info.xml")
+            info_map_props_path = revision_instl_folder_path.joinpath("info_map.props.xml")
             info_map_file_sizes_path = revision_instl_folder_path.joinpath("info_map.file-sizes")
             full_info_map_file_path = revision_instl_folder_path.joinpath(str(config_vars['FULL_INFO_MAP_FILE_NAME']))
 
@@ -1029,14 +1093,12 @@ class InstlAdmin(InstlInstanceBase):
             batch_accum += MakeDir(revision_folder_path)  # create specific repo-rev folder
             batch_accum += MakeDir(revision_instl_folder_path)  # create specific repo-rev instl folder
             with batch_accum.sub_accum(Cd(checkout_base_folder)) as sub_accum:
-                sub_accum += SVNInfo(url=".", out_file=info_map_info_path, skip_action=skip_some_actions, stderr_means_err=False)
-                sub_accum += SVNPropList(url=".", out_file=info_map_props_path, skip_action=skip_some_actions, stderr_means_err=False)
+                sub_accum += SVNInfo(url=".", xml=True, out_file=info_map_info_path, skip_action=skip_some_actions, stderr_means_err=False)
+                sub_accum += SVNPropList(url=".", xml=True, out_file=info_map_props_path, skip_action=skip_some_actions, stderr_means_err=False)
                 sub_accum += FileSizes(folder_to_scan=checkout_base_folder, out_file=info_map_file_sizes_path, skip_action=skip_some_actions)
 
             batch_accum += IndexYamlReader(checkout_folder_index_path)
-            batch_accum += SVNInfoReader(info_map_info_path, format='info', disable_indexes_during_read=True)
-            batch_accum += SVNInfoReader(info_map_props_path, format='props')
-            batch_accum += SVNInfoReader(info_map_file_sizes_path, format='file-sizes')
+            batch_accum += SVNInfoXMLReader(info_map_info_path, props_file=info_map_props_path, file_sizes_file=info_map_file_sizes_path)
             base_rev = int(config_vars["BASE_REPO_REV"])
             if base_rev > 0:
                 batch_accum += SetBaseRevision(base_rev)
@@ -1049,11 +1111,13 @@ class InstlAdmin(InstlInstanceBase):
             batch_accum += InfoMapFullWriter(full_info_map_file_path, in_format='text')
             batch_accum += InfoMapSplitWriter(revision_instl_folder_path, in_format='text')
             batch_accum += Wzip(revision_instl_index_path)
-            batch_accum += ShortIndexYamlCreator(checkout_folder_short_index_path)
+            batch_accum += ShortIndexYamlCreator(checkout_folder_short_index_path, resolved_short_index_path=resolved_short_index_path)
             batch_accum += CreateRepoRevFile()
 
+            batch_accum += UploadRepoRevToS3(revision_folder_path, repo_rev, "$(S3_BUCKET_NAME)", "$(REPO_NAME)/$(__CURR_REPO_FOLDER_HIERARCHY__)",
+                                             multipart_threshold=config_vars["S3_UPLOAD_MULTIPART_THRESHOLD"].int(),
+                                             multipart_chunksize=config_vars["S3_UPLOAD_MULTIPART_CHUNK_SIZE"].int())
             with batch_accum.sub_accum(Cd(revision_folder_path)) as sub_accum:
-                sub_accum += Subprocess("aws", "s3", "sync", os.curdir, "s3://$(S3_BUCKET_NAME)/$(REPO_NAME)/$(__CURR_REPO_FOLDER_HIERARCHY__)", "--exclude", "*.DS_Store")
                 repo_rev_file_path = config_vars["UPLOAD_REVISION_REPO_REV_FILE"].Path()
                 sub_accum += Subprocess("aws", "s3", "cp", os.fspath(repo_rev_file_path), "s3://$(S3_BUCKET_NAME)/admin/"+repo_rev_file_path.name, "--content-type", 'text/plain')
             batch_accum += RmDirContents(revision_folder_path, exclude=['instl'])
@@ -1119,22 +1183,41 @@ class InstlAdmin(InstlInstanceBase):
         if heartbeat_redis_key:
             start_redis_heartbeat_thread(redis_host, redis_port, heartbeat_redis_key, 2.0)
 
+        import redis
         r = redis.StrictRedis(host=redis_host, port=redis_port, charset="utf-8", decode_responses=True)
         self.report_instl_info_to_redis(r)
         trigger_keys_to_wait_on = (waiting_list_redis_key,)
-        while True:
+
+        # number of triggers processed at the same time, triggers for the same domain & major version are never processed concurrently
+        worker_pool = ActionTriggerWorkerPool(config_vars.get("ACTION_TRIGGER_MAX_WORKERS", 1).int(), r, heartbeat_redis_key)
+
+        # on "stop" trigger or SIGTERM, stop popping triggers and wait for running and queued triggers to finish
+        stop_requested = False
+
+        def request_stop(signum, frame):
+            nonlocal stop_requested
+            log.info(f"received signal {signum}, stopping after running triggers are done")
+            stop_requested = True
+        signal.signal(signal.SIGTERM, request_stop)
+
+        while not (stop_requested and worker_pool.is_idle()):
+            worker_pool.schedule()
+            r.set(config_vars["IN_PROGRESS_REDIS_KEY"].str(), worker_pool.in_progress_str() or "waiting...")
+            if stop_requested or not worker_pool.can_accept():
+                time.sleep(2)
+                continue
+
             self.print_wait_on_action_trigger_info(redis_host, redis_port, waiting_list_redis_key)
-            r.set(config_vars["IN_PROGRESS_REDIS_KEY"].str(), "waiting...")
-            poped = r.brpop(trigger_keys_to_wait_on, timeout=30)
+            # when workers are running, do not block for long so finished workers are reaped and queued triggers started
+            poped = r.brpop(trigger_keys_to_wait_on, timeout=30 if worker_pool.is_idle() else 2)
             if poped is not None:
                 key = str(poped[0])
                 value = str(poped[1])
-                r.set(config_vars["IN_PROGRESS_REDIS_KEY"].str(), value)
 
                 log.info(f"popped key: {key}, value: {value}")
                 if value == "stop":
                     log.info(f"received stop")
-                    break
+                    stop_requested = True
                 elif value == "ping":
                     ping_redis_key = f"{key}:ping"
                     r.incr(ping_redis_key, 1)
@@ -1145,61 +1228,64 @@ class InstlAdmin(InstlInstanceBase):
                 else:
                     with config_vars.push_scope_context(use_cache=True):
                         try:
-                            what_to_do, domain, major_version, repo_rev = value.split(":")
-                            instl_command_name = {'upload': "up2s3", 'up2s3': "up2s3", 'activate': "activate-repo-rev", "short-index": "up-short-index" }[what_to_do.lower()]
-                            config_vars["TARGET_DOMAIN"] = domain
-                            config_vars["TARGET_MAJOR_VERSION"] = major_version
-                            config_vars["TARGET_REPO_REV"] = repo_rev
-                            log.info(f"{key} triggered domain: {domain} major_version: {major_version} repo-rev {repo_rev}")
-                            config_vars["TARGET_WORK_FOLDER"] = self.get_work_folder()
-
-                            domain_major_version_config_folder = main_config_folder.joinpath(domain, major_version)
-                            domain_major_version_config_file = domain_major_version_config_folder.joinpath("config.yaml")
-                            up2s3_yaml_dict = {
-                                "__include__": [os.fspath(domain_major_version_config_file),
-                                                os.fspath(main_input_file)],
-                                'TARGET_DOMAIN': domain,
-                                'TARGET_MAJOR_VERSION': major_version,
-                                'TARGET_REPO_REV': repo_rev,
-                                'TARGET_WORK_FOLDER': config_vars["TARGET_WORK_FOLDER"].str(),
-                            }
-                            define_dict = aYaml.YamlDumpDocWrap(up2s3_yaml_dict,
-                                                                '!define', "definitions",
-                                                                explicit_start=True, sort_mappings=False)
-
-                            work_config_file = config_vars["TARGET_WORK_FOLDER"].Path().joinpath(f"{instl_command_name}_{domain}_{major_version}_{repo_rev}.yaml")
-                            with utils.utf8_open_for_write(work_config_file, "w") as wfd:
-                                aYaml.writeAsYaml(define_dict, wfd)
-
-                            work_log_file = config_vars["TARGET_WORK_FOLDER"].Path().joinpath(f"{instl_command_name}_{domain}_{major_version}_{repo_rev}.log")
-                            log_files = config_vars.get("OPEN_LOG_FILES", []).list()
-                            log_files.append(work_log_file)
-                            log_files = [os.fspath(log_file) for log_file in log_files]
-                            mp_context = mp.get_context("spawn")
-                            up2s3_process = mp_context.Process (target=instl_own_main,
-                                                        name=f"{instl_command_name}_{domain}_{major_version}_{repo_rev}",
-                                                        args=([str(config_vars["__INSTL_EXE_PATH__"]),
-                                                              instl_command_name,
-                                                               "--config-file", os.fspath(work_config_file),
-                                                               "--log", *log_files,
-                                                               "--db", ":file:",    # let instl will decide where the db file is placed
-                                                               "--run"],))
-
-                            up2s3_process.start()
-                            up2s3_process.join()
-
+                            serialization_key, trigger_process = self.create_action_trigger_process(key, value, main_input_file, main_config_folder, instl_own_main)
+                            worker_pool.submit(serialization_key, trigger_process)
                         except Exception as ex:
                             log.info(f"Exception {ex} while handling {key} {value}")
 
-            r.set(config_vars["IN_PROGRESS_REDIS_KEY"].str(), "waiting...")
-            time.sleep(2)
         log.info(f"stopped waiting on {trigger_keys_to_wait_on}")
         r.set(config_vars["IN_PROGRESS_REDIS_KEY"].str(), "stopped")
 
+    def create_action_trigger_process(self, key, value, main_input_file, main_config_folder, instl_own_main):
+        """ prepare a child process that will run the instl command for a trigger such as upload:domain:version:repo-rev
+            return the serialization key of the trigger (domain, major version) and the process, which is not started
+        """
+        what_to_do, domain, major_version, repo_rev = value.split(":")
+        instl_command_name = {'upload': "up2s3", 'up2s3': "up2s3", 'activate': "activate-repo-rev", "short-index": "up-short-index" }[what_to_do.lower()]
+        config_vars["TARGET_DOMAIN"] = domain
+        config_vars["TARGET_MAJOR_VERSION"] = major_version
+        config_vars["TARGET_REPO_REV"] = repo_rev
+        log.info(f"{key} triggered domain: {domain} major_version: {major_version} repo-rev {repo_rev}")
+        config_vars["TARGET_WORK_FOLDER"] = self.get_work_folder()
+
+        domain_major_version_config_folder = main_config_folder.joinpath(domain, major_version)
+        domain_major_version_config_file = domain_major_version_config_folder.joinpath("config.yaml")
+        up2s3_yaml_dict = {
+            "__include__": [os.fspath(domain_major_version_config_file),
+                            os.fspath(main_input_file)],
+            'TARGET_DOMAIN': domain,
+            'TARGET_MAJOR_VERSION': major_version,
+            'TARGET_REPO_REV': repo_rev,
+            'TARGET_WORK_FOLDER': config_vars["TARGET_WORK_FOLDER"].str(),
+        }
+        define_dict = aYaml.YamlDumpDocWrap(up2s3_yaml_dict,
+                                            '!define', "definitions",
+                                            explicit_start=True, sort_mappings=False)
+
+        work_config_file = config_vars["TARGET_WORK_FOLDER"].Path().joinpath(f"{instl_command_name}_{domain}_{major_version}_{repo_rev}.yaml")
+        with utils.utf8_open_for_write(work_config_file, "w") as wfd:
+            aYaml.writeAsYaml(define_dict, wfd)
+
+        work_log_file = config_vars["TARGET_WORK_FOLDER"].Path().joinpath(f"{instl_command_name}_{domain}_{major_version}_{repo_rev}.log")
+        log_files = config_vars.get("OPEN_LOG_FILES", []).list()
+        log_files.append(work_log_file)
+        log_files = [os.fspath(log_file) for log_file in log_files]
+        mp_context = mp.get_context("spawn")
+        trigger_process = mp_context.Process(target=instl_own_main,
+                                             name=f"{instl_command_name}_{domain}_{major_version}_{repo_rev}",
+                                             args=([str(config_vars["__INSTL_EXE_PATH__"]),
+                                                    instl_command_name,
+                                                    "--config-file", os.fspath(work_config_file),
+                                                    "--log", *log_files,
+                                                    "--db", ":file:",    # let instl will decide where the db file is placed
+                                                    "--run"],))
+        return (domain, major_version), trigger_process
+
     def do_activate_repo_rev(self):
 
         redis_host = config_vars['REDIS_HOST'].str()  # redis-server ip
         redis_port = config_vars['REDIS_PORT'].int()  # redis-server port
+        import redis
         r = redis.StrictRedis(host=redis_host, port=redis_port, charset="utf-8", decode_responses=True)
 
         try:
@@ -1207,6 +1293,7 @@ class InstlAdmin(InstlInstanceBase):
             config_vars['ACTIVATE_STATUS'] = "FAILED"
             config_vars['ACTIVATE_EXCEPTION'] = ""
 
+            import boto3
             s3_resource = boto3.resource('s3')
             bucket_name = str(config_vars["S3_BUCKET_NAME"])
             repo_rev_file_specific_name = str(config_vars["REPO_REV_FILE_SPECIFIC_NAME"])  # file name for a specific repo-rev file e.g. V9_repo_rev.yaml.236
@@ -1300,7 +1387,8 @@ class InstlAdmin(InstlInstanceBase):
         with IndexYamlReader(in_file_path, report_own_progress=False) as yaml_reader:
             yaml_reader()
         out_file_path = config_vars.get("__MAIN_OUT_FILE__", None).Path()
-        with ShortIndexYamlCreator(out_file_path, report_own_progress=False) as short_creator:
+        resolved_short_index_path = config_vars.get("__RESOLVED_SHORT_INDEX_OUT__", None).Path()
+        with ShortIndexYamlCreator(out_file_path, resolved_short_index_path=resolved_short_index_path, report_own_progress=False) as short_creator:
             short_creator()
 
     def do_dump_config_vars(self):
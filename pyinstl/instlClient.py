@@ -69,7 +69,9 @@ class InstlClient(InstlInstanceBase):
         self.items_table.activate_specific_oses(*active_oses)
 
         main_input_file_path: str = os.fspath(config_vars["__MAIN_INPUT_FILE__"]) #usualy the YAML file generated by central
-        self.read_yaml_file(main_input_file_path, connection_obj=connection_factory(config_vars), progress_callback=self.progress)
+        self.calc_user_cache_dir_var()
+        self.read_yaml_file(main_input_file_path, connection_obj=connection_factory(config_vars), progress_callback=self.progress,
+                            cache_folder=self.get_aux_cache_dir(make_dir=False))
 
         self.db.set_db_file_owner()
 
@@ -436,10 +438,14 @@ class InstlClient(InstlInstanceBase):
                 ignore_regexes_filter.set_file_ignore_regexes(ignore_file_regex_list)
 
             current_os = config_vars["__CURRENT_OS__"].str()
+            max_workers = config_vars.get("CHECK_BINARIES_VERSION_MAX_WORKERS", 1).int()
+            binary_info_cache = utils.BinaryInfoCache(config_vars.get("CHECK_BINARIES_VERSION_CACHE_PATH", "").str() or None)
             path_to_search = list(config_vars.get('CHECK_BINARIES_VERSION_FOLDERS', []))
             for a_path in path_to_search:
-                binaries_version_from_folder = utils.check_binaries_versions_in_folder(current_os, Path(a_path), ignore_regexes_filter)
+                binaries_version_from_folder = utils.check_binaries_versions_in_folder(current_os, Path(a_path), ignore_regexes_filter,
+                                                                                       max_workers=max_workers, cache=binary_info_cache)
                 binaries_version_list.extend(binaries_version_from_folder)
+            binary_info_cache.save()
 
             self.items_table.insert_binary_versions(binaries_version_list)
 
@@ -21,6 +21,7 @@ class InstlClientReport(InstlClient):
         self.current_require_yaml_path = None
         self.guids_to_ignore = None
         self.output_data = []
+        self.output_rows = None  # rows that are written one by one, instead of collected in output_data
         self.calc_user_cache_dir_var()
 
     def get_default_out_file(self) -> None:
@@ -30,6 +31,13 @@ class InstlClientReport(InstlClient):
         if not bool(config_vars.get('__SILENT__', False)):
 
             output_format = str(config_vars.get("OUTPUT_FORMAT", 'text'))
+            out_file = config_vars.get("__MAIN_OUT_FILE__", None).Path()
+
+            if self.output_rows is not None:
+                with utils.write_to_file_or_stdout(out_file) as wfd:
+                    utils.write_rows_in_format(self.output_rows, output_format, wfd)
+                    wfd.write("\n")
+                return
 
             if output_format == "json":
                 output_text = json.dumps(self.output_data, indent=1, default=utils.extra_json_serializer)
@@ -39,10 +47,9 @@ class InstlClientReport(InstlClient):
                      aYaml.writeAsYaml(yaml_data, io_str)
                 output_text = io_str.getvalue()
             else:  # output_format == "text":  text is the default format
-                lines = [", ".join(line_data) for line_data in self.output_data]
+                lines = [", ".join(str(value) for value in line_data) for line_data in self.output_data]
                 output_text = "\n".join(lines)
 
-            out_file = config_vars.get("__MAIN_OUT_FILE__", None).Path()
             with utils.write_to_file_or_stdout(out_file) as wfd:
                 wfd.write(output_text)
                 wfd.write("\n")
@@ -51,9 +58,14 @@ class InstlClientReport(InstlClient):
         self.guids_to_ignore = set(list(config_vars.get("MAIN_IGNORED_TARGETS", [])))
 
         report_only_installed =  bool(config_vars["__REPORT_ONLY_INSTALLED__"])
-        report_data = self.items_table.versions_report(report_only_installed=report_only_installed, progress_callback=self.progress("calculate versions report"))
-
-        self.output_data.extend(report_data)
+        report_rows = self.items_table.iter_versions_report(report_only_installed=report_only_installed, progress_callback=self.progress("calculate versions report"))
+
+        # without --output-format OUTPUT_FORMAT is not a known format and text is written,
+        # so only yaml, which is written as one document, needs the rows collected
+        if str(config_vars.get("OUTPUT_FORMAT", 'text')) == "yaml":
+            self.output_data.extend(report_rows)
+        else:
+            self.output_rows = report_rows
 
     def calculate_install_items(self):
         pass
@@ -10,6 +10,33 @@ from .instlClientRemove import InstlClientRemove
 from pybatch import PythonDoSomething
 
 
+def index_require_translate_items_by_require_by(req_trans_items):
+    """ map each iid to the require_translate rows it requires, in the order of req_trans_items,
+        so finding the rows required by an item does not need to scan all rows.
+        The rows are the same dict objects as in req_trans_items, changes to their status are shared.
+    """
+    retVal = defaultdict(list)
+    for req_trans in req_trans_items:
+        retVal[req_trans['require_by']].append(req_trans)
+    return retVal
+
+
+def release_items_required_by_uninstalled(should_be_uninstalled, req_trans_by_require_by, how_many_require_by):
+    """ for each item to uninstall, decrement the require_by count of the items it requires.
+        Items whose count drops to 0 are required by no one else and will be uninstalled too, so the items
+        they require are also released.
+    """
+    candi_que = deque(should_be_uninstalled)
+    while len(candi_que) > 0:
+        candi = candi_que.popleft()
+        for req_trans in req_trans_by_require_by[candi]:
+            if req_trans['status'] == 0:
+                req_trans['status'] += 1
+                how_many_require_by[req_trans['iid']] -= 1
+                if how_many_require_by[req_trans['iid']] == 0 and req_trans['iid'] != candi:
+                    candi_que.append(req_trans['iid'])
+
+
 class InstlClientUninstall(InstlClientRemove):
     def __init__(self, initial_vars) -> None:
         super().__init__(initial_vars)
@@ -40,6 +67,7 @@ class InstlClientUninstall(InstlClientRemove):
 
         iid_candidates_for_uninstall = list(config_vars["__MAIN_INSTALL_IIDS__"])
         req_trans_items = self.items_table.get_all_require_translate_items()
+        req_trans_by_require_by = index_require_translate_items_by_require_by(req_trans_items)
 
         # create a count of how much require_by each item has
         how_many_require_by = defaultdict(lambda: 0)
@@ -50,11 +78,10 @@ class InstlClientUninstall(InstlClientRemove):
             # some main uninstall items might be required by other items (that are not uninstalled),
             # and so should not be uninstalled
             for candi in iid_candidates_for_uninstall:
-                for req_trans in req_trans_items:
+                for req_trans in req_trans_by_require_by[candi]:
                     if req_trans['status'] == 0:
-                        if req_trans['require_by'] == candi:
-                            req_trans['status'] += 1
-                            how_many_require_by[req_trans['iid']] -= 1
+                        req_trans['status'] += 1
+                        how_many_require_by[req_trans['iid']] -= 1
 
             items_required_by_no_one = sorted([iid for iid, count in how_many_require_by.items() if count == 0])
             should_be_uninstalled = sorted(list(set(iid_candidates_for_uninstall) & set(items_required_by_no_one)))
@@ -68,16 +95,7 @@ class InstlClientUninstall(InstlClientRemove):
             should_be_uninstalled = iid_candidates_for_uninstall
 
         # now calculate dependencies for main items that should be uninstalled
-        candi_que = deque(should_be_uninstalled)
-        while len(candi_que) > 0:
-            candi = candi_que.popleft()
-            for req_trans in req_trans_items:
-                if req_trans['status'] == 0:
-                    if req_trans['require_by'] == candi:
-                        req_trans['status'] += 1
-                        how_many_require_by[req_trans['iid']] -= 1
-                        if how_many_require_by[req_trans['iid']] == 0 and req_trans['iid'] != candi:
-                            candi_que.append(req_trans['iid'])
+        release_items_required_by_uninstalled(should_be_uninstalled, req_trans_by_require_by, how_many_require_by)
 
         # items who's count is 0 should be uninstalled
         all_uninstall_items = [iid for iid, count in how_many_require_by.items() if count == 0]
@@ -123,6 +141,7 @@ class InstlClientUninstall(InstlClientRemove):
 
         iid_candidates_for_uninstall = list(config_vars["__MAIN_INSTALL_IIDS__"])
         req_trans_items = self.items_table.get_all_require_translate_items()
+        req_trans_by_require_by = index_require_translate_items_by_require_by(req_trans_items)
 
         # create a count of how much require_by each item has
         how_many_require_by = defaultdict(lambda: 0)
@@ -137,14 +156,13 @@ class InstlClientUninstall(InstlClientRemove):
 
         if not force_uninstall_of_main_items:
             for candi in iid_candidates_for_uninstall:
-                for req_trans in req_trans_items:
+                for req_trans in req_trans_by_require_by[candi]:
                     if req_trans['status'] == 0:
-                        if req_trans['require_by'] == candi:
-                            req_trans['status'] += 1
-                            iidKey = req_trans['iid']
-                            how_many_require_by[iidKey] -= 1
-                            if iid_to_required_items[iidKey] and candi in iid_to_required_items[iidKey]:
-                                iid_to_required_items[iidKey].remove(candi)
+                        req_trans['status'] += 1
+                        iidKey = req_trans['iid']
+                        how_many_require_by[iidKey] -= 1
+                        if iid_to_required_items[iidKey] and candi in iid_to_required_items[iidKey]:
+                            iid_to_required_items[iidKey].remove(candi)
 
             for iid in iid_to_required_items.keys():
                 for depend_item in iid_to_required_items[iid]:
@@ -164,16 +182,7 @@ class InstlClientUninstall(InstlClientRemove):
             should_be_uninstalled = iid_candidates_for_uninstall
 
         # now calculate dependencies for main items that should be uninstalled
-        candi_que = deque(should_be_uninstalled)
-        while len(candi_que) > 0:
-            candi = candi_que.popleft()
-            for req_trans in req_trans_items:
-                if req_trans['status'] == 0:
-                    if req_trans['require_by'] == candi:
-                        req_trans['status'] += 1
-                        how_many_require_by[req_trans['iid']] -= 1
-                        if how_many_require_by[req_trans['iid']] == 0 and req_trans['iid'] != candi:
-                            candi_que.append(req_trans['iid'])
+        release_items_required_by_uninstalled(should_be_uninstalled, req_trans_by_require_by, how_many_require_by)
 
         # items who's count is 0 should be uninstalled
         all_uninstall_items = [iid for iid, count in how_many_require_by.items() if count == 0]
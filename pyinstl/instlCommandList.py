@@ -1,18 +1,23 @@
 import os
 import sys
 import shlex
+import functools
+import tempfile
+from pathlib import Path
+import logging
 
 from pyinstl.instlMisc import InstlMisc
 from configVar import config_vars
 from pyinstl.cmdOptions import CommandLineOptions, read_command_line_options
 import utils
 
+log = logging.getLogger()
+
 
 class CommandListRunner(object):
     def __init__(self, initial_vars, options) -> None:
         self.initial_vars = initial_vars
         self.options = options
-        self.child_pids = list()
 
         self.instance = InstlMisc(initial_vars, "command-list")
         self.instance.init_from_cmd_line_options(self.options)
@@ -22,18 +27,15 @@ class CommandListRunner(object):
         config_file = config_vars["__CONFIG_FILE__"].Path()
         command_list_leaf = config_file.name
         if parallel:
-            self.instance.batch_accum += self.instance.platform_helper.echo(f"Running {len(command_list)} commands in parallel from {command_list_leaf}")
-            for argv in command_list:
-                self.do_forked_command(argv)
-
-            for child_pid in self.child_pids:
-                wait_val = os.waitpid(child_pid, 0)
-            self.instance.batch_accum += self.instance.platform_helper.echo(f"Running {len(command_list)} commands in parallel done")
+            max_workers = config_vars.get("COMMAND_LIST_MAX_PARALLEL", os.cpu_count() or 1).int()
+            self.instance.progress(f"Running {len(command_list)} commands in parallel, {max_workers} at a time, from {command_list_leaf}")
+            self.run_in_parallel(command_list, max_workers)
+            self.instance.progress(f"Running {len(command_list)} commands in parallel done")
         else:
-            self.instance.batch_accum += self.instance.platform_helper.echo(f"Running {len(command_list)} commands one by one from {command_list_leaf}")
+            self.instance.progress(f"Running {len(command_list)} commands one by one from {command_list_leaf}")
             for argv in command_list:
                 self.run_one_command(argv)
-            self.instance.batch_accum += self.instance.platform_helper.echo(f"Running {len(command_list)} commands one by one done")
+            self.instance.progress(f"Running {len(command_list)} commands one by one done")
 
     def prepare_command_list_from_file(self):
         command_lines = list()
@@ -55,33 +57,37 @@ class CommandListRunner(object):
             self.instance.init_from_cmd_line_options(options)
             self.instance.do_command()
 
-    def do_forked_command(self, argv):
-        #rpipe, wpipe = os.pipe()
-        new_pid = os.fork()
-        if 0 == new_pid:
-            #os.close(rpipe)
-            #os.dup2(wpipe, sys.stdout.fileno())
-            #os.dup2(wpipe, sys.stderr.fileno())
-            #os.close(wpipe)
-            self.run_one_command(argv)
-            exit(0)
+    def run_in_parallel(self, command_list, max_workers):
+        """ run each command in a forked child process, no more than max_workers at a time.
+            Children inherit the defaults and state already read by self.instance.
+            Output of each command is captured to a file in COMMAND_LIST_OUTPUT_DIR (or a temp folder)
+            and a summary of exit codes and running times is written there.
+        """
+        if "COMMAND_LIST_OUTPUT_DIR" in config_vars:
+            output_folder = config_vars["COMMAND_LIST_OUTPUT_DIR"].Path(resolve=True)
         else:
-            self.child_pids.append(new_pid)
-"""
-rpipe, wpipe = os.pipe()
-
-pid = os.fork()
-if pid == -1:
-    raise TestError("Failed to fork() in prepare_test_dir")
-
-if pid == 0:
-    # Child -- do the copy, print log to pipe and exit
-    try:
-        os.close(rpipe)
-        os.dup2(wpipe, sys.stdout.fileno())
-        os.dup2(wpipe, sys.stderr.fileno())
-        os.close(wpipe)
-"""
+            output_folder = Path(tempfile.mkdtemp(prefix="instl-command-list-"))
+        tasks = [functools.partial(self.run_one_command, argv) for argv in command_list]
+        descriptions = [shlex.join(argv) for argv in command_list]
+        results = utils.run_forked_in_pool(tasks, max_workers, output_folder, descriptions)
+        failed_results = self.write_summary(results, output_folder.joinpath("summary.txt"))
+        if failed_results:
+            for result in failed_results:
+                with utils.utf8_open_for_read(result.output_path, "r") as rfd:
+                    log.error(f"command failed with exit code {result.exit_code}: {result.description}\n{rfd.read()}")
+            raise RuntimeError(f"{len(failed_results)} of {len(results)} commands failed, see {output_folder}")
+
+    def write_summary(self, results, summary_path):
+        """ write and log exit code, running time and output file of each command, return the failed ones """
+        failed_results = [result for result in results if result.exit_code != 0]
+        summary_lines = [f"{result.index}, exit code: {result.exit_code}, {result.seconds:.2f} sec., output: {result.output_path}, command: {result.description}"
+                         for result in results]
+        summary_lines.append(f"{len(results)} commands, {len(results)-len(failed_results)} succeeded, {len(failed_results)} failed")
+        with utils.utf8_open_for_write(summary_path, "w") as wfd:
+            wfd.write("\n".join(summary_lines))
+            wfd.write("\n")
+        log.info(summary_lines[-1] + f", summary: {summary_path}")
+        return failed_results
 
 
 def run_commands_from_file(initial_vars, options):
@@ -23,6 +23,7 @@ from db import DBManager
 from pybatch import *
 
 from .curlHelper import CUrlHelper
+from .defaultsBundle import load_defaults_bundle
 
 log = logging.getLogger()
 
@@ -165,6 +166,9 @@ class InstlInstanceBase(IndexYamlReaderBase, metaclass=abc.ABCMeta):
         config_vars["ACTING_UID"].set_callback_when_value_is_set(utils.set_active_user_or_group_config_var_callback),
         config_vars["ACTING_GID"].set_callback_when_value_is_set(utils.set_active_user_or_group_config_var_callback),
 
+        # defaults/defaults.bundle has the defaults yaml files already parsed and the db schema already created
+        load_defaults_bundle(config_vars["__INSTL_DEFAULTS_FOLDER__"].Path())
+
         # read defaults/main.yaml
         self.read_defaults_file("main", ignore_if_not_exist=False)
 
@@ -3,6 +3,7 @@
 import sys
 import os
 import abc
+from concurrent import futures
 import logging
 log = logging.getLogger()
 
@@ -69,29 +70,23 @@ class InstlInstanceSync(object, metaclass=abc.ABCMeta):
                 self.instlObj.info_map_table.read_from_file(local_copy_of_info_map_out, progress_callback=self.instlObj.progress)
 
                 additional_info_maps = self.instlObj.items_table.get_details_for_active_iids("info_map", unique_values=True)
-                for additional_info_map in additional_info_maps:
-                    # try to get the zipped info_map
-                    additional_info_map_file_name = config_vars.resolve_str(f"{additional_info_map}$(WZLIB_EXTENSION)")
-                    path_in_main_info_map = config_vars.resolve_str(f"instl/{additional_info_map_file_name}")
-                    additional_info_map_item = self.instlObj.info_map_table.get_file_item(path_in_main_info_map)
-                    if not additional_info_map_item:  # zipped not found try the unzipped inf_map
-                        additional_info_map_file_name = additional_info_map
-                        path_in_main_info_map = config_vars.resolve_str(f"instl/{additional_info_map}")
-                        additional_info_map_item = self.instlObj.info_map_table.get_file_item(path_in_main_info_map)
-
-                    checksum = additional_info_map_item.checksum if additional_info_map_item else None
-
-                    info_map_file_url = config_vars.resolve_str(f"$(INSTL_FOLDER_BASE_URL)/{additional_info_map_file_name}")
-                    local_copy_of_info_map_in = config_vars.resolve_str(f"$(LOCAL_REPO_REV_BOOKKEEPING_DIR)/{additional_info_map}")
-                    local_copy_of_info_map_out = utils.download_from_file_or_url(in_url=info_map_file_url,
-                                                config_vars=config_vars,
-                                                in_target_path=local_copy_of_info_map_in,
-                                                translate_url_callback=connectionBase.translate_url,
-                                                cache_folder=self.instlObj.get_default_sync_dir("cache", make_dir=True),
-                                                expected_checksum=checksum)
-
-                    self.instlObj.progress(f"read info_map {info_map_file_url}")
-                    self.instlObj.info_map_table.read_from_file(local_copy_of_info_map_out, progress_callback=self.instlObj.progress)
+                download_kwargs_list = [self.additional_info_map_download_kwargs(additional_info_map, connectionBase.translate_url)
+                                        for additional_info_map in additional_info_maps]
+                # additional info_maps are downloaded in parallel, but read in the order of additional_info_maps
+                # so items are always added to svn_item_t in the same order. Each info_map is read while the next ones are still downloading
+                max_parallel_downloads = max(1, min(config_vars.get("INFO_MAP_MAX_PARALLEL_DOWNLOADS", 4).int(), len(download_kwargs_list)))
+                with futures.ThreadPoolExecutor(max_workers=max_parallel_downloads) as executor:
+                    download_futures = [executor.submit(utils.download_from_file_or_url, **download_kwargs) for download_kwargs in download_kwargs_list]
+                    try:
+                        for download_kwargs, download_future in zip(download_kwargs_list, download_futures):
+                            info_map_file_url = download_kwargs["in_url"]
+                            local_copy_of_info_map_out = download_future.result()
+                            self.instlObj.progress(f"read info_map {info_map_file_url}")
+                            self.instlObj.info_map_table.read_from_file(local_copy_of_info_map_out, progress_callback=self.instlObj.progress)
+                    except Exception:
+                        for download_future in download_futures:
+                            download_future.cancel()
+                        raise
 
                 new_have_info_map_path = os.fspath(config_vars["NEW_HAVE_INFO_MAP_PATH"])
                 self.instlObj.progress(f"write info_map {new_have_info_map_path}")
@@ -100,6 +95,29 @@ class InstlInstanceSync(object, metaclass=abc.ABCMeta):
             log.error(f"""Exception reading info_map: {info_map_file_url}""")
             raise
 
+    def additional_info_map_download_kwargs(self, additional_info_map, translate_url_callback):
+        """ return the arguments to download_from_file_or_url for downloading an additional info_map.
+            The zipped info_map is preferred if it appears in the main info_map, the checksum is taken from the main info_map.
+        """
+        # try to get the zipped info_map
+        additional_info_map_file_name = config_vars.resolve_str(f"{additional_info_map}$(WZLIB_EXTENSION)")
+        path_in_main_info_map = config_vars.resolve_str(f"instl/{additional_info_map_file_name}")
+        additional_info_map_item = self.instlObj.info_map_table.get_file_item(path_in_main_info_map)
+        if not additional_info_map_item:  # zipped not found try the unzipped inf_map
+            additional_info_map_file_name = additional_info_map
+            path_in_main_info_map = config_vars.resolve_str(f"instl/{additional_info_map}")
+            additional_info_map_item = self.instlObj.info_map_table.get_file_item(path_in_main_info_map)
+
+        checksum = additional_info_map_item.checksum if additional_info_map_item else None
+
+        retVal = {"in_url": config_vars.resolve_str(f"$(INSTL_FOLDER_BASE_URL)/{additional_info_map_file_name}"),
+                  "config_vars": config_vars,
+                  "in_target_path": config_vars.resolve_str(f"$(LOCAL_REPO_REV_BOOKKEEPING_DIR)/{additional_info_map}"),
+                  "translate_url_callback": translate_url_callback,
+                  "cache_folder": self.instlObj.get_default_sync_dir("cache", make_dir=True),
+                  "expected_checksum": checksum}
+        return retVal
+
     def mark_required_items(self):
         """ Mark all files that are needed for installation.
             Folders containing these these files are also marked.
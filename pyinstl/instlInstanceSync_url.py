@@ -59,9 +59,13 @@ class InstlInstanceSync_url(InstlInstanceSync):
 
         self.sync_base_url = config_vars["SYNC_BASE_URL"].str()
         self.get_cookie_for_sync_urls(self.sync_base_url)
+        # files needed for DOWNLOAD_PRIORITY_IIDS are downloaded first, in the order of the iids
+        priority_iids = list(config_vars.get("DOWNLOAD_PRIORITY_IIDS", []))
+        iid_to_priority = {iid: priority for priority, iid in enumerate(priority_iids)}
         for file_item in in_file_list:
             source_url = self.instlObj.info_map_table.get_sync_url_for_file_item(file_item)
-            self.instlObj.dl_tool.add_download_url(source_url, file_item.download_path, verbatim=source_url==['url'], size=file_item.size, download_last=source_url.endswith('Info.xml'))
+            priority = iid_to_priority.get(file_item.needed_for_iid, len(priority_iids))
+            self.instlObj.dl_tool.add_download_url(source_url, file_item.download_path, verbatim=source_url==['url'], size=file_item.size, download_last=source_url.endswith('Info.xml'), priority=priority, checksum=file_item.checksum)
         self.instlObj.progress(f"created download urls for {len(in_file_list)} files")
 
     def create_curl_download_instructions(self):
@@ -7,7 +7,6 @@ from collections import namedtuple
 from .instlInstanceBase import InstlInstanceBase
 from pybatch import *
 import utils
-import psutil
 
 
 # noinspection PyUnresolvedReferences,PyUnresolvedReferences,PyUnresolvedReferences
@@ -124,6 +123,56 @@ class InstlMisc(InstlInstanceBase):
         for fold in folders_to_list:
             Ls(fold, out_file=out_file, ls_format=ls_format, out_file_append=True)()
 
+    def do_query_short_index(self):
+        from .resolvedShortIndex import ResolvedShortIndex
+        config_vars["PRINT_COMMAND_TIME"] = "no"  # do not print time report
+        in_file_or_url = config_vars["__MAIN_INPUT_FILE__"].str()
+        if utils.protocol_header_re.match(in_file_or_url):
+            from . import connectionBase  # importing connectionBase take time so do it only when and where needed
+            self.calc_user_cache_dir_var()
+            resolved_short_index = ResolvedShortIndex.read(in_file_or_url, cache_folder=self.get_default_sync_dir(continue_dir="cache", make_dir=True),
+                                                           connection_obj=connectionBase.connection_factory(config_vars))
+        else:
+            resolved_short_index = ResolvedShortIndex.read(config_vars["__MAIN_INPUT_FILE__"].Path(resolve=True))
+        query = config_vars.get("__SHORT_INDEX_QUERY__", "report").str()
+        iids = list(config_vars.get("__SHORT_INDEX_QUERY_IIDS__", []))
+        if "__SHORT_INDEX_QUERY_OSES__" in config_vars:
+            oses = list(config_vars["__SHORT_INDEX_QUERY_OSES__"])
+        else:
+            oses = list(config_vars["TARGET_OS_NAMES"])
+        installed_versions = dict()
+        if "__SHORT_INDEX_QUERY_REQUIRE__" in config_vars:
+            require_path = config_vars["__SHORT_INDEX_QUERY_REQUIRE__"].Path(resolve=True)
+            if require_path.is_file():
+                with utils.utf8_open_for_read(require_path, "r") as rfd:
+                    installed_versions = resolved_short_index.installed_versions_from_require(rfd.read(), oses)
+
+        if query == "changes":
+            changes = resolved_short_index.what_would_change(iids, oses, installed_versions)
+            rows = [("IID", "change", "installed version", "latest version")]
+            for change in ('install', 'update', 'up_to_date', 'orphan'):
+                rows.extend((iid, change, installed_versions.get(iid, "_"), resolved_short_index.first_value(iid, 'version', oses, "_"))
+                            for iid in changes[change])
+        elif query == "depends":
+            closure, orphans = resolved_short_index.dependency_closure(iids, oses)
+            rows = [("IID", "in index")] + [(iid, "yes") for iid in closure] + [(iid, "no") for iid in orphans]
+        else:
+            rows = resolved_short_index.iter_versions_report(oses, installed_versions)
+
+        output_format = config_vars.get("__OUTPUT_FORMAT__", "text").str()
+        out_file = config_vars.get("__MAIN_OUT_FILE__", None).Path(resolve=True)
+        with utils.write_to_file_or_stdout(out_file) as wfd:
+            utils.write_rows_in_format(rows, output_format, wfd)
+            wfd.write("\n")
+
+    def do_defaults_bundle(self):
+        from .defaultsBundle import create_defaults_bundle, defaults_bundle_file_name, schema_template_path
+        config_vars["PRINT_COMMAND_TIME"] = "no"  # do not print time report
+        defaults_folder = config_vars["__INSTL_DEFAULTS_FOLDER__"].Path()
+        bundle_path = config_vars.get("__MAIN_OUT_FILE__", os.fspath(defaults_folder.joinpath(defaults_bundle_file_name))).Path(resolve=True)
+        bundle = create_defaults_bundle(defaults_folder, bundle_path)
+        log.info(f"created {bundle_path} with {len(bundle['composed_yaml'])} yaml files, and db schema template {schema_template_path(bundle_path)}")
+
     def do_fail(self):
         sleep_before_fail = int(config_vars.get("__FAIL_SLEEP_TIME__", "0") )
         log.error(f"""Sleeping for {sleep_before_fail} seconds""")
@@ -197,6 +246,7 @@ class InstlMisc(InstlInstanceBase):
                     time.sleep(_time_to_sleep)
                 log.info(f"aborting because abort file not found {_abort_file_path}")
 
+                import psutil
                 current_process = psutil.Process()
                 childern = current_process.children(recursive=True)
                 for child in childern:
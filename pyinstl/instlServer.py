@@ -0,0 +1,263 @@
+#!/usr/bin/env python3.9
+
+""" instl serve: an opt-in long lived local process that runs instl commands sent over a unix socket.
+    The server imports instl and parses the defaults and other yaml files once. Each command runs in a forked
+    child process that starts with empty config_vars and no db, so results are the same as a cold run, while
+    yaml files that did not change (same checksum) are not parsed again.
+    Clients set INSTL_SERVER_SOCKET in the environment, the instl launcher then sends the command line,
+    working directory, environment and stdin/stdout/stderr to the server and exits with the command's exit code.
+"""
+
+import os
+import sys
+import json
+import signal
+import socket
+import selectors
+import traceback
+from pathlib import Path
+import logging
+
+import aYaml
+import utils
+from configVar import config_vars
+from db import DBManager
+from pybatch import PythonBatchCommandBase
+
+log = logging.getLogger()
+
+max_request_size = 16 * 1024 * 1024
+
+
+class InstlServer(object):
+    def __init__(self, socket_path, warm_file_paths=()) -> None:
+        self.socket_path = Path(socket_path)
+        self.warm_file_paths = list(warm_file_paths)
+        self.listener = None
+        self.selector = None
+        self.running = dict()  # status pipe fd -> RunningCommand
+        self.num_commands = 0
+
+    class RunningCommand(object):
+        def __init__(self, pid, conn, status_fd) -> None:
+            self.pid = pid
+            self.conn = conn
+            self.status_fd = status_fd
+            self.status = bytearray()
+
+    def warm_up(self):
+        """ import the modules commands need and compose the yaml files they read """
+        import pyinstl.instl_main
+        import pyinstl.instlClient
+        import pyinstl.instlMisc
+        import pyinstl.instlDoIt
+        import pyinstl.instlCommandList
+        aYaml.composed_yaml_cache.enabled = True
+        for file_path in self.warm_file_paths:
+            try:
+                aYaml.composed_yaml_cache.add_file(file_path)
+            except Exception as ex:
+                log.warning(f"instl serve: failed to read {file_path} in advance, {ex}")
+
+    def listen(self):
+        if self.socket_path.is_socket():
+            self.socket_path.unlink()
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o077)  # only the user running the server can connect
+        try:
+            self.listener.bind(os.fspath(self.socket_path))
+        finally:
+            os.umask(old_umask)
+        self.listener.listen(16)
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ, self.accept_command)
+
+    def serve_forever(self):
+        self.warm_up()
+        self.listen()
+        log.info(f"instl serve: listening on {self.socket_path}")
+        try:
+            while True:
+                for key, _ in self.selector.select():
+                    key.data(key.fileobj)
+        except KeyboardInterrupt:
+            log.info(f"instl serve: stopped after {self.num_commands} commands")
+        finally:
+            self.close()
+
+    def close(self):
+        for running_command in list(self.running.values()):
+            os.kill(running_command.pid, signal.SIGTERM)
+            self.command_done(running_command)
+        if self.selector is not None:
+            self.selector.close()
+        if self.listener is not None:
+            self.listener.close()
+            if self.socket_path.is_socket():
+                self.socket_path.unlink()
+
+    def accept_command(self, listener):
+        conn, _ = listener.accept()
+        fds = list()
+        try:
+            request, fds = receive_request(conn)
+            pid, status_fd = self.fork_command(request, fds)
+        except Exception as ex:
+            log.warning(f"instl serve: bad request, {ex}")
+            conn.close()
+            return
+        finally:
+            for fd in fds:
+                os.close(fd)
+        self.num_commands += 1
+        running_command = InstlServer.RunningCommand(pid, conn, status_fd)
+        self.running[status_fd] = running_command
+        self.selector.register(status_fd, selectors.EVENT_READ, self.read_status)
+        self.selector.register(conn, selectors.EVENT_READ, self.client_disconnected)
+
+    def read_status(self, status_fd):
+        running_command = self.running[status_fd]
+        data = os.read(status_fd, 64 * 1024)
+        if data:
+            running_command.status.extend(data)
+        else:  # child closed the status pipe by exiting
+            self.command_done(running_command)
+
+    def client_disconnected(self, conn):
+        """ client should not send anything after the request, so readable conn means the client went away """
+        for running_command in self.running.values():
+            if running_command.conn is conn:
+                os.kill(running_command.pid, signal.SIGTERM)
+                self.selector.unregister(conn)
+                break
+
+    def command_done(self, running_command):
+        self.running.pop(running_command.status_fd, None)
+        self.selector.unregister(running_command.status_fd)
+        if self.is_registered(running_command.conn):
+            self.selector.unregister(running_command.conn)
+        os.close(running_command.status_fd)
+        _, wait_status = os.waitpid(running_command.pid, 0)
+        exit_code = os.waitstatus_to_exitcode(wait_status)
+        try:
+            running_command.conn.sendall(json.dumps({"exit_code": exit_code}).encode('utf-8') + b"\n")
+        except OSError:
+            pass  # client already went away
+        running_command.conn.close()
+        self.warm_misses(running_command.status)
+
+    def is_registered(self, fileobj):
+        try:
+            self.selector.get_key(fileobj)
+            return True
+        except KeyError:
+            return False
+
+    def warm_misses(self, status):
+        """ compose the yaml files the command had to parse, so the next commands will find them in the cache """
+        try:
+            misses = json.loads(status.decode('utf-8')) if status else []
+        except ValueError:
+            misses = []
+        for file_path, checksum in misses:
+            if checksum not in aYaml.composed_yaml_cache and os.path.isfile(file_path):
+                try:
+                    aYaml.composed_yaml_cache.add_file(file_path)
+                except Exception as ex:
+                    log.debug(f"instl serve: failed to compose {file_path}, {ex}")
+
+    def fork_command(self, request, fds):
+        status_read_fd, status_write_fd = os.pipe()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                os.close(status_read_fd)
+                self.selector.close()
+                self.listener.close()
+                for running_command in self.running.values():
+                    running_command.conn.close()
+                    os.close(running_command.status_fd)
+                exit_code = run_command_in_child(request, fds)
+                with os.fdopen(status_write_fd, "w", encoding='utf-8') as wfd:
+                    json.dump(aYaml.composed_yaml_cache.misses, wfd)
+            finally:
+                os._exit(exit_code)
+        os.close(status_write_fd)
+        return pid, status_read_fd
+
+
+def receive_request(conn):
+    """ read a json line request and the client's stdin, stdout, stderr file descriptors """
+    conn.settimeout(10)
+    data, fds, _, _ = socket.recv_fds(conn, 64 * 1024, 3)
+    data = bytearray(data)
+    while not data.endswith(b"\n"):
+        if len(data) > max_request_size:
+            raise ValueError("request too large")
+        more_data = conn.recv(64 * 1024)
+        if not more_data:
+            break
+        data.extend(more_data)
+    conn.settimeout(None)
+    if len(fds) != 3:
+        for fd in fds:
+            os.close(fd)
+        raise ValueError(f"expected 3 file descriptors got {len(fds)}")
+    return json.loads(data.decode('utf-8')), fds
+
+
+def run_command_in_child(request, fds):
+    """ run instl in the forked child as if it was started by the client, return the exit code """
+    for std_fd, client_fd in enumerate(fds):
+        os.dup2(client_fd, std_fd)
+        os.close(client_fd)
+    # same as the instl launcher, stdout and stderr are utf-8 whatever the client's locale is
+    sys.stdin = open(0, mode='r', closefd=False)
+    sys.stdout = open(1, mode='w', encoding='utf8', buffering=1, errors='backslashreplace', closefd=False)
+    sys.stderr = open(2, mode='w', encoding='utf8', buffering=1, errors='backslashreplace', closefd=False)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = list(request["argv"])
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    # start from scratch: no config vars, no db, no batch command stages, no log handlers and no progress events stream of the server
+    config_vars.clear()
+    DBManager.reset_db()
+    PythonBatchCommandBase.reset_class_state()
+    for log_handler in list(log.handlers):
+        log.removeHandler(log_handler)
+    aYaml.composed_yaml_cache.misses.clear()
+    utils.progress_events.close()  # the client's environment decides where progress events go
+
+    exit_code = 1
+    try:
+        from pyinstl.instl_main import instl_own_main
+        instl_own_main(argv=sys.argv)
+        exit_code = 0
+    except SystemExit as sys_exit:
+        if sys_exit.code is None:
+            exit_code = 0
+        elif isinstance(sys_exit.code, int):
+            exit_code = sys_exit.code
+        else:
+            print(sys_exit.code, file=sys.stderr)
+    except BaseException:
+        traceback.print_exc()
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return exit_code
+
+
+def serve_commands(initial_vars, options):
+    """ run instl commands sent to a unix socket until interrupted """
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    defaults_folder = Path(initial_vars["__INSTL_DATA_FOLDER__"], "defaults")
+    warm_file_paths = sorted(defaults_folder.glob("*.yaml"))
+    warm_file_paths.extend(config_vars.get("__SERVER_WARM_FILES__", []).list())
+    server = InstlServer(config_vars["__SERVER_SOCKET__"].Path(), warm_file_paths)
+    server.serve_forever()
@@ -93,6 +93,8 @@ class InvocationReporter(PythonBatchRuntime):
             log.debug(f'argv: {" ".join(self.argv[1:])}')
         except Exception as e:
             log.warning(f'instl log file report start failed - {e}')
+        if utils.progress_events.open_from_environment():
+            utils.progress_events.emit("run_start", run=self.random_invocation_name, argv=self.argv[1:])
 
     def exit_self(self, exit_return) -> None:
         # self.doing = self.doing if self.doing else utils.get_latest_action_from_stack()
@@ -103,6 +105,9 @@ class InvocationReporter(PythonBatchRuntime):
             log.debug(f"===== {self.random_invocation_name} =====")
         except Exception as e:
             log.warning(f'InvocationReporter.__exit__ internal exception - {e}')
+        if utils.progress_events.listening:
+            utils.progress_events.emit("run_end", run=self.random_invocation_name, duration_sec=round(self.command_time_sec, 3),
+                                       progress=self.running_progress, total=self.total_progress)
 
 
 def instl_own_main(argv):
@@ -163,6 +168,11 @@ def instl_own_main(argv):
         if options.__MAIN_COMMAND__ == "command-list":
             from pyinstl.instlCommandList import run_commands_from_file
             run_commands_from_file(initial_vars, options)
+        elif options.__MAIN_COMMAND__ == "serve":
+            if os_family_name == "Win":
+                raise EnvironmentError("instl serve is not available on Windows")
+            from pyinstl.instlServer import serve_commands
+            serve_commands(initial_vars, options)
         elif options.mode == "client": #shai, maybe add a log here?  before all imports
             log.debug("begin, importing instl object") #added by oren
             from pyinstl.instlClient import InstlClientFactory
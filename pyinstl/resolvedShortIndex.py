@@ -0,0 +1,193 @@
+#!/usr/bin/env python3.9
+
+""" resolved short index: a compact json file published by the admin next to short-index.yaml.
+    Holds the details of every iid after inheritance was resolved, for all operating systems,
+    so client side queries (versions report, dependency closure, what would change) can be answered
+    without reading the full index.yaml into the db and running resolve_inheritance.
+"""
+
+import json
+from collections import deque
+
+import yaml
+from packaging.version import Version, InvalidVersion
+import aYaml
+import utils
+from configVar import config_vars
+from db.indexItemTable import IndexItemsTable
+
+
+class ResolvedShortIndex(object):
+    file_format = "instl-resolved-short-index"
+    format_version = 1
+    # details written to the file, details not in this list (actions, remarks, info_map...) are not needed for queries
+    published_details = ('name', 'guid', 'version', 'phantom_version', 'depends', 'install_sources',
+                         'install_folders', 'previous_sources', 'previous_iids')
+    versions_report_field_names = IndexItemsTable.versions_report_field_names
+
+    def __init__(self, items=None, defines=None) -> None:
+        # {iid: {detail_name: [[value, os_name], [value, os_name, tag], ...], 'size_mac': int, 'size_win': int}}
+        # values of each detail are ordered by generation, so the iid's own values come before inherited values
+        self.items = items if items is not None else dict()
+        self.defines = defines if defines is not None else dict()
+
+    @classmethod
+    def from_details(cls, details, sizes=None, defines=None, ignore_iids=()):
+        """ :param details: (iid, os_name, detail_name, detail_value, tag) ordered by iid, generation
+            :param sizes: (iid, size_mac, size_win)
+        """
+        items = dict()
+        for iid, os_name, detail_name, detail_value, tag in details:
+            if iid in ignore_iids:
+                continue
+            entry = [detail_value, os_name] if tag is None else [detail_value, os_name, tag]
+            values = items.setdefault(iid, dict()).setdefault(detail_name, list())
+            if entry not in values:  # the same value can be inherited from more than one iid
+                values.append(entry)
+        for iid, size_mac, size_win in sizes or ():
+            if iid in items:
+                if size_mac:
+                    items[iid]['size_mac'] = size_mac
+                if size_win:
+                    items[iid]['size_win'] = size_win
+        return cls(items, defines)
+
+    @classmethod
+    def read(cls, in_file_or_url, cache_folder=None, connection_obj=None):
+        """ read a local file or a url, urls are downloaded to cache_folder, see utils.read_file_or_url_utf8 """
+        text, _ = utils.read_file_or_url_utf8(in_file_or_url, config_vars, connection_obj=connection_obj, cache_folder=cache_folder)
+        data = json.loads(text)
+        if data.get('format') != cls.file_format:
+            raise ValueError(f"{in_file_or_url} is not a resolved short index")
+        if data.get('format_version') != cls.format_version:
+            raise ValueError(f"{in_file_or_url} resolved short index format_version {data.get('format_version')} is not {cls.format_version}")
+        return cls(data['items'], data.get('defines'))
+
+    def write(self, out_file_path):
+        data = {'format': self.file_format, 'format_version': self.format_version,
+                'defines': self.defines, 'items': self.items}
+        with utils.utf8_open_for_write(out_file_path, "w") as wfd:
+            json.dump(data, wfd, separators=(',', ':'), sort_keys=True)
+
+    def iids(self):
+        return sorted(self.items)
+
+    def __contains__(self, iid):
+        return iid in self.items
+
+    @staticmethod
+    def os_filter(oses):
+        """ None means all oses, otherwise common is always included """
+        if oses is None:
+            return None
+        return {'common', *oses}
+
+    def detail_entries(self, iid, detail_name, oses=None):
+        os_filter = self.os_filter(oses)
+        entries = self.items.get(iid, {}).get(detail_name, [])
+        return [entry for entry in entries if os_filter is None or entry[1] in os_filter]
+
+    def detail_values(self, iid, detail_name, oses=None):
+        retVal = utils.unique_list()
+        retVal.extend(entry[0] for entry in self.detail_entries(iid, detail_name, oses))
+        return list(retVal)
+
+    def first_value(self, iid, detail_name, oses=None, default=None):
+        values = self.detail_values(iid, detail_name, oses)
+        return values[0] if values else default
+
+    def install_sources(self, iid, oses=None):
+        """ return [(source, tag), ...] where tag is the source type: !dir, !file or !dir_cont """
+        return [(entry[0], entry[2] if len(entry) > 2 else None) for entry in self.detail_entries(iid, 'install_sources', oses)]
+
+    def dependency_closure(self, iids, oses=None):
+        """ return iids and all the iids they depend on, directly or indirectly, in breadth first order
+            and the list of iids that are not in the index
+        """
+        closure = utils.unique_list()
+        orphans = utils.unique_list()
+        to_visit = deque(iids)
+        while to_visit:
+            iid = to_visit.popleft()
+            if iid in closure or iid in orphans:
+                continue
+            if iid not in self.items:
+                orphans.append(iid)
+                continue
+            closure.append(iid)
+            to_visit.extend(self.detail_values(iid, 'depends', oses))
+        return list(closure), list(orphans)
+
+    def previous_to_current_iids(self):
+        retVal = dict()
+        for iid, details in self.items.items():
+            for entry in details.get('previous_iids', []):
+                retVal[entry[0]] = iid
+        return retVal
+
+    @staticmethod
+    def same_version(version1, version2):
+        """ compare as versions, so 1.0 and 1.0.0 are the same, versions that cannot be parsed are compared as strings """
+        try:
+            return Version(version1) == Version(version2)
+        except InvalidVersion:
+            return version1 == version2
+
+    def installed_versions_from_require(self, require_text, oses=None):
+        """ return {iid: installed version} from the text of require.yaml,
+            iids that were replaced by new iids (previous_iids) are translated to the new iids.
+            For iids required without a version, phantom_version is the installed version, same as
+            IndexItemsTable.add_require_version_from_binaries does when no binary was found on disk.
+        """
+        retVal = dict()
+        previous_to_current = self.previous_to_current_iids()
+        for a_node in yaml.compose_all(require_text):
+            if a_node is None or a_node.tag != "!require" or not a_node.isMapping():
+                continue
+            for iid, require_details in aYaml.nodeToPy(a_node).items():
+                iid = previous_to_current.get(iid, iid)
+                version = require_details.get('version') if isinstance(require_details, dict) else None
+                if isinstance(version, list):
+                    version = version[0]
+                if not version:
+                    version = self.first_value(iid, 'phantom_version', oses)
+                if version:
+                    retVal[iid] = version
+        return retVal
+
+    def iter_versions_report(self, oses=None, installed_versions=None, report_only_installed=False):
+        """ yield the field names and then one tuple for each iid that has a version, same as IndexItemsTable.iter_versions_report """
+        installed_versions = installed_versions or dict()
+        yield self.versions_report_field_names
+        for iid in self.iids():
+            remote_version = self.first_value(iid, 'version', oses)
+            if remote_version is None:
+                continue
+            require_version = installed_versions.get(iid, "_")
+            if report_only_installed and require_version == "_":
+                continue
+            guids = self.detail_values(iid, 'guid', oses)
+            name = self.first_value(iid, 'name', oses)
+            size_mac, size_win = 0, 0
+            if name is not None:  # same as report_versions_view, sizes are reported only for items with a name
+                size_mac, size_win = self.items[iid].get('size_mac', 0), self.items[iid].get('size_win', 0)
+            yield (iid, guids[0] if guids else "_", name or "_", require_version, remote_version,
+                   guids[1] if len(guids) > 1 else guids[0] if guids else "_", size_mac, size_win)
+
+    def what_would_change(self, iids, oses=None, installed_versions=None):
+        """ return what installing iids would do: {'install': [...], 'update': [...], 'up_to_date': [...], 'orphan': [...]}
+            considering also the iids they depend on
+        """
+        installed_versions = installed_versions or dict()
+        retVal = {'install': [], 'update': [], 'up_to_date': [], 'orphan': []}
+        closure, retVal['orphan'] = self.dependency_closure(iids, oses)
+        for iid in closure:
+            installed_version = installed_versions.get(iid)
+            latest_version = self.first_value(iid, 'version', oses)
+            if installed_version is None:
+                retVal['install'].append(iid)
+            elif latest_version is not None and not self.same_version(installed_version, latest_version):
+                retVal['update'].append(iid)
+            else:
+                retVal['up_to_date'].append(iid)
+        return retVal
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3.9
+
+
+import sys
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir)))
+sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir, os.pardir)))
+import aYaml
+from configVar import config_vars
+from configVar import ConfigVarYamlReader
+from db.dbMaster import DBMaster
+from pyinstl import defaultsBundle
+
+defaults_folder = Path(os.path.dirname(__file__), os.pardir, os.pardir, "defaults").resolve()
+
+
+class TestDefaultsBundle(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = Path(tempfile.mkdtemp())
+        for defaults_file in list(defaults_folder.glob("*.yaml")) + list(defaults_folder.glob("*.ddl")):
+            shutil.copy(defaults_file, self.test_folder)
+        self.bundle_path = self.test_folder.joinpath(defaultsBundle.defaults_bundle_file_name)
+        self.cache_state = aYaml.composed_yaml_cache.enabled, aYaml.composed_yaml_cache.keep_misses
+        aYaml.composed_yaml_cache.clear()
+        config_vars.clear()
+
+    def tearDown(self):
+        aYaml.composed_yaml_cache.clear()
+        aYaml.composed_yaml_cache.enabled, aYaml.composed_yaml_cache.keep_misses = self.cache_state
+        DBMaster.schema_templates.pop(os.fspath(self.test_folder), None)
+        defaultsBundle.loaded_bundle_paths.discard(os.fspath(self.bundle_path))
+        config_vars.clear()
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def read_defaults(self, *file_names):
+        """ read defaults files as InstlInstanceBase does and return all config vars unresolved """
+        config_vars.clear()
+        config_vars["__CURRENT_OS__"] = "Mac"
+        config_vars["__CURRENT_OS_NAMES__"] = ("Mac", "Mac64")
+        reader = ConfigVarYamlReader(config_vars)
+        for file_name in file_names:
+            reader.read_yaml_file(self.test_folder.joinpath(file_name), allow_reading_of_internal_vars=True)
+        del config_vars["READ_YAML_FILES"]
+        return {var_name: list(config_vars[var_name].raw(join_sep=None)) for var_name in config_vars.keys()}
+
+    def test_same_config_vars(self):
+        from_yaml = self.read_defaults("main.yaml", "InstlClient.yaml", "InstlMisc.yaml")
+        bundle = defaultsBundle.create_defaults_bundle(self.test_folder, self.bundle_path)
+        self.assertEqual(len(bundle["composed_yaml"]), len(list(self.test_folder.glob("*.yaml"))))
+        self.assertTrue(defaultsBundle.load_defaults_bundle(self.test_folder))
+        self.assertFalse(aYaml.composed_yaml_cache.keep_misses)
+        from_bundle = self.read_defaults("main.yaml", "InstlClient.yaml", "InstlMisc.yaml")
+        self.assertEqual(aYaml.composed_yaml_cache.misses, [])
+        self.assertEqual(from_bundle, from_yaml)
+
+    def test_changed_yaml_is_read(self):
+        defaultsBundle.create_defaults_bundle(self.test_folder, self.bundle_path)
+        with open(self.test_folder.joinpath("InstlMisc.yaml"), "a") as wfd:
+            wfd.write("\n--- !define\nADDED_AFTER_BUNDLE: yes\n")
+        defaultsBundle.load_defaults_bundle(self.test_folder)
+        self.read_defaults("main.yaml", "InstlMisc.yaml")
+        self.assertEqual(config_vars["ADDED_AFTER_BUNDLE"].str(), "yes")
+        self.assertEqual([Path(path).name for path, checksum in aYaml.composed_yaml_cache.misses], ["InstlMisc.yaml"])
+        self.assertNotIn(aYaml.composed_yaml_cache.misses[0][1], aYaml.composed_yaml_cache)
+
+    def test_schema_template(self):
+        defaultsBundle.create_defaults_bundle(self.test_folder, self.bundle_path)
+        defaultsBundle.load_defaults_bundle(self.test_folder)
+        self.assertIn(os.fspath(self.test_folder), DBMaster.schema_templates)
+        schema_query = "SELECT type, name, sql FROM sqlite_master ORDER BY type, name"
+        from_image = DBMaster(":memory:", self.test_folder)
+        from_image.open()
+        from_image_schema = [tuple(row) for row in from_image.select_and_fetchall(schema_query)]
+        from_image_os_names = from_image.select_and_fetchall("SELECT * FROM active_operating_systems_t")
+        self.assertEqual(from_image.get_db_pragma("foreign_keys"), 1)
+        from_image.close()
+        DBMaster.schema_templates.clear()
+        from_ddl = DBMaster(":memory:", self.test_folder)
+        from_ddl.open()
+        self.assertEqual(from_image_schema, [tuple(row) for row in from_ddl.select_and_fetchall(schema_query)])
+        self.assertEqual(from_image_os_names, from_ddl.select_and_fetchall("SELECT * FROM active_operating_systems_t"))
+        self.assertEqual(from_ddl.get_db_pragma("foreign_keys"), 1)
+        from_ddl.close()
+
+    def test_bad_schema_template(self):
+        defaultsBundle.create_defaults_bundle(self.test_folder, self.bundle_path)
+        defaultsBundle.load_defaults_bundle(self.test_folder)
+        defaultsBundle.schema_template_path(self.bundle_path).write_bytes(b"not a db")
+        from_ddl = DBMaster(":memory:", self.test_folder)
+        from_ddl.open()
+        self.assertNotEqual(from_ddl.select_and_fetchall("SELECT * FROM active_operating_systems_t"), [])
+        from_ddl.close()
+
+    def test_changed_ddl_is_not_used(self):
+        defaultsBundle.create_defaults_bundle(self.test_folder, self.bundle_path)
+        with open(self.test_folder.joinpath("create-indexes.ddl"), "a") as wfd:
+            wfd.write("\n-- changed after bundle was created\n")
+        self.assertTrue(defaultsBundle.load_defaults_bundle(self.test_folder))
+        self.assertNotIn(os.fspath(self.test_folder), DBMaster.schema_templates)
+
+    def test_incompatible_bundle(self):
+        bundle = defaultsBundle.create_defaults_bundle(self.test_folder, self.bundle_path)
+        bundle["compatibility"]["yaml_version"] = "0.0"
+        with open(self.bundle_path, "wb") as wfd:
+            pickle.dump(bundle, wfd)
+        self.assertFalse(defaultsBundle.load_defaults_bundle(self.test_folder))
+        self.bundle_path.write_bytes(b"not a bundle")
+        self.assertFalse(defaultsBundle.load_defaults_bundle(self.test_folder))
+        self.assertFalse(aYaml.composed_yaml_cache.enabled and not self.cache_state[0])
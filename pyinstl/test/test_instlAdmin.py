@@ -0,0 +1,90 @@
+#!/usr/bin/env python3.9
+
+
+import sys
+import os
+import unittest
+
+sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir)))
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+from pyinstl.instlAdmin import ActionTriggerWorkerPool
+
+
+class FakeTriggerProcess(object):
+    """ stands in for multiprocessing.Process, the test decides when the process is done """
+    def __init__(self, name, started_list) -> None:
+        self.name = name
+        self.started_list = started_list
+        self.started = False
+        self.done = False
+        self.exitcode = None
+
+    def start(self):
+        self.started = True
+        self.started_list.append(self.name)
+
+    def is_alive(self):
+        return self.started and not self.done
+
+    def join(self):
+        self.exitcode = 0
+
+    def finish(self):
+        self.done = True
+
+
+@unittest.skipIf(fakeredis is None, "fakeredis is not installed")
+class TestActionTriggerWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.redis_instance = fakeredis.FakeStrictRedis(decode_responses=True)
+        self.started_list = list()
+
+    def process(self, name):
+        return FakeTriggerProcess(name, self.started_list)
+
+    def test_concurrency_is_limited(self):
+        worker_pool = ActionTriggerWorkerPool(2, self.redis_instance)
+        p1, p2, p3 = self.process("up2s3_test_V10_1"), self.process("up2s3_test_V11_1"), self.process("up2s3_test_V12_1")
+        worker_pool.submit(("test", "V10"), p1)
+        worker_pool.submit(("test", "V11"), p2)
+        worker_pool.submit(("test", "V12"), p3)
+        self.assertEqual(self.started_list, ["up2s3_test_V10_1", "up2s3_test_V11_1"])
+        self.assertFalse(worker_pool.can_accept())
+
+        p2.finish()
+        worker_pool.schedule()
+        self.assertEqual(self.started_list, ["up2s3_test_V10_1", "up2s3_test_V11_1", "up2s3_test_V12_1"])
+
+        p1.finish()
+        p3.finish()
+        worker_pool.schedule()
+        self.assertTrue(worker_pool.is_idle())
+
+    def test_same_domain_and_version_are_serialized(self):
+        worker_pool = ActionTriggerWorkerPool(4, self.redis_instance)
+        p1, p2, p3 = self.process("up2s3_test_V10_1"), self.process("activate-repo-rev_test_V10_1"), self.process("up2s3_test_V11_7")
+        worker_pool.submit(("test", "V10"), p1)
+        worker_pool.submit(("test", "V10"), p2)
+        worker_pool.submit(("test", "V11"), p3)
+        self.assertEqual(self.started_list, ["up2s3_test_V10_1", "up2s3_test_V11_7"])
+
+        p1.finish()
+        worker_pool.schedule()
+        self.assertEqual(self.started_list, ["up2s3_test_V10_1", "up2s3_test_V11_7", "activate-repo-rev_test_V10_1"])
+
+    def test_heartbeat_per_worker(self):
+        worker_pool = ActionTriggerWorkerPool(2, self.redis_instance, "instl:heartbeat")
+        p1 = self.process("up2s3_test_V10_1")
+        worker_pool.submit(("test", "V10"), p1)
+        self.assertIsNotNone(self.redis_instance.get("instl:heartbeat:up2s3_test_V10_1"))
+        self.assertEqual(worker_pool.in_progress_str(), "up2s3_test_V10_1")
+
+        p1.finish()
+        worker_pool.schedule()
+        self.assertIsNone(self.redis_instance.get("instl:heartbeat:up2s3_test_V10_1"))
+        self.assertEqual(worker_pool.in_progress_str(), "")
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3.9
+
+
+import unittest
+from collections import defaultdict
+
+from pyinstl.instlClientUninstall import index_require_translate_items_by_require_by, release_items_required_by_uninstalled
+
+
+class TestUninstallDependencies(unittest.TestCase):
+    def setUp(self):
+        # A requires B and C, D requires C, B requires E, E is also required by the user
+        self.req_trans_items = [{'iid': iid, 'require_by': require_by, 'status': 0}
+                                for iid, require_by in (("A", "__USER__"), ("B", "A"), ("C", "A"), ("C", "D"),
+                                                        ("D", "__USER__"), ("E", "B"), ("E", "__USER__"))]
+        self.how_many_require_by = defaultdict(lambda: 0)
+        for req_trans in self.req_trans_items:
+            self.how_many_require_by[req_trans['iid']] += 1
+
+    def tearDown(self):
+        pass
+
+    def test_index_by_require_by(self):
+        by_require_by = index_require_translate_items_by_require_by(self.req_trans_items)
+        self.assertEqual([rt['iid'] for rt in by_require_by["A"]], ["B", "C"])
+        self.assertEqual([rt['iid'] for rt in by_require_by["__USER__"]], ["A", "D", "E"])
+        self.assertIs(by_require_by["A"][0], self.req_trans_items[1])
+
+    def test_release_items_required_by_uninstalled(self):
+        by_require_by = index_require_translate_items_by_require_by(self.req_trans_items)
+        # the user uninstalls A: B is required by no one else, C is still required by D, E is still required by the user
+        for req_trans in by_require_by["__USER__"]:
+            if req_trans['iid'] == "A":
+                req_trans['status'] += 1
+                self.how_many_require_by["A"] -= 1
+        release_items_required_by_uninstalled(["A"], by_require_by, self.how_many_require_by)
+        no_longer_required = sorted(iid for iid, count in self.how_many_require_by.items() if count == 0)
+        self.assertEqual(no_longer_required, ["A", "B"])
+        self.assertEqual(self.how_many_require_by["C"], 1)
+        self.assertEqual(self.how_many_require_by["E"], 1)
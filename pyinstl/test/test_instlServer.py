@@ -0,0 +1,113 @@
+#!/usr/bin/env python3.9
+
+
+import sys
+import os
+import io
+import json
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir)))
+sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir, os.pardir)))
+import aYaml
+from pyinstl.instlServer import InstlServer
+
+instl_launcher_path = os.path.realpath(os.path.join(__file__, os.pardir, os.pardir, os.pardir, "instl"))
+
+
+class TestComposedYamlCache(unittest.TestCase):
+    def test_compose_once(self):
+        cache = aYaml.ComposedYamlCache(max_texts=2)
+        text = "--- !define\nA: a\n--- !index\nB_IID:\n    name: B\n"
+        nodes = cache.compose_all(io.StringIO(text))
+        self.assertEqual([node.tag for node in nodes], ["!define", "!index"])
+        self.assertIs(cache.compose_all(io.StringIO(text)), nodes)
+        self.assertEqual(len(cache.misses), 1)
+        cache.compose_all(io.StringIO("--- !define\nA: b\n"))
+        cache.compose_all(io.StringIO("--- !define\nA: c\n"))
+        self.assertNotIn(cache.checksum(text), cache)
+
+
+@unittest.skipIf(not hasattr(socket, "send_fds"), "instl serve needs unix sockets")
+class TestInstlServer(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.socket_path = self.test_folder.joinpath("instl.sock")
+        self.index_path = self.test_folder.joinpath("index.yaml")
+        self.index_path.write_text("""--- !index
+A_IID:
+    name: A
+    guid: aaaaaaaa-0000-0000-0000-000000000000
+    version: 1.0.0
+    install_sources: Plugins/A.bundle
+""")
+        self.server_pid = os.fork()
+        if self.server_pid == 0:
+            try:
+                signal.signal(signal.SIGTERM, signal.default_int_handler)
+                InstlServer(self.socket_path, [self.index_path]).serve_forever()
+            finally:
+                os._exit(0)
+        for i in range(100):
+            if self.socket_path.is_socket():
+                break
+            time.sleep(0.05)
+
+    def tearDown(self):
+        os.kill(self.server_pid, signal.SIGTERM)
+        os.waitpid(self.server_pid, 0)
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def run_on_server(self, *args):
+        """ send a command like the instl launcher does, return exit code and output """
+        out_read_fd, out_write_fd = os.pipe()
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server_socket, open(os.devnull) as in_fd:
+            server_socket.connect(os.fspath(self.socket_path))
+            request = {"argv": [instl_launcher_path, *args], "cwd": os.fspath(self.test_folder), "env": dict(os.environ)}
+            socket.send_fds(server_socket, [json.dumps(request).encode('utf-8') + b"\n"], [in_fd.fileno(), out_write_fd, out_write_fd])
+            os.close(out_write_fd)
+            with os.fdopen(out_read_fd, "r", encoding='utf-8') as rfd:
+                output = rfd.read()
+            response = json.loads(server_socket.makefile("rb").readline())
+        return response["exit_code"], output
+
+    def run_cold(self, *args):
+        completed = subprocess.run([sys.executable, instl_launcher_path, *args], cwd=self.test_folder,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, encoding='utf-8')
+        return completed.returncode, completed.stdout
+
+    @staticmethod
+    def without_timing(output):
+        return [line for line in output.splitlines() if not line.startswith("InvocationReporter Time")]
+
+    def test_same_as_cold_run(self):
+        args = ("report-versions", "--in", os.fspath(self.index_path), "--output-format", "json", "--no-system-log")
+        cold_exit_code, cold_output = self.run_cold(*args)
+        for i in range(2):
+            exit_code, output = self.run_on_server(*args)
+            self.assertEqual(exit_code, cold_exit_code)
+            self.assertEqual(self.without_timing(output), self.without_timing(cold_output))
+        self.assertIn('"aaaaaaaa-0000-0000-0000-000000000000"', output)
+
+    def test_report_versions_default_format(self):
+        args = ("report-versions", "--in", os.fspath(self.index_path), "--no-system-log")
+        cold_exit_code, cold_output = self.run_cold(*args)
+        self.assertEqual(cold_exit_code, 0)
+        self.assertIn("A_IID, aaaaaaaa-0000-0000-0000-000000000000, A, _, 1.0.0, aaaaaaaa-0000-0000-0000-000000000000, 0, 0", cold_output)
+        exit_code, output = self.run_on_server(*args)
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.without_timing(output), self.without_timing(cold_output))
+
+    def test_exit_code(self):
+        exit_code, output = self.run_on_server("fail", "--exit-code", "3", "--no-system-log")
+        self.assertEqual(exit_code, 3)
+        exit_code, output = self.run_on_server("version", "--no-system-log")
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(self.without_timing(output), self.without_timing(self.run_cold("version", "--no-system-log")[1]))
@@ -3,6 +3,8 @@
 
 import sys
 import os
+import shutil
+import tempfile
 import unittest
 import time
 from pathlib import Path
@@ -11,6 +13,7 @@ from pybatch.info_mapBatchCommands import IndexYamlReader
 sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir)))
 sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir, os.pardir)))
 from db.indexItemTable import IndexItemsTable
+from db import DBManager
 import aYaml
 import utils
 from configVar import config_vars
@@ -54,6 +57,95 @@ class TestConditionalsInIndex(unittest.TestCase):
         self.assertEqual(num_iids, num_oks, f"{num_iids=} != {num_oks=}")
 
 
+class TestFoundInstalledBinaries(unittest.TestCase):
+    def setUp(self):
+        config_vars["__INSTL_DEFAULTS_FOLDER__"] = Path(os.path.dirname(__file__), "../..", "defaults")
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.in_file_path = self.test_folder.joinpath("index.yaml")
+        self.in_file_path.write_text("""--- !index
+OLD_GAMMA_IID:
+    install_sources: Mac/Plugins/Old Gamma.bundle
+A_IID:
+    guid: aaaa
+    install_sources: Mac/Plugins/Alpha.bundle
+B_IID:
+    install_sources: Mac/Plugins/Beta.bundle
+    previous_sources: Mac/Old Plugins/Beta Old.bundle
+C_IID:
+    guid: cccc
+    install_sources:
+        - Mac/Plugins/Gamma.bundle
+        - Mac/Plugins/Gamma Extra.bundle
+""")
+
+    def tearDown(self):
+        DBManager.reset_db()  # next test should read it's index to a new db
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_iid_of_found_binaries(self):
+        with IndexYamlReader(self.in_file_path, report_own_progress=False) as it:
+            it()
+            it.items_table.insert_binary_versions([("/Applications/Waves/Alpha.bundle", "1.0", "aaaa"),
+                                                   ("/Applications/Waves/alpha.bundle", "1.0", "cccc"),   # guid of another iid
+                                                   ("/Applications/Waves/beta.bundle", "2.0", None),     # case insensitive like LIKE
+                                                   ("/Applications/Waves/Beta Old.bundle", "1.5", None),
+                                                   ("/Applications/Waves/Extra.bundle", "3.0", "cccc"),  # suffix of a source leaf
+                                                   ("/Applications/Waves/Delta.bundle", "1.0", None),
+                                                   ("/Applications/Waves/Gamma.bundle", "1.0", None),    # exact leaf before a leaf that ends with the name
+                                                   ("/Applications/Waves/amma.bundle", "1.0", None)])    # no exact leaf, first source read that ends with the name
+            found = it.items_table.db.select_and_fetchall("SELECT name, iid FROM found_installed_binaries_t ORDER BY _id")
+            self.assertEqual([tuple(row) for row in found], [("Alpha.bundle", "A_IID"), ("alpha.bundle", None),
+                                                            ("beta.bundle", "B_IID"), ("Beta Old.bundle", "B_IID"),
+                                                            ("Extra.bundle", "C_IID"), ("Delta.bundle", None),
+                                                            ("Gamma.bundle", "C_IID"), ("amma.bundle", "OLD_GAMMA_IID")])
+
+
+class TestVersionsReport(unittest.TestCase):
+    def setUp(self):
+        config_vars["__INSTL_DEFAULTS_FOLDER__"] = Path(os.path.dirname(__file__), "../..", "defaults")
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.in_file_path = self.test_folder.joinpath("index.yaml")
+        self.in_file_path.write_text("""--- !index
+A_IID:
+    name: Alpha
+    guid:
+        - aaaa
+        - aaab
+    version: 1.0
+    size_mac: 100
+B_IID:
+    inherit: A_IID
+    Mac:
+        version: 2.0
+    Win:
+        version: 3.0
+C_IID:
+    guid: cccc
+    size_win: 10
+    Win:
+        version: 4.0
+D_IID:
+    name: No version
+""")
+
+    def tearDown(self):
+        DBManager.reset_db()  # next test should read it's index to a new db
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_versions_report(self):
+        with IndexYamlReader(self.in_file_path, report_own_progress=False) as it:
+            it()
+            it.items_table.activate_specific_oses("Mac")
+            report = it.items_table.versions_report()
+            self.assertEqual(report[0], IndexItemsTable.versions_report_field_names)
+            self.assertEqual(report[1:], [("A_IID", "aaaa", "Alpha", "_", "1.0", "aaab", 100, 0),
+                                          ("B_IID", "aaaa", "_", "_", "2.0", "aaab", 0, 0)])  # name is not inherited
+
+            it.items_table.activate_specific_oses("Win")
+            self.assertEqual([row[0] for row in it.items_table.iter_versions_report()], ["IID", "A_IID", "B_IID", "C_IID"])
+            self.assertEqual(it.items_table.versions_report(report_only_installed=True), [IndexItemsTable.versions_report_field_names])
+
+
 class TestReadWrite(unittest.TestCase):
     @timing
     def setUp(self):
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3.9
+
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir)))
+sys.path.append(os.path.realpath(os.path.join(__file__, os.pardir, os.pardir, os.pardir)))
+from pybatch.info_mapBatchCommands import IndexYamlReader, ShortIndexYamlCreator
+from pyinstl.resolvedShortIndex import ResolvedShortIndex
+from db import DBManager
+from configVar import config_vars
+import utils
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class TestResolvedShortIndex(unittest.TestCase):
+    def setUp(self):
+        config_vars["__INSTL_DEFAULTS_FOLDER__"] = Path(os.path.dirname(__file__), "../..", "defaults")
+        config_vars["SHORT_INDEX_FILE_VARS"] = []
+        config_vars["SPECIAL_BUILD_IN_IIDS"] = []
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.in_file_path = self.test_folder.joinpath("index.yaml")
+        self.in_file_path.write_text("""--- !index
+A_IID:
+    name: A
+    guid: aaaaaaaa-0000-0000-0000-000000000000
+    version: 1.0.0
+    depends: [B_IID, MISSING_IID]
+    install_sources: Plugins/A.bundle
+
+B_IID:
+    name: B
+    inherit: A_IID
+    Mac:
+        version: 2.0.0
+    Win:
+        version: 3.0.0
+    depends: C_IID
+    install_sources: Plugins/B.bundle
+
+C_IID:
+    name: C
+    guid:
+        - cccccccc-0000-0000-0000-000000000000
+        - cccccccc-1111-0000-0000-000000000000
+    Win:
+        version: 4.0.0
+    previous_iids: OLD_C_IID
+    install_sources: Plugins/C.bundle
+""")
+        self.short_index_path = self.test_folder.joinpath("short-index.yaml")
+        self.resolved_short_index_path = self.test_folder.joinpath("resolved-short-index.json")
+
+    def tearDown(self):
+        DBManager.reset_db()  # next test should read it's index to a new db
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_same_versions_report_as_db(self):
+        with IndexYamlReader(self.in_file_path, report_own_progress=False) as reader:
+            reader()
+            with ShortIndexYamlCreator(self.short_index_path, resolved_short_index_path=self.resolved_short_index_path, report_own_progress=False) as creator:
+                creator()
+            resolved = ResolvedShortIndex.read(self.resolved_short_index_path)
+            self.assertEqual(resolved.iids(), ["A_IID", "B_IID", "C_IID"])
+            for os_name in ("Mac", "Win"):
+                reader.items_table.activate_specific_oses(os_name)
+                self.assertEqual(list(resolved.iter_versions_report([os_name])), reader.items_table.versions_report())
+
+    def make_resolved(self):
+        details = [("A_IID", "common", "version", "1.0.0", None),
+                   ("A_IID", "common", "depends", "B_IID", None),
+                   ("A_IID", "common", "depends", "MISSING_IID", None),
+                   ("B_IID", "Mac", "version", "2.0.0", None),
+                   ("B_IID", "Win", "version", "3.0.0", None),
+                   ("B_IID", "common", "depends", "C_IID", None),
+                   ("C_IID", "Win", "version", "4.0.0", None),
+                   ("C_IID", "Win", "install_sources", "Win/Plugins/C.dll", "!file"),
+                   ("C_IID", "common", "previous_iids", "OLD_C_IID", None),
+                   ("C_IID", "common", "previous_iids", "OLD_C_IID", None),
+                   ("D_IID", "common", "version", "5.0.0", None),
+                   ("D_IID", "common", "phantom_version", "4.5.0", None),
+                   ("A_IID", "common", "depends", "D_IID", None)]
+        return ResolvedShortIndex.from_details(details, sizes=[("C_IID", 0, 1234)], defines={"REPO_REV": "17"})
+
+    def test_write_read(self):
+        resolved = self.make_resolved()
+        self.assertEqual(resolved.detail_values("C_IID", "previous_iids"), ["OLD_C_IID"])
+        resolved.write(self.resolved_short_index_path)
+        read_back = ResolvedShortIndex.read(self.resolved_short_index_path)
+        self.assertEqual(read_back.items, resolved.items)
+        self.assertEqual(read_back.defines, {"REPO_REV": "17"})
+        self.assertEqual(read_back.install_sources("C_IID", ["Win"]), [("Win/Plugins/C.dll", "!file")])
+        self.assertEqual(read_back.install_sources("C_IID", ["Mac"]), [])
+
+        self.resolved_short_index_path.write_text('{"format": "instl-resolved-short-index", "format_version": 0, "items": {}}')
+        with self.assertRaises(ValueError):
+            ResolvedShortIndex.read(self.resolved_short_index_path)
+
+    def test_read_from_url(self):
+        self.make_resolved().write(self.resolved_short_index_path)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=os.fspath(self.test_folder)))
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/{self.resolved_short_index_path.name}"
+            read_back = ResolvedShortIndex.read(url, cache_folder=self.test_folder.joinpath("cache"))
+            self.assertEqual(read_back.items, self.make_resolved().items)
+            self.assertTrue(self.test_folder.joinpath("cache", self.resolved_short_index_path.name).is_file())
+        finally:
+            server.shutdown()
+            server.server_close()
+            utils.close_http_sessions()
+
+    def test_dependency_closure(self):
+        resolved = self.make_resolved()
+        self.assertEqual(resolved.dependency_closure(["A_IID"]), (["A_IID", "B_IID", "D_IID", "C_IID"], ["MISSING_IID"]))
+        self.assertEqual(resolved.dependency_closure(["B_IID", "NO_IID"]), (["B_IID", "C_IID"], ["NO_IID"]))
+
+    def test_what_would_change(self):
+        resolved = self.make_resolved()
+        installed_versions = resolved.installed_versions_from_require("""--- !require
+B_IID:
+    version: 3.0
+OLD_C_IID:
+    version: 3.9.0
+D_IID:
+    require_by: D_IID
+""")
+        # D_IID was required without a version, its phantom_version is the installed version
+        self.assertEqual(installed_versions, {"B_IID": "3.0", "C_IID": "3.9.0", "D_IID": "4.5.0"})
+        # 3.0 and 3.0.0 are the same version
+        self.assertEqual(resolved.what_would_change(["A_IID"], ["Win"], installed_versions),
+                         {'install': ["A_IID"], 'update': ["D_IID", "C_IID"], 'up_to_date': ["B_IID"], 'orphan': ["MISSING_IID"]})
+        report = list(resolved.iter_versions_report(["Win"], installed_versions, report_only_installed=True))
+        self.assertEqual(report[1:], [("B_IID", "_", "_", "3.0", "3.0.0", "_", 0, 0),
+                                      ("C_IID", "_", "_", "3.9.0", "4.0.0", "_", 0, 0),
+                                      ("D_IID", "_", "_", "4.5.0", "5.0.0", "_", 0, 0)])
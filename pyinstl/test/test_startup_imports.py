@@ -0,0 +1,96 @@
+#!/usr/bin/env python3.9
+
+
+import sys
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+instl_launcher_path = os.path.realpath(os.path.join(__file__, os.pardir, os.pardir, os.pardir, "instl"))
+
+# modules that small commands do not need, these should be imported only by the code that uses them
+unwanted_modules = ("requests", "urllib3", "psutil", "asyncio", "distutils", "setuptools", "pkg_resources",
+                    "redis", "boto3", "botocore", "tkinter", "networkx", "smtplib", "ssl")
+
+# import time allowed for each command, on top of python's own startup imports, as a multiple of the time
+# it takes to run 'python -c pass', so the budget does not depend on the speed of the machine running the tests.
+# Measured ~2 times 'python -c pass' for each of these commands, before imports were reorganised ~7 times.
+startup_budget_factors = {"version": 5,
+                          "help": 5,
+                          "checksum": 5,
+                          "ls": 5,
+                          "resolve": 5}
+
+import_time_line_re = re.compile(r"import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \|(?P<indent> *)(?P<name>\S+)")
+
+
+def parse_import_times(stderr_text):
+    """ return the names of all imported modules and {top level module name: cumulative import time in microseconds} """
+    imported = set()
+    top_level_times = dict()
+    for line in stderr_text.splitlines():
+        match = import_time_line_re.match(line)
+        if match:
+            imported.add(match.group('name'))
+            if len(match.group('indent')) == 1:
+                top_level_times[match.group('name')] = int(match.group('cumulative'))
+    return imported, top_level_times
+
+
+class TestStartupImports(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.python_startup_ms = None
+        for i in range(3):  # fastest of a few runs, the first might be slowed by a cold disk cache
+            start_time = time.perf_counter()
+            completed = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], stderr=subprocess.PIPE, encoding='utf-8')
+            run_time_ms = (time.perf_counter() - start_time) * 1000
+            cls.python_startup_ms = run_time_ms if cls.python_startup_ms is None else min(cls.python_startup_ms, run_time_ms)
+        cls.python_startup_modules = parse_import_times(completed.stderr)[0]
+
+    def setUp(self):
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.test_folder.joinpath("in.txt").write_text("$(A)\n")
+        self.test_folder.joinpath("config.yaml").write_text("--- !define\nA: a\n")
+        self.test_folder.joinpath("folder").mkdir()
+        self.test_folder.joinpath("folder", "file.txt").write_text("file\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def command_imports(self, *args):
+        """ run instl with -X importtime, return imported module names and the import time in ms not counting python's startup """
+        completed = subprocess.run([sys.executable, "-X", "importtime", instl_launcher_path, *args, "--no-system-log"],
+                                   cwd=self.test_folder, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, encoding='utf-8')
+        imported, top_level_times = parse_import_times(completed.stderr)
+        import_time_ms = sum(cumulative for name, cumulative in top_level_times.items() if name not in self.python_startup_modules) / 1000
+        return imported, import_time_ms
+
+    def check_command(self, command_name, *args):
+        imported, import_time_ms = self.command_imports(command_name, *args)
+        self.assertIn("pyinstl.instl_main", imported)
+        needlessly_imported = [module for module in unwanted_modules if module in imported and module not in self.python_startup_modules]
+        self.assertEqual(needlessly_imported, [], f"{command_name} imported modules it does not need")
+        budget_ms = startup_budget_factors[command_name] * self.python_startup_ms
+        self.assertLess(import_time_ms, budget_ms, f"{command_name} import time {import_time_ms:.0f}ms is over budget {budget_ms:.0f}ms")
+
+    def test_version(self):
+        self.check_command("version")
+
+    def test_help(self):
+        self.check_command("help")
+
+    def test_checksum(self):
+        self.check_command("checksum", "--in", "in.txt")
+
+    def test_ls(self):
+        # only the imports are checked, not the listing itself
+        self.check_command("ls", "--in", "folder", "--out", "ls.txt")
+
+    def test_resolve(self):
+        self.check_command("resolve", "--in", "in.txt", "--out", "out.txt", "--config-file", "config.yaml")
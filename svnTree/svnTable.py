@@ -10,6 +10,7 @@ log = logging.getLogger()
 
 import csv
 import sqlite3
+import xml.etree.ElementTree as ElementTree
 from contextlib import contextmanager
 from typing import Dict, Generator, List, Tuple
 from functools import lru_cache
@@ -341,15 +342,21 @@ class SVNTable(object):
             log.info(f"SVNTable.read_from_file skipping '{in_file}': file was already read")
             return
 
+        # wzip files are decompressed while reading, rows are parsed as data is inflated
+        in_file_without_wzip, wzip_extension = os.path.splitext(in_file)
+        is_wzip = wzip_extension == ".wzip"
+        if not is_wzip:
+            in_file_without_wzip = in_file
         if a_format == "guess":
-            _, extension = os.path.splitext(in_file)
+            _, extension = os.path.splitext(in_file_without_wzip)
             a_format = map_info_extension_to_format[extension[1:]]
         self.comments.append(f"Original file {in_file}")
         if a_format in list(self.read_func_by_format.keys()):
-            with utils.open_for_read_file_or_url(in_file, config_vars=config_vars) as open_file:
+            with utils.open_for_read_file_or_url(in_file, config_vars=config_vars, encoding=None if is_wzip else 'utf-8') as open_file:
                 if disable_indexes_during_read:
                     self.drop_indexes()
-                self.read_func_by_format[a_format](open_file.fd, progress_callback=progress_callback)
+                rfd = utils.open_wzip_for_read(open_file.fd) if is_wzip else open_file.fd
+                self.read_func_by_format[a_format](rfd, progress_callback=progress_callback)
                 if disable_indexes_during_read:
                     self.create_indexes()
                 self.files_read_list.append(in_file)
@@ -477,6 +484,105 @@ class SVNTable(object):
             for rows in utils.iter_grouper(8192, row_yielder):
                 curs.executemany(insert_q, rows)
 
+    def read_from_svn_info_xml(self, info_xml_file, props_xml_file=None, file_sizes_file=None, progress_callback=None) -> None:
+        """ bulk alternative to reading svn info, svn proplist and file-sizes files one after the other:
+            properties and file sizes are read to memory, svn info --xml is parsed incrementally,
+            joined with the properties and sizes and all rows are inserted with one executemany.
+            Results are the same as calling read_from_file with formats 'info', 'props' and 'file-sizes'.
+            :param info_xml_file: output of svn info --xml
+            :param props_xml_file: output of svn proplist --xml, optional
+            :param file_sizes_file: output of FileSizes, optional
+        """
+        flags_and_props_by_path = dict()
+        if props_xml_file:
+            flags_and_props_by_path = self.read_props_xml_to_dict(props_xml_file)
+        size_by_path = dict()
+        if file_sizes_file:
+            size_by_path = self.read_file_sizes_to_dict(file_sizes_file)
+
+        def yield_row(_info_xml_file_):
+            for event, elem in ElementTree.iterparse(os.fspath(_info_xml_file_), events=("end",)):
+                if elem.tag != "entry":
+                    continue
+                path = elem.get("path")
+                if path != ".":
+                    if elem.find(".//tree-conflict") is not None or elem.find(".//conflict[@type='tree']") is not None:
+                        raise ValueError(f"Tree conflict at Path: {path}")
+                    commit_elem = elem.find("commit")
+                    if commit_elem is not None and commit_elem.get("revision") is not None:
+                        revision = int(commit_elem.get("revision"))  # Last Changed Rev
+                    elif elem.get("revision") is not None:
+                        revision = int(elem.get("revision"))
+                    else:
+                        revision = -1
+                    checksum = elem.findtext("wc-info/checksum")
+                    extra_flags, extra_props = flags_and_props_by_path.get(path, ("", ""))
+                    level, parent, leaf = self.level_parent_and_leaf_from_path(path)
+                    if elem.get("kind") == "file":
+                        flags, fileFlag, wtarFlag = 'f', 1, 1 if utils.wtar_file_re.match(path) else 0
+                    else:
+                        flags, fileFlag, wtarFlag = 'd', 0, 0
+                    yield (path, revision, checksum, size_by_path.get(path),
+                           level, parent, leaf,
+                           flags + extra_flags, fileFlag, wtarFlag,
+                           0, 0, extra_props)  # required, need_download, extra_props
+                elem.clear()
+
+        description = f"read svn info xml from {info_xml_file}"
+        with self.db.transaction(description=description, progress_callback=progress_callback) as curs:
+            insert_q = """
+                INSERT INTO svn_item_t (path, revision,
+                                      checksum, size,
+                                      level, parent, leaf,
+                                      flags, fileFlag, wtarFlag,
+                                      required, need_download, extra_props)
+                 VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?);
+                """
+            curs.executemany(insert_q, yield_row(info_xml_file))
+        files_read = [a_file for a_file in (info_xml_file, props_xml_file, file_sizes_file) if a_file]
+        self.comments.extend(f"Original file {a_file}" for a_file in files_read)
+        self.files_read_list.extend(files_read)
+
+    @staticmethod
+    def read_props_xml_to_dict(props_xml_file) -> Dict[str, Tuple[str, str]]:
+        """ parse the output of svn proplist --xml to a dict of path: (flags, extra_props)
+            same flags and extra_props as read_props would create
+        """
+        retVal = dict()
+        prop_name_to_flag = {'executable': 'x', 'special': 's'}
+        props_to_ignore = ['mime-type']
+        for event, elem in ElementTree.iterparse(os.fspath(props_xml_file), events=("end",)):
+            if elem.tag != "target":
+                continue
+            flags = ""
+            extra_props = ""
+            for prop_elem in elem.iter("property"):
+                prop_name = prop_elem.get("name", "")
+                if not prop_name.startswith("svn:"):
+                    continue
+                prop_name = prop_name[len("svn:"):]
+                if prop_name in prop_name_to_flag:
+                    flags += prop_name_to_flag[prop_name]
+                elif prop_name not in props_to_ignore:
+                    extra_props += f"{prop_name};"
+            retVal[elem.get("path")] = (flags, extra_props)
+            elem.clear()
+        return retVal
+
+    @staticmethod
+    def read_file_sizes_to_dict(file_sizes_file) -> Dict[str, int]:
+        """ parse a file created by FileSizes to a dict of path: size """
+        retVal = dict()
+        with utils.utf8_open_for_read(file_sizes_file, "r") as rfd:
+            for line_num, line in enumerate(rfd, start=1):
+                if not comment_line_re.match(line):
+                    parts = line.rstrip().rsplit(", ", 1)
+                    if len(parts) != 2:
+                        log.warning(f"""weird line {line}, {line_num}""")
+                        continue
+                    retVal[parts[0]] = int(parts[1])
+        return retVal
+
     @staticmethod
     def get_wtar_file_status(file_name) -> Tuple[bool, bool]:
         is_wtar_file: bool = utils.is_wtar_file(file_name)
@@ -498,7 +604,7 @@ class SVNTable(object):
         """
 
         if items_list is None:
-            items_list = self.get_items()
+            items_list = self.iter_items()
         if in_format == "guess":
             _, extension = os.path.splitext(in_file)
             in_format = map_info_extension_to_format[extension[1:]]
@@ -518,8 +624,7 @@ class SVNTable(object):
         for items in utils.iter_grouper(8192, items_list):
             if progress_callback:
                 progress_callback(f"write {len(items)} rows to {wfd.name}")
-            for item in items:
-                wfd.write(f"{item.str_specific_fields(field_to_write)}\n")
+            wfd.write("".join([f"{item.str_specific_fields(field_to_write)}\n" for item in items]))
 
     def initialize_from_folder(self, in_folder, progress_callback=None) -> None:
         def yield_row(_in_folder_) -> Generator:
@@ -828,16 +933,26 @@ class SVNTable(object):
         if what not in ("any", "file", "dir"):
             raise ValueError(f"{what} not a valid filter for get_item")
 
+        retVal = list(self.iter_items(what))
+        return retVal
+
+    def iter_items(self, what="any") -> Generator[SVNRow, None, None]:
+        """
+        same as get_items but yields the items one by one instead of reading them all to memory
+        :param what: what type of items to return "file" - only files, "dir" - only dirs, "any" - all type of items
+        """
+        if what not in ("any", "file", "dir"):
+            raise ValueError(f"{what} not a valid filter for get_item")
+
         extra_condition = {"file": "WHERE fileFlag == 1", "dir": "WHERE fileFlag == 0"}.get(what, "")
-        with self.db.selection() as curs:
+        with self.db.selection(description="iter_items") as curs:
             curs.execute(f"""
                     SELECT * FROM svn_item_t
                     {extra_condition}
                     ORDER BY _id
                     """)
-            retVal = curs.fetchall()
-            retVal = self.SVNRowListToObjects(retVal)
-        return retVal
+            for item in curs:
+                yield SVNRow(item)
 
     def get_required_items(self, what="any", get_unrequired=False) -> List[SVNRow]:
         """
@@ -1251,6 +1366,17 @@ class SVNTable(object):
                                 """, {"required_revision": required_revision})
         self.mark_required_completion()
 
+    def get_file_paths_of_revision(self, revision) -> List[str]:
+        """ paths of all files of a specific revision, regardless of the required marks
+        """
+        with self.db.selection() as curs:
+            curs.execute("""SELECT path FROM svn_item_t
+                                WHERE fileFlag==1 AND revision==:revision
+                                ORDER BY _id
+                                """, {"revision": revision})
+            retVal = [row[0] for row in curs.fetchall()]
+        return retVal
+
     def clear_required(self) -> None:
         with self.db.transaction() as curs:
             curs.execute("""UPDATE svn_item_t SET required=0""")
@@ -1385,7 +1511,12 @@ class SVNTable(object):
 
     # TODO: orem mayb use this function
     def get_items_for_default_infomap(self) -> List[SVNRow]:
-        with self.db.selection() as curs:
+        retVal = list(self.iter_items_for_default_infomap())
+        return retVal
+
+    def iter_items_for_default_infomap(self) -> Generator[SVNRow, None, None]:
+        """ yield, ordered by path, the items that are not linked to any non default info_map """
+        with self.db.selection(description="iter_items_for_default_infomap") as curs:
             curs.execute("""
                     SELECT * FROM svn_item_t
                     WHERE svn_item_t._id NOT IN (
@@ -1396,9 +1527,32 @@ class SVNTable(object):
                       AND index_item_detail_t.detail_name == 'info_map')
                     ORDER BY svn_item_t.path
                     """)
-            retVal = curs.fetchall()
-            retVal = self.SVNRowListToObjects(retVal)
-        return retVal
+            for item in curs:
+                yield SVNRow(item)
+
+    def iter_items_for_info_maps(self, info_map_names) -> Generator[Tuple[str, SVNRow], None, None]:
+        """ yield (info_map_name, item) for all items linked to one of info_map_names, in a single query.
+            Items of each info_map are yielded ordered by _id, an item linked to several info_maps
+            is yielded once for each of them.
+            Same items as calling mark_items_required_by_infomap & get_required_items for each info_map name.
+        """
+        info_map_names = list(info_map_names)
+        if not info_map_names:
+            return
+        names_placeholders = ", ".join("?" * len(info_map_names))
+        with self.db.selection(description="iter_items_for_info_maps") as curs:
+            curs.execute(f"""
+                    SELECT DISTINCT svn_item_t.*, index_item_detail_t.detail_value
+                    FROM svn_item_t
+                    JOIN iid_to_svn_item_t, index_item_detail_t
+                      ON svn_item_t._id == iid_to_svn_item_t.svn_id
+                      AND iid_to_svn_item_t.iid == index_item_detail_t.owner_iid
+                      AND index_item_detail_t.detail_name == 'info_map'
+                      AND index_item_detail_t.detail_value IN ({names_placeholders})
+                    ORDER BY svn_item_t._id
+                    """, info_map_names)
+            for item in curs:
+                yield item[-1], SVNRow(item)
 
     def populate_IIDToSVNItem(self) -> None:
         query_text = """
@@ -2,11 +2,14 @@ from .files import *
 from .misc_utils import *
 from .str_utils import *
 from .searchPaths import SearchPaths
-from .parallel_run import run_processes_in_parallel, run_process
+from .parallel_run import run_processes_in_parallel, run_process, run_forked_in_pool, ForkedTaskResult
 from .multi_file import MultiFileReader
-from .extract_info import extract_binary_info, check_binaries_versions_in_folder, check_binaries_versions_filter_with_ignore_regexes, get_info_from_plugin
+from .extract_info import extract_binary_info, check_binaries_versions_in_folder, check_binaries_versions_filter_with_ignore_regexes, get_info_from_plugin, BinaryInfoCache
 from .ls import disk_item_listing, single_disk_item_listing
 from .log_utils import *
+from .http_utils import get_http_session, close_http_sessions, http_get, http_validators_from_response
+from .download_queue import DownloadQueue, DownloadQueueItem, DownloadQueueCancelled, BandwidthLimiter, HostConcurrency
+from .progress_stream import ProgressEvents, progress_events
 import platform
 current_os = platform.system()
 if current_os == 'Darwin':
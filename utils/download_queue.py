@@ -0,0 +1,346 @@
+#!/usr/bin/env python3.9
+
+""" DownloadQueue: download many files over http(s) with a pool of threads.
+    - files are downloaded by priority, lower priority value first, and in the order they were added
+      within the same priority. Priorities can be changed while downloading, see prioritize.
+    - files marked as 'last' (e.g. Info.xml) are downloaded only after all other files were downloaded.
+    - a single file or the whole queue can be cancelled while downloading, a cancelled file
+      that was being downloaded is removed.
+    - files are downloaded to a temporary file next to the target and renamed to the target only
+      when complete and, if the item has a checksum, after the checksum was verified.
+    - the queue can be saved to a file, downloaded files are recorded in a journal next to it,
+      so a queue loaded again after an abort continues where it left off.
+    - the number of parallel downloads from each host adapts to the measured throughput and errors,
+      see HostConcurrency, and total bandwidth can be capped, see BandwidthLimiter.
+"""
+
+import os
+import heapq
+import itertools
+import json
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent import futures
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+from .http_utils import http_get, default_http_max_retries
+from .misc_utils import check_file_checksum
+
+log = logging.getLogger()
+
+
+@dataclass(order=True)
+class DownloadQueueItem:
+    priority: int
+    seq: int
+    url: str = field(compare=False)
+    path: str = field(compare=False)
+    size: int = field(default=0, compare=False)
+    last: bool = field(default=False, compare=False)
+    checksum: str = field(default="", compare=False)
+
+    def to_json_dict(self) -> Dict:
+        return {"url": self.url, "path": self.path, "size": self.size, "priority": self.priority, "last": self.last, "checksum": self.checksum}
+
+
+class DownloadQueueCancelled(Exception):
+    pass
+
+
+class BandwidthLimiter(object):
+    """ token bucket shared by all download threads, limits the total download rate to bytes_per_second """
+    def __init__(self, bytes_per_second, burst_seconds=1.0) -> None:
+        self.bytes_per_second = float(bytes_per_second)
+        self.capacity = self.bytes_per_second * burst_seconds
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def consume(self, num_bytes) -> None:
+        """ account for num_bytes that were read, sleep if reading them exceeded the allowed rate """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.bytes_per_second)
+            self.last_refill = now
+            self.tokens -= num_bytes
+            time_to_sleep = -self.tokens / self.bytes_per_second if self.tokens < 0 else 0.0
+        if time_to_sleep > 0:
+            time.sleep(time_to_sleep)
+
+
+class HostConcurrency(object):
+    """ limit of parallel downloads from one host, adapting to throughput and errors:
+        - after each window of completed downloads the throughput is measured; if it grew since the
+          limit was last changed the limit is increased by one, if it dropped the limit is decreased by one.
+        - on retries because the host is overloaded or the connection failed (429, 503, timeouts, connection errors)
+          the limit is halved, at most once per window: downloads that were already running when the limit was halved
+          would report the same overload again. Other failures, e.g. 404, say nothing about the host's capacity
+          and do not change the limit.
+        Failed and cancelled downloads are not throughput samples.
+        If adaptive is False the limit stays at maximum.
+    """
+    def __init__(self, maximum, initial=None, adaptive=True) -> None:
+        self.maximum = max(1, maximum)
+        self.adaptive = adaptive
+        self.limit = min(self.maximum, initial or self.maximum) if adaptive else self.maximum
+        self.active = 0
+        self.condition = threading.Condition()
+        self.previous_throughput = None
+        self.reset_window()
+
+    def reset_window(self) -> None:
+        self.window_start = time.monotonic()
+        self.window_bytes = 0
+        self.window_completed = 0
+        self.window_released = 0  # completed, failed or cancelled downloads
+        self.decreased_in_window = False
+
+    def acquire(self) -> None:
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+
+    def release(self, num_bytes=None) -> None:
+        """ num_bytes: bytes downloaded, or None if the download failed or was cancelled and should not count as a throughput sample """
+        with self.condition:
+            self.active -= 1
+            if self.adaptive:
+                self.window_released += 1
+                if num_bytes is not None:
+                    self.window_bytes += num_bytes
+                    self.window_completed += 1
+                if self.window_completed >= 2 * self.limit:
+                    self.adapt_to_throughput()
+                elif self.decreased_in_window and self.window_released >= 2 * self.limit:
+                    # downloads failed since the limit was halved, start a new window so the limit can be halved again
+                    self.reset_window()
+            self.condition.notify_all()
+
+    def report_error(self) -> None:
+        with self.condition:
+            self.decrease()
+
+    def decrease(self) -> None:
+        if self.adaptive and not self.decreased_in_window:
+            self.limit = max(1, self.limit // 2)
+            self.previous_throughput = None
+            self.reset_window()
+            self.decreased_in_window = True
+
+    def adapt_to_throughput(self) -> None:
+        elapsed = max(time.monotonic() - self.window_start, 1e-6)
+        throughput = self.window_bytes / elapsed
+        if self.previous_throughput is None or throughput > self.previous_throughput * 1.05:
+            self.limit = min(self.maximum, self.limit + 1)
+        elif throughput < self.previous_throughput * 0.9:
+            self.limit = max(1, self.limit - 1)
+        self.previous_throughput = throughput
+        self.reset_window()
+
+
+class DownloadQueue(object):
+    def __init__(self) -> None:
+        self.heaps = {False: list(), True: list()}  # the 'last' items are kept in a separate heap
+        self.seq = itertools.count()
+        self.lock = threading.Lock()
+        self.cancelled_paths = set()
+        self.all_cancelled = threading.Event()
+        self.journal_path: Optional[Path] = None
+        self.done_paths = set()
+        self.failed: Dict[str, Exception] = dict()
+        self.statistics = Counter()
+        self.hosts: Dict[str, HostConcurrency] = dict()
+        self.bandwidth_limiter: Optional[BandwidthLimiter] = None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.heaps[False]) + len(self.heaps[True])
+
+    def add(self, url, path, size=0, priority=0, last=False, checksum=None) -> None:
+        """ checksum: sha1 of the file, if given the downloaded file is verified against it """
+        item = DownloadQueueItem(priority=int(priority), seq=next(self.seq), url=url, path=os.fspath(path), size=int(size), last=bool(last),
+                                 checksum=checksum or "")
+        with self.lock:
+            heapq.heappush(self.heaps[item.last], item)
+
+    def prioritize(self, paths, priority=-1) -> None:
+        """ change the priority of items not yet downloaded, e.g. when the user wants some files first """
+        paths = set(os.fspath(p) for p in paths)
+        with self.lock:
+            for heap in self.heaps.values():
+                for item in heap:
+                    if item.path in paths:
+                        item.priority = priority
+                heapq.heapify(heap)
+
+    def cancel(self, path=None) -> None:
+        """ cancel the download of a file, or of all files if path is None """
+        if path is None:
+            self.all_cancelled.set()
+        else:
+            with self.lock:
+                self.cancelled_paths.add(os.fspath(path))
+
+    def is_cancelled(self, path) -> bool:
+        return self.all_cancelled.is_set() or path in self.cancelled_paths
+
+    def pop(self, last) -> Optional[DownloadQueueItem]:
+        with self.lock:
+            return heapq.heappop(self.heaps[last]) if self.heaps[last] else None
+
+    def items(self) -> List[DownloadQueueItem]:
+        with self.lock:
+            return sorted(self.heaps[False]) + sorted(self.heaps[True])
+
+    def save(self, queue_file_path) -> None:
+        """ write the queue as json lines and start a new journal of downloaded files next to it """
+        queue_file_path = Path(queue_file_path)
+        with open(queue_file_path, "w", encoding='utf-8') as wfd:
+            for item in self.items():
+                wfd.write(json.dumps(item.to_json_dict()))
+                wfd.write("\n")
+        self.journal_path = self.journal_path_for(queue_file_path)
+        self.journal_path.unlink(missing_ok=True)
+        self.done_paths.clear()
+
+    @classmethod
+    def load(cls, queue_file_path) -> 'DownloadQueue':
+        """ read a queue written by save, files recorded in the journal are considered already downloaded """
+        retVal = cls()
+        queue_file_path = Path(queue_file_path)
+        with open(queue_file_path, "r", encoding='utf-8') as rfd:
+            for line in rfd:
+                if line.strip():
+                    retVal.add(**json.loads(line))
+        retVal.journal_path = cls.journal_path_for(queue_file_path)
+        if retVal.journal_path.is_file():
+            with open(retVal.journal_path, "r", encoding='utf-8') as rfd:
+                retVal.done_paths.update(line.rstrip("\n") for line in rfd if line.strip())
+        return retVal
+
+    @staticmethod
+    def journal_path_for(queue_file_path: Path) -> Path:
+        return queue_file_path.with_name(queue_file_path.name + ".done")
+
+    def already_downloaded(self, item: DownloadQueueItem) -> bool:
+        retVal = False
+        if item.path in self.done_paths:
+            try:
+                retVal = item.size <= 0 or os.path.getsize(item.path) == item.size
+            except OSError:
+                pass
+        return retVal
+
+    def record_done(self, item: DownloadQueueItem) -> None:
+        with self.lock:
+            self.done_paths.add(item.path)
+            if self.journal_path is not None:
+                with open(self.journal_path, "a", encoding='utf-8') as wfd:
+                    wfd.write(item.path)
+                    wfd.write("\n")
+
+    def host_concurrency(self, url, max_workers, initial_workers, adaptive) -> HostConcurrency:
+        netloc = urllib.parse.urlparse(url).netloc
+        with self.lock:
+            retVal = self.hosts.get(netloc)
+            if retVal is None:
+                retVal = self.hosts[netloc] = HostConcurrency(max_workers, initial_workers, adaptive)
+        return retVal
+
+    def run(self, max_workers=8, headers=None, verify_ssl=False, max_retries=default_http_max_retries,
+            read_size=128*1024, progress_callback=None, adaptive=True, initial_workers=None, max_bytes_per_second=0) -> Counter:
+        """ download all items in the queue, the 'last' items only after all others were downloaded.
+            progress_callback(item, statistics) is called after each file was handled.
+            max_workers: maximal number of parallel downloads, from each host parallel downloads start with
+                initial_workers (default: half of max_workers) and adapt to throughput if adaptive is True.
+            max_bytes_per_second: if > 0, the total download rate of all threads is capped
+            :return: statistics: number of downloaded, skipped, cancelled and failed files
+            raises DownloadQueueCancelled if the queue was cancelled, RuntimeError if some files failed to download
+        """
+        if max_bytes_per_second > 0:
+            self.bandwidth_limiter = BandwidthLimiter(max_bytes_per_second)
+        if initial_workers is None:
+            initial_workers = max(1, max_workers // 2)
+        for last in (False, True):
+            with self.lock:
+                num_items = len(self.heaps[last])
+            if num_items == 0:
+                continue
+            num_workers = max(1, min(max_workers, num_items))
+            with futures.ThreadPoolExecutor(num_workers, thread_name_prefix="download") as executor:
+                workers = [executor.submit(self.worker, last, headers, verify_ssl, max_retries, read_size, progress_callback,
+                                           lambda url: self.host_concurrency(url, max_workers, initial_workers, adaptive))
+                           for _ in range(num_workers)]
+                for worker in futures.as_completed(workers):
+                    worker.result()
+            if self.all_cancelled.is_set():
+                raise DownloadQueueCancelled(f"download was cancelled, {self.statistics['downloaded']} files were downloaded")
+        if self.failed:
+            first_path, first_exception = next(iter(self.failed.items()))
+            raise RuntimeError(f"failed to download {len(self.failed)} files, e.g. {first_path}: {first_exception}")
+        return self.statistics
+
+    def worker(self, last, headers, verify_ssl, max_retries, read_size, progress_callback, get_host_concurrency) -> None:
+        while not self.all_cancelled.is_set():
+            item = self.pop(last)
+            if item is None:
+                break
+            try:
+                if self.is_cancelled(item.path):
+                    outcome = "cancelled"
+                elif self.already_downloaded(item):
+                    outcome = "skipped"
+                else:
+                    host = get_host_concurrency(item.url)
+                    host.acquire()
+                    num_bytes = None
+                    try:
+                        outcome, num_bytes = self.download_item(item, headers, verify_ssl, max_retries, read_size, host)
+                        if outcome == "cancelled":
+                            num_bytes = None  # a partial download is not a throughput sample
+                    finally:
+                        # overload and connection errors already decreased the limit through http_get's retry_callback
+                        host.release(num_bytes)
+            except Exception as ex:
+                log.warning(f"failed to download {item.url} to {item.path}, {ex}")
+                outcome = "failed"
+                with self.lock:
+                    self.failed[item.path] = ex
+            with self.lock:
+                self.statistics[outcome] += 1
+            if progress_callback is not None:
+                progress_callback(item, self.statistics)
+
+    def download_item(self, item: DownloadQueueItem, headers, verify_ssl, max_retries, read_size, host: HostConcurrency):
+        """ :return: outcome ("downloaded" or "cancelled") and number of bytes downloaded
+            raises ValueError if the downloaded file does not match the item's checksum
+        """
+        target_path = Path(item.path)
+        num_bytes = 0
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        # temp name per thread, the same path might be queued more than once and downloaded by two threads
+        downloading_path = target_path.with_name(f"{target_path.name}.{threading.get_ident()}.downloading")
+        try:
+            with http_get(item.url, headers=headers, verify_ssl=verify_ssl, max_retries=max_retries,
+                          retry_callback=lambda url, reason: host.report_error()) as response:
+                with open(downloading_path, "wb") as wfd:
+                    for chunk in response.iter_content(read_size):
+                        if self.is_cancelled(item.path):
+                            return "cancelled", num_bytes
+                        wfd.write(chunk)
+                        num_bytes += len(chunk)
+                        if self.bandwidth_limiter is not None:
+                            self.bandwidth_limiter.consume(len(chunk))
+            if item.checksum and not check_file_checksum(downloading_path, item.checksum):
+                raise ValueError(f"checksum mismatch for {item.url}, expected {item.checksum}")
+            os.replace(downloading_path, target_path)
+        finally:
+            downloading_path.unlink(missing_ok=True)
+        self.record_done(item)
+        return "downloaded", num_bytes
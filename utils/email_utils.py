@@ -2,14 +2,13 @@
 
 import os
 import re
-import smtplib
-from email import encoders
-from email.mime.base import MIMEBase
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 
 
 def send_email(subject, content, sender, recipients, smtp_server, smtp_port):
+    # smtplib and email are imported here, so importing utils does not pay for importing them
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
 
     server = smtplib.SMTP(smtp_server, smtp_port)
     #server.set_debuglevel(debug_level)
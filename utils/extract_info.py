@@ -3,14 +3,22 @@
 import os
 import sys
 import plistlib
+import shutil
 import subprocess
+import tempfile
 import xml.etree.ElementTree as ET
 import codecs
 import re
+import json
+import threading
+from concurrent import futures
 from pathlib import Path
+import logging
 
 import utils
 
+log = logging.getLogger()
+
 if sys.platform == 'win32':
     import win32api
 
@@ -172,23 +180,22 @@ def Mac_dylib(in_os, in_path):
 
 def Mac_pkg(in_os, in_path):
     retVal = None
+    # pkgs may be scanned in parallel so each call expands to its own temp folder
+    tmp_folder = tempfile.mkdtemp(prefix="forSGDriverVersion")
     try:
-        # define args
-        clr_tmp = 'rm -rf /tmp/forSGDriverVersion'
-        extract_pkg_to_tmp = 'pkgutil --expand %s /tmp/forSGDriverVersion' % in_path
-        # clear tmp from any remaining SG driver version info
-        subprocess.call(clr_tmp.split(' '))
-        # extract pkg to tmp
-        subprocess.call(extract_pkg_to_tmp.split(' '))
-        dist_path = '/tmp/forSGDriverVersion/Distribution'
+        # pkgutil wants to create the expand folder itself
+        expand_folder = os.path.join(tmp_folder, "expanded")
+        subprocess.call(['pkgutil', '--expand', os.fspath(in_path), expand_folder])
+        dist_path = os.path.join(expand_folder, 'Distribution')
         with open(dist_path, 'r') as fo:
             lines = fo.readlines()
 
         version = lines[-2].split('"')[1]
-        subprocess.call(clr_tmp.split(' '))
         retVal = (in_path, version, None)
     except:
         pass
+    finally:
+        shutil.rmtree(tmp_folder, ignore_errors=True)
     return retVal
 
 
@@ -283,6 +290,55 @@ extract_info_funcs_by_extension = {
 }
 
 
+# files each extract function parses, BinaryInfoCache entries are valid as long as these files did not change
+def plugin_bundle_info_files(in_os, in_path: Path):
+    retVal = [in_path.joinpath('Contents', 'Info.xml')]
+    if in_os == 'Mac':
+        retVal.extend(Mac_bundle_info_files(in_os, in_path))
+    elif in_os == 'Win':
+        retVal.extend(Win_bundle_info_files(in_os, in_path))
+    return retVal
+
+
+def Mac_bundle_info_files(in_os, in_path: Path):
+    return [Path(in_path, 'Contents/Info.plist'), Path(in_path, 'Contents', 'Resources', 'InfoXML', '1000.xml')]
+
+
+def Mac_framework_info_files(in_os, in_path: Path):
+    return [Path(in_path, 'Versions/Current/Resources/Info.plist')]
+
+
+def Win_bundle_info_files(in_os, in_path: Path):
+    dll_name = in_path.name.replace('bundle', 'dll')
+    return [in_path.joinpath('Contents', 'Win64', dll_name), in_path.joinpath('Contents', 'Win32', dll_name),
+            in_path.joinpath('Contents', 'Resources', 'InfoXML', '1000.xml')]
+
+
+def Win_aaxplugin_info_files(in_os, in_path: Path):
+    return [Path(in_path, 'Contents', 'x64', in_path.name.replace('bundle', 'aaxplugin'))]
+
+
+info_files_funcs_by_extract_func = {
+    plugin_bundle: plugin_bundle_info_files,
+    Mac_bundle: Mac_bundle_info_files,
+    Mac_framework: Mac_framework_info_files,
+    Win_bundle: Win_bundle_info_files,
+    Win_aaxplugin: Win_aaxplugin_info_files,
+}
+
+
+def files_read_by_extract_func(in_os, in_path: Path, extract_func):
+    """ files extract_func parses to get the info of in_path, extract functions not listed in
+        info_files_funcs_by_extract_func parse in_path itself
+    """
+    info_files_func = info_files_funcs_by_extract_func.get(extract_func)
+    if info_files_func is None:
+        retVal = [in_path]
+    else:
+        retVal = info_files_func(in_os, Path(in_path))
+    return retVal
+
+
 class check_binaries_versions_filter_with_ignore_regexes(object):
     def __init__(self, ignore_file_regexes=None, ignore_folder_regexes=None):
         if ignore_file_regexes is None:
@@ -312,26 +368,152 @@ class check_binaries_versions_filter_with_ignore_regexes(object):
         return retVal
 
 
-def check_binaries_versions_in_folder(current_os, in_path: Path, in_filter=lambda p: True):
-    retVal = list()
-    for root_path, dirs, files in os.walk(in_path, followlinks=False):
-        if not in_filter(root_path):
-            del dirs[:]  # skip root_path and it's siblings
-            del files[:]
+class BinaryInfoCache(object):
+    """ info extracted from binaries, keyed by path and valid as long as the files the extract function parses
+        did not change, so unchanged plugins are not parsed again. Files inside a bundle can be replaced
+        without changing the modification time of the bundle or of it's Contents folder, so the stamp is taken
+        from the parsed files, e.g. Contents/Info.plist, and not from the bundle.
+        Only entries used since the cache was loaded are saved.
+    """
+    def __init__(self, cache_file_path=None) -> None:
+        self.cache_file_path = Path(cache_file_path) if cache_file_path else None
+        self.loaded_entries = dict()
+        self.used_entries = dict()
+        self.lock = threading.Lock()
+        self.num_hits = 0
+        self.num_misses = 0
+        if self.cache_file_path is not None:
+            try:
+                with open(self.cache_file_path, "r", encoding='utf-8') as rfd:
+                    self.loaded_entries = json.load(rfd)
+            except (OSError, ValueError):
+                pass
+
+    @staticmethod
+    def stamp(info_file_paths):
+        """ modification time and size of each file, None for files that do not exist """
+        retVal = list()
+        for info_file_path in info_file_paths:
+            try:
+                stat = os.stat(info_file_path)
+                retVal.append([stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                retVal.append(None)
+        return retVal
+
+    def get_or_extract(self, in_os, in_path: Path, extract_func):
+        key = f"{in_os}:{os.fspath(in_path)}"
+        stamp = self.stamp(files_read_by_extract_func(in_os, in_path, extract_func))
+        with self.lock:
+            entry = self.loaded_entries.get(key) or self.used_entries.get(key)
+        if entry is not None and entry["stamp"] == stamp:
+            self.num_hits += 1
+            info = entry["info"]
+        else:
+            self.num_misses += 1
+            retVal = extract_func(in_os, in_path)
+            info = None if retVal is None else [retVal[1], retVal[2]]
+            entry = {"stamp": stamp, "info": info}
+        with self.lock:
+            self.used_entries[key] = entry
+        return None if info is None else (in_path, info[0], info[1])
+
+    def save(self) -> None:
+        if self.cache_file_path is not None:
+            try:
+                self.cache_file_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.cache_file_path, "w", encoding='utf-8') as wfd:
+                    json.dump(self.used_entries, wfd)
+            except OSError as ex:
+                log.warning(f"failed to save binaries info cache {self.cache_file_path}, {ex}")
+
+
+def extract_binary_info_with_cache(in_os, in_path: Path, cache: BinaryInfoCache = None):
+    file_extension = in_path.suffix
+    func = extract_info_funcs_by_extension[in_os].get(file_extension, default_extract_info)
+    if cache is None or func is default_extract_info:
+        retVal = func(in_os, in_path)
+    else:
+        retVal = cache.get_or_extract(in_os, in_path, func)
+    return retVal
+
+
+def scan_folder_for_binaries_versions(current_os, root_path, in_filter, cache):
+    """ extract info from one folder the way os.walk(followlinks=False) visits it:
+        if info was found for the folder itself, it's contents is not scanned,
+        otherwise info is extracted from the files in the folder.
+        :return: list of info found, list of sub folders to scan
+    """
+    infos, sub_folders = list(), list()
+    try:
+        entries = list(os.scandir(root_path))
+    except OSError:
+        return infos, sub_folders
+    if in_filter(root_path):
+        root_Path = Path(root_path)
+        info = extract_binary_info_with_cache(current_os, root_Path, cache)
+        if info is not None:
+            infos.append(info)  # info was found for root_path, no need to dig deeper
         else:
-            root_Path = Path(root_path)
-            info = extract_binary_info(current_os, root_Path)
-            if info is not None:
-                retVal.append(info)
-                del dirs[:]  # info was found for root_path, no need to dig deeper
-                del files[:]
-            else:
-                for a_file in files:
-                    file_full_Path = root_Path.joinpath(a_file)
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    if not entry.is_symlink():
+                        sub_folders.append(entry.path)
+                else:
+                    file_full_Path = root_Path.joinpath(entry.name)
                     if not in_filter(file_full_Path):
                         continue
                     if not file_full_Path.is_symlink():
-                        info = extract_binary_info(current_os, file_full_Path)
+                        info = extract_binary_info_with_cache(current_os, file_full_Path, cache)
                         if info is not None:
-                            retVal.append(info)
+                            infos.append(info)
+    return infos, sub_folders
+
+
+def scan_tree_for_binaries_versions(current_os, root_path, in_filter, cache):
+    infos, sub_folders = scan_folder_for_binaries_versions(current_os, root_path, in_filter, cache)
+    for sub_folder in sub_folders:
+        infos.extend(scan_tree_for_binaries_versions(current_os, sub_folder, in_filter, cache))
+    return infos
+
+
+def check_binaries_versions_in_folder(current_os, in_path: Path, in_filter=lambda p: True, max_workers=1, cache: BinaryInfoCache = None):
+    """ find binaries under in_path and extract their version and guid.
+        With max_workers > 1 the top folders are scanned one by one until there are enough sub trees
+        to scan them in parallel. Results are in the same order as with a serial scan.
+        If cache is given, info is extracted only from binaries that changed since they were cached.
+    """
+    # slots hold either a list of infos already found or a sub folder (str) still to be scanned, in walk order
+    slots = [os.fspath(in_path)]
+    if max_workers > 1:
+        wanted_sub_trees = 4 * max_workers
+        for _ in range(3):  # expand up to 3 levels
+            num_sub_trees = sum(1 for slot in slots if isinstance(slot, str))
+            if num_sub_trees == 0 or num_sub_trees >= wanted_sub_trees:
+                break
+            expanded_slots = list()
+            for slot in slots:
+                if isinstance(slot, str):
+                    infos, sub_folders = scan_folder_for_binaries_versions(current_os, slot, in_filter, cache)
+                    expanded_slots.append(infos)
+                    expanded_slots.extend(sub_folders)
+                else:
+                    expanded_slots.append(slot)
+            slots = expanded_slots
+
+    sub_trees = [slot for slot in slots if isinstance(slot, str)]
+    if max_workers > 1 and len(sub_trees) > 1:
+        with futures.ThreadPoolExecutor(max_workers, thread_name_prefix="check_binaries") as executor:
+            sub_trees_infos = list(executor.map(lambda folder: scan_tree_for_binaries_versions(current_os, folder, in_filter, cache), sub_trees))
+    else:
+        sub_trees_infos = [scan_tree_for_binaries_versions(current_os, folder, in_filter, cache) for folder in sub_trees]
+
+    retVal = list()
+    sub_trees_infos_iter = iter(sub_trees_infos)
+    for slot in slots:
+        retVal.extend(next(sub_trees_infos_iter) if isinstance(slot, str) else slot)
     return retVal
@@ -2,21 +2,25 @@
 
 import sys
 import os
+import io
 import re
+import json
 import shutil
 import time
 import stat
 import fnmatch
 from contextlib import contextmanager
-import ssl
 import subprocess
-from pathlib import Path
+import threading
+from pathlib import Path, PurePath
+from collections import defaultdict
 import logging
 
 log = logging.getLogger()
 
 import zlib
-import urllib.request, urllib.error, urllib.parse
+import hashlib
+import urllib.error, urllib.parse
 
 from typing import Optional, TextIO
 
@@ -72,6 +76,75 @@ def utf8_open_for_write(*args, **kwargs) -> TextIO:
     return retVal
 
 
+class TextAndWzipWriter(object):
+    """ write utf-8 text to a file and optionally, at the same time, a zlib compressed (wzip) copy of the same text.
+        sha1 checksum and size of both files are calculated while writing, so the files do not need to be read again.
+        Example:
+            with TextAndWzipWriter("info_map.txt", "info_map.txt.wzip") as wfd:
+                wfd.write("a/b, f, 1\n")
+            print(wfd.text_checksum(), wfd.text_size, wfd.wzip_checksum(), wfd.wzip_size)
+    """
+    def __init__(self, text_path, wzip_path=None, compression_level=8, buffer_size=1024*1024) -> None:
+        self.name = os.fspath(text_path)
+        self.wzip_name = os.fspath(wzip_path) if wzip_path else None
+        self.compression_level = compression_level
+        self.buffer_size = buffer_size
+        self.text_fd = None
+        self.wzip_fd = None
+        self.compressor = None
+        self.text_sha1 = hashlib.sha1()
+        self.wzip_sha1 = hashlib.sha1()
+        self.text_size = 0
+        self.wzip_size = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, etype, value, traceback):
+        self.close()
+
+    def open(self):
+        if self.text_fd is not None:
+            return
+        Path(self.name).parent.mkdir(parents=True, exist_ok=True)
+        self.text_fd = open(self.name, "wb", buffering=self.buffer_size)
+        chown_chmod_on_fd(self.text_fd)
+        if self.wzip_name:
+            self.wzip_fd = open(self.wzip_name, "wb", buffering=self.buffer_size)
+            chown_chmod_on_fd(self.wzip_fd)
+            self.compressor = zlib.compressobj(self.compression_level)
+
+    def _write_wzip(self, compressed):
+        if compressed:
+            self.wzip_fd.write(compressed)
+            self.wzip_sha1.update(compressed)
+            self.wzip_size += len(compressed)
+
+    def write(self, text):
+        data = text.encode('utf-8', errors='backslashreplace')
+        self.text_fd.write(data)
+        self.text_sha1.update(data)
+        self.text_size += len(data)
+        if self.compressor is not None:
+            self._write_wzip(self.compressor.compress(data))
+
+    def close(self):
+        if self.compressor is not None:
+            self._write_wzip(self.compressor.flush())
+            self.compressor = None
+        for fd in (self.text_fd, self.wzip_fd):
+            if fd is not None:
+                fd.close()
+        self.text_fd = self.wzip_fd = None
+
+    def text_checksum(self):
+        return self.text_sha1.hexdigest()
+
+    def wzip_checksum(self):
+        return self.wzip_sha1.hexdigest()
+
+
 def write_shell_command(cmd, output_script):
     script_start = "#!/bin/bash"
     exists = os.path.isfile(output_script)
@@ -191,6 +264,7 @@ def patch_verify_ssl(verify_ssl):
     """ if verify_ssl is False, patch ssl._create_default_https_context to be
         ssl._create_unverified_context and un-patch after it was used
     """
+    import ssl
     if not verify_ssl:
         original_create_default_https_context = ssl._create_default_https_context
         ssl._create_default_https_context = ssl._create_unverified_context
@@ -206,7 +280,23 @@ protocol_header_re = re.compile("""
 
 
 def read_file_or_url_utf8(in_file_or_url, config_vars, path_searcher=None, save_to_path=None, checksum=None,
-                          connection_obj=None):
+                          connection_obj=None, cache_folder=None):
+    """ read a local file or url and return it's text and the actual path of the file that was read.
+        if cache_folder is given, a url is downloaded to cache_folder and read from there, so unchanged
+        files are not downloaded again, see download_and_cache_file_or_url.
+    """
+    if cache_folder is not None and protocol_header_re.match(os.fspath(in_file_or_url)):
+        translate_url_callback = None
+        if connection_obj is not None:
+            def translate_url_callback(url, _config_vars):
+                return url, connection_obj.get_custom_headers(urllib.parse.urlparse(url).netloc)
+        cached_file_path = download_and_cache_file_or_url(in_file_or_url, config_vars, Path(cache_folder),
+                                                          translate_url_callback=translate_url_callback,
+                                                          expected_checksum=checksum)
+        with utf8_open_for_read(cached_file_path, "r") as rdf:
+            buffer = utils.unicodify(rdf.read())
+        return buffer, in_file_or_url
+
     need_to_download = not utils.check_file_checksum(save_to_path, checksum)
     if not need_to_download:
         # if save_to_path contains the correct data just read it by recursively
@@ -227,11 +317,13 @@ def read_file_or_url_utf8(in_file_or_url, config_vars, path_searcher=None, save_
         with utf8_open_for_read(actual_file_path, "r") as rdf:
             buffer = rdf.read()
     else:
-        assert connection_obj, "no connection_obj given"
-        session = connection_obj.get_session(in_file_or_url)
-        response = session.get(in_file_or_url, timeout=(33.05, 180.05))
-        response.raise_for_status()
-        buffer = response.text
+        custom_headers = None
+        if connection_obj is not None:
+            custom_headers = connection_obj.get_custom_headers(urllib.parse.urlparse(in_file_or_url).netloc)
+        response = utils.http_get(in_file_or_url, headers=custom_headers, stream=False,
+                                  verify_ssl=http_verify_ssl(config_vars), max_retries=http_max_retries(config_vars))
+        with response:
+            buffer = response.text
     buffer = utils.unicodify(buffer)  # make sure text is unicode
     if save_to_path and in_file_or_url != save_to_path:
         with open(save_to_path, "w") as wfd:
@@ -240,15 +332,47 @@ def read_file_or_url_utf8(in_file_or_url, config_vars, path_searcher=None, save_
     return buffer, actual_file_path
 
 
-class open_for_read_file_or_url(object):
+def http_verify_ssl(config_vars) -> bool:
+    retVal = False
+    if config_vars is not None:
+        retVal = config_vars.get("VERIFY_SSL_CERTIFICATES", False).bool()
+    return retVal
+
+
+def http_offline_mode(config_vars) -> bool:
+    """ in offline mode control files are read only from cache """
+    retVal = False
+    if config_vars is not None:
+        retVal = config_vars.get("HTTP_OFFLINE_MODE", False).bool()
+    return retVal
+
+
+def http_max_retries(config_vars) -> int:
+    retVal = utils.http_utils.default_http_max_retries
+    if config_vars is not None:
+        retVal = config_vars.get("HTTP_MAX_RETRIES", retVal).int()
+    return retVal
 
+
+class open_for_read_file_or_url(object):
+    """ open a local file or url for reading.
+        urls are read with utils.http_get: shared keep-alive session, retries with backoff.
+        if validators (etag, last_modified) of a previous download are given, a conditional GET is made,
+        and if the url was not modified self.not_modified will be True and self.fd will be empty.
+        After opening a url self.response_validators hold the validators of the response.
+    """
     def __init__(self, in_file_or_url, config_vars, translate_url_callback=None, path_searcher=None, encoding='utf-8',
-                 verify_ssl=False) -> None:
+                 verify_ssl=None, validators=None) -> None:
         self.local_file_path = None
         self.url = None
         self.custom_headers = None
         self.encoding = encoding
-        self.verify_ssl = verify_ssl
+        self.verify_ssl = http_verify_ssl(config_vars) if verify_ssl is None else verify_ssl
+        self.max_retries = http_max_retries(config_vars)
+        self.validators = validators
+        self.response = None
+        self.response_validators = dict()
+        self.not_modified = False
         self.fd = None
         self._actual_path = in_file_or_url
         match = protocol_header_re.match(os.fspath(in_file_or_url))
@@ -273,25 +397,20 @@ class open_for_read_file_or_url(object):
     def __enter__(self):
         try:
             if self.url:
-                opener = urllib.request.build_opener()
-                if self.custom_headers:
-                    for custom_header in self.custom_headers:
-                        opener.addheaders.append(custom_header)
-                with patch_verify_ssl(
-                        self.verify_ssl):  # if self.verify_ssl is False this will disable SSL verifications
-                    # crud retry mechanism, should be improved, use requests?
-                    retries = 12
-                    while retries > 0:
-                        try:
-                            retries -= 1
-                            self.fd = opener.open(self.url, timeout=32)
-                            retries = 0
-                        except:
-                            if retries == 0:
-                                raise
-                            else:
-                                time.sleep(1.0)
-
+                import requests
+                try:
+                    self.response = utils.http_get(self.url, headers=self.custom_headers, verify_ssl=self.verify_ssl,
+                                                   validators=self.validators, max_retries=self.max_retries)
+                except requests.HTTPError as http_err:
+                    # callers expect urllib's exceptions
+                    raise urllib.error.HTTPError(self.url, http_err.response.status_code, str(http_err), http_err.response.headers, None) from http_err
+                except requests.RequestException as req_err:
+                    raise urllib.error.URLError(req_err) from req_err
+                self.not_modified = self.response.status_code == 304
+                self.response_validators = utils.http_validators_from_response(self.response)
+                self.response.raw.decode_content = True  # so gzip transfer encoding is decoded
+                self.fd = self.response.raw
+                self.fd.name = self.url
             elif self.local_file_path:
                 if self.encoding is None:
                     self.fd = open(self.local_file_path, "rb")
@@ -305,7 +424,10 @@ class open_for_read_file_or_url(object):
         return self
 
     def __exit__(self, unused_type, unused_value, unused_traceback):
-        self.fd.close()
+        if self.response is not None:
+            self.response.close()
+        else:
+            self.fd.close()
 
     @property
     def actual_path(self):
@@ -341,34 +463,171 @@ def read_from_file_or_url(in_url, config_vars, translate_url_callback=None, expe
 def download_and_cache_file_or_url(in_url, config_vars, cache_folder: Path, translate_url_callback=None,
                                    expected_checksum=None):
     """ download file to given cache folder
-        if checksum is supplied and the a file with that checksum exists in cache folder - download can be avoided
-        otherwise download the file
+        if checksum is supplied and the a file with that checksum exists in cache folder - download can be avoided,
+        same if a copy previously downloaded from the same url has that checksum.
+        if checksum is not supplied a conditional GET is made and a copy previously downloaded from the same url
+        is used if the server reports it was not modified.
+        In offline mode (HTTP_OFFLINE_MODE) the file is never downloaded, FileNotFoundError is raised if not in cache.
         :return: path of the downloaded file
     """
     from pybatch import MakeDir
     with MakeDir(cache_folder, report_own_progress=False) as md:
         md()
 
+    offline = http_offline_mode(config_vars)
     url_file_name = last_url_item(in_url)
-    cached_file_name = expected_checksum if expected_checksum else url_file_name
-    cached_file_path = cache_folder.joinpath(cached_file_name)
-    if expected_checksum is None:  # no checksum? -> force download
-        safe_remove_file(cached_file_path)
+    url_cached_file_path = cache_folder.joinpath(url_file_name)
+    if expected_checksum is None:  # no checksum? -> download, unless server says the cached copy was not modified
+        if offline:
+            if read_http_cache_metadata(url_cached_file_path, in_url) is None:
+                raise FileNotFoundError(f"offline mode: {in_url} was not found in cache {cache_folder}")
+            log.debug(f"offline mode: using {url_cached_file_path} for {in_url}")
+        else:
+            download_to_file(in_url, config_vars, url_cached_file_path, translate_url_callback, conditional=True)
+        return url_cached_file_path
 
+    cached_file_path = cache_folder.joinpath(expected_checksum)
     if cached_file_path.is_file():  # file exists? -> make sure it has the right checksum
         if not utils.check_file_checksum(cached_file_path, expected_checksum):
             safe_remove_file(cached_file_path)
 
-    if not cached_file_path.is_file():  # need to download
-        contents_buffer = read_from_file_or_url(in_url, config_vars, translate_url_callback, expected_checksum,
-                                                encoding=None)
-        if contents_buffer:
-            with open(cached_file_path, "wb") as wfd:
-                chown_chmod_on_fd(wfd)
-                wfd.write(contents_buffer)
+    if not cached_file_path.is_file():
+        # file with the same checksum might have been downloaded from the same url without knowing the checksum
+        url_metadata = read_http_cache_metadata(url_cached_file_path, in_url)
+        if url_metadata is not None and utils.compare_checksums(url_metadata.get("checksum", ""), expected_checksum) \
+                and utils.check_file_checksum(url_cached_file_path, expected_checksum):
+            cached_file_path = url_cached_file_path
+        elif offline:
+            raise FileNotFoundError(f"offline mode: {in_url} with checksum {expected_checksum} was not found in cache {cache_folder}")
+        else:  # need to download
+            download_to_file(in_url, config_vars, cached_file_path, translate_url_callback, expected_checksum)
     return cached_file_path
 
 
+def http_cache_metadata_path(file_path) -> Path:
+    """ path of the file keeping the url, http validators (etag, last_modified) and checksum of a downloaded file """
+    file_path = Path(file_path)
+    return file_path.with_name(file_path.name + ".http-cache.json")
+
+
+def read_http_cache_metadata(file_path, url) -> Optional[dict]:
+    """ return the metadata saved when file_path was downloaded from url: {"url":, "validators":, "checksum":}
+        None if file_path does not exist or was downloaded from a different url
+    """
+    retVal = None
+    try:
+        if Path(file_path).is_file():
+            with open(http_cache_metadata_path(file_path), "r") as rfd:
+                saved = json.load(rfd)
+            if saved.get("url") == url:
+                retVal = saved
+    except (OSError, ValueError):
+        pass
+    return retVal
+
+
+def write_http_cache_metadata(file_path, url, validators, checksum) -> None:
+    with open(http_cache_metadata_path(file_path), "w") as wfd:
+        chown_chmod_on_fd(wfd)
+        json.dump({"url": url, "validators": validators or {}, "checksum": checksum}, wfd)
+
+
+def download_to_file(in_url, config_vars, target_path, translate_url_callback=None, expected_checksum=None,
+                     read_size=1024*1024, conditional=False):
+    """ download a file from local disk or url to target_path. Check checksum if given.
+        Contents is read in chunks and checksum is calculated while reading, so the whole file is never held in memory.
+        Contents is written to a temporary file which is renamed to target_path only after checksum was checked.
+        If test against checksum fails - raise IOError. If contents is empty target_path is not created.
+        If conditional is True and target_path was previously downloaded from the same url, a conditional GET is made
+        and target_path is left as is if the server reports it was not modified. The url, validators and checksum
+        of the downloaded file are saved next to target_path for the next conditional GET, see read_http_cache_metadata.
+    """
+    target_path = Path(target_path)
+    validators = None
+    if conditional:
+        validators = (read_http_cache_metadata(target_path, in_url) or {}).get("validators")
+    # several threads might download to the same target_path, e.g. two files with the same checksum in a cache folder
+    downloading_path = target_path.with_name(f"{target_path.name}.{threading.get_ident()}.downloading")
+    sha1ner = hashlib.sha1()
+    num_bytes = 0
+    try:
+        with open_for_read_file_or_url(in_url, config_vars, translate_url_callback, encoding=None, validators=validators) as open_file:
+            if open_file.not_modified:
+                log.debug(f"{in_url} was not modified, using {target_path}")
+                return target_path
+            response_validators = open_file.response_validators
+            with open(downloading_path, "wb") as wfd:
+                chown_chmod_on_fd(wfd)
+                for chunk in iter(lambda: open_file.fd.read(read_size), b""):
+                    wfd.write(chunk)
+                    sha1ner.update(chunk)
+                    num_bytes += len(chunk)
+        if expected_checksum is not None:
+            if num_bytes == 0:
+                raise IOError(
+                    f"Empty contents returned from {in_url} ; expected checksum: {expected_checksum} ; encoding: None")
+            actual_checksum = sha1ner.hexdigest()
+            if not utils.compare_checksums(actual_checksum, expected_checksum):
+                raise IOError(
+                    f"Checksum mismatch {in_url} expected checksum:  {expected_checksum} actual checksum: {actual_checksum} encoding: None")
+        if num_bytes > 0:
+            os.replace(downloading_path, target_path)
+            if conditional:
+                write_http_cache_metadata(target_path, in_url, response_validators, sha1ner.hexdigest())
+    finally:
+        safe_remove_file(downloading_path)
+    return target_path
+
+
+class WzipReader(io.RawIOBase):
+    """ read only binary stream that inflates a zlib compressed (wzip) stream while reading,
+        so neither the compressed nor the decompressed contents is held in memory as a whole.
+        Example, reading lines from a wzip file:
+            with open("info_map.txt.wzip", "rb") as rfd:
+                for line in io.TextIOWrapper(io.BufferedReader(WzipReader(rfd)), encoding='utf-8'):
+                    ...
+    """
+    def __init__(self, compressed_fd, read_size=1024*1024) -> None:
+        super().__init__()
+        self.compressed_fd = compressed_fd
+        self.read_size = read_size
+        self.name = getattr(compressed_fd, "name", "")
+        self.decompressor = zlib.decompressobj()
+        self.pending = b""  # decompressed data not yet read
+        self.pending_offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.pending_offset >= len(self.pending):
+            if self.decompressor.eof:
+                return 0
+            compressed = self.decompressor.unconsumed_tail or self.compressed_fd.read(self.read_size)
+            if not compressed:
+                raise zlib.error(f"{self.name}: compressed data ended before the end of stream")
+            # limit the decompressed size, so a highly compressed chunk does not inflate to a huge buffer
+            self.pending = self.decompressor.decompress(compressed, self.read_size)
+            self.pending_offset = 0
+        num_bytes = min(len(buffer), len(self.pending) - self.pending_offset)
+        buffer[:num_bytes] = self.pending[self.pending_offset:self.pending_offset + num_bytes]
+        self.pending_offset += num_bytes
+        return num_bytes
+
+
+def open_wzip_for_read(compressed_fd, encoding='utf-8', read_size=1024*1024):
+    """ return a stream that decompresses compressed_fd while reading, binary if encoding is None, text otherwise """
+    retVal = io.BufferedReader(WzipReader(compressed_fd, read_size), buffer_size=read_size)
+    if encoding is not None:
+        retVal = io.TextIOWrapper(retVal, encoding=encoding)
+    return retVal
+
+
+def unwzip_fd_to_fd(compressed_fd, decompressed_fd, read_size=1024*1024):
+    """ decompress wzip data from compressed_fd to decompressed_fd, in chunks """
+    shutil.copyfileobj(WzipReader(compressed_fd, read_size), decompressed_fd, read_size)
+
+
 def download_from_file_or_url(in_url, config_vars, in_target_path=None, translate_url_callback=None, cache_folder=None,
                               expected_checksum=None):
     """
@@ -396,10 +655,9 @@ def download_from_file_or_url(in_url, config_vars, in_target_path=None, translat
                 need_decompress = False  # no need to decompress if target is expected to be compressed
 
         if need_decompress:
-            decompressed = zlib.decompress(open(cached_file_path, "rb").read())
-            with open(final_file_path, "wb") as wfd:
+            with open(cached_file_path, "rb") as rfd, open(final_file_path, "wb") as wfd:
                 utils.chown_chmod_on_fd(wfd)
-                wfd.write(decompressed)
+                unwzip_fd_to_fd(rfd, wfd)
         else:
             smart_copy_file(cached_file_path, final_file_path)
     else:
@@ -464,6 +722,67 @@ def safe_remove_file_system_object(path_to_file_system_object, followlinks=False
             raise
 
 
+class PathPatternMatcher(object):
+    """ match paths against a list of glob patterns, with the same semantics as pathlib.PurePath.match,
+        i.e. a relative pattern is matched against the last parts of the path.
+        Instead of calling Path.match for each pattern, patterns are compiled once into a single regex
+        per number of parts in the pattern.
+        Example:
+            ignore_matcher = PathPatternMatcher(["*.wtar", "._*", "Contents/*.plist"])
+            ignore_matcher.match("/a/b/c.wtar")  -> True
+            ignore_matcher.match_name("._c")  -> True, only patterns without path separator are checked
+    """
+    def __init__(self, patterns) -> None:
+        self.patterns = sorted(set(patterns))
+        self.absolute_patterns = list()  # patterns with root or drive are matched against the whole path, using Path.match
+        self.regex_by_num_parts = dict()  # {number of parts in pattern: compiled regex matching that number of last parts}
+        self.name_regex = None
+        regex_flags = re.IGNORECASE if sys.platform == "win32" else 0
+        translated_patterns_by_num_parts = defaultdict(list)
+        for pattern in self.patterns:
+            pure_pattern = PurePath(pattern)
+            if pure_pattern.anchor:
+                self.absolute_patterns.append(pattern)
+            else:
+                # fnmatch.translate returns (?s:...)\Z, \Z is removed so parts can be joined
+                translated_parts = [fnmatch.translate(part)[:-2] for part in pure_pattern.parts]
+                translated_patterns_by_num_parts[len(translated_parts)].append("/".join(translated_parts))
+        for num_parts, translated_patterns in translated_patterns_by_num_parts.items():
+            self.regex_by_num_parts[num_parts] = re.compile("(?:" + "|".join(translated_patterns) + ")\\Z", regex_flags)
+        self.name_regex = self.regex_by_num_parts.get(1)
+
+    def __bool__(self):
+        return len(self.patterns) > 0
+
+    def match_name(self, name: str) -> bool:
+        """ match a file or folder name against the patterns that do not have path separator """
+        return self.name_regex is not None and self.name_regex.match(name) is not None
+
+    def match(self, path) -> bool:
+        retVal = False
+        if self.patterns:
+            if not isinstance(path, PurePath):
+                path = PurePath(path)
+            parts = path.parts
+            for num_parts, regex in self.regex_by_num_parts.items():
+                if num_parts <= len(parts):
+                    if num_parts == 1:
+                        retVal = regex.match(parts[-1]) is not None
+                    else:
+                        retVal = regex.match("/".join(parts[-num_parts:])) is not None
+                    if retVal:
+                        break
+            else:
+                retVal = any(path.match(pattern) for pattern in self.absolute_patterns)
+        return retVal
+
+    def matching_pattern(self, path) -> Optional[str]:
+        """ return the first pattern matching path, or None. Much slower than match, use for reporting """
+        if not isinstance(path, PurePath):
+            path = PurePath(path)
+        return next((pattern for pattern in self.patterns if path.match(pattern)), None)
+
+
 def excluded_walk(root_to_walk, file_exclude_regex=None, dir_exclude_regex=None, followlinks=False):
     """ excluded_walk behaves like os.walk but will exclude files or dirs who's name pass the given regexs
     :param root_to_walk: the root folder to walk, this folder will *not* be tested against dir_exclude_regex
@@ -529,6 +848,124 @@ def smart_copy_file(source_path, destination_path):
             pass
 
 
+def copy_file_portion(src_fd, dst_fd, count, checksum=False, buffer_size=1024*1024):
+    """ copy count bytes from the current position of src_fd to the current position of dst_fd.
+        src_fd, dst_fd should be unbuffered binary files, e.g. open(path, "rb", buffering=0).
+        When checksum is False os.copy_file_range is used where available so data is not copied through user space.
+        When checksum is True, or copy_file_range is not available, data is copied with a fixed size buffer.
+        Return the sha1 checksum of the copied bytes if checksum is True, otherwise None.
+    """
+    if not checksum and hasattr(os, "copy_file_range"):
+        try:
+            remaining = count
+            while remaining > 0:
+                copied = os.copy_file_range(src_fd.fileno(), dst_fd.fileno(), min(remaining, 1024*1024*1024))
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining == 0:
+                return None
+            count = remaining
+        except OSError:  # e.g. file system does not support copy_file_range, continue with buffered copy
+            count = remaining
+
+    sha1ner = hashlib.sha1() if checksum else None
+    buffer = bytearray(buffer_size)
+    buffer_view = memoryview(buffer)
+    remaining = count
+    while remaining > 0:
+        num_read = src_fd.readinto(buffer_view[:min(remaining, buffer_size)])
+        if not num_read:
+            break
+        num_written = 0
+        while num_written < num_read:  # unbuffered write can write less than asked for
+            written = dst_fd.write(buffer_view[num_written:num_read])
+            if not written:
+                raise OSError(f"failed to write to {dst_fd.name}, {num_read - num_written} bytes were not written")
+            num_written += written
+        if sha1ner is not None:
+            sha1ner.update(buffer_view[:num_read])
+        remaining -= num_read
+    if remaining > 0:
+        raise EOFError(f"{src_fd.name} ended {remaining} bytes before expected")
+    return sha1ner.hexdigest() if sha1ner is not None else None
+
+
+FICLONE = 0x40049409  # from linux/fs.h: _IOW(0x94, 9, int)
+_clonefile_func = None  # libSystem's clonefile, loaded on first use
+
+
+def clone_file(src, dst) -> bool:
+    """ create dst as a copy-on-write clone of src, no data is copied until one of the files is changed.
+        Uses FICLONE ioctl on Linux (btrfs, xfs) and clonefile on MacOS (APFS).
+        The clone is created next to dst and replaces dst only if cloning succeeded, so an existing dst
+        is left untouched when cloning is not supported.
+        Return True if dst was cloned, False if cloning is not supported by the OS or file system.
+    """
+    global _clonefile_func
+    retVal = False
+    clone_path = f"{os.fspath(dst)}.{os.getpid()}.{threading.get_ident()}.clone"
+    try:
+        if sys.platform == "linux":
+            import fcntl
+            with open(src, "rb") as src_fd, open(clone_path, "wb") as dst_fd:
+                fcntl.ioctl(dst_fd.fileno(), FICLONE, src_fd.fileno())
+            retVal = True
+        elif sys.platform == "darwin":
+            if _clonefile_func is None:
+                import ctypes
+                libSystem = ctypes.CDLL("/usr/lib/libSystem.dylib", use_errno=True)
+                _clonefile_func = libSystem.clonefile
+                _clonefile_func.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_uint32]
+                _clonefile_func.restype = ctypes.c_int
+            CLONE_NOFOLLOW = 0x0001
+            retVal = _clonefile_func(os.fsencode(src), os.fsencode(clone_path), CLONE_NOFOLLOW) == 0
+        if retVal:
+            os.replace(clone_path, dst)
+    except (OSError, AttributeError):  # e.g. EXDEV, EOPNOTSUPP, ENOTTY or clonefile not found
+        retVal = False
+    finally:
+        if not retVal:
+            try:
+                os.unlink(clone_path)
+            except FileNotFoundError:
+                pass
+    return retVal
+
+
+def clone_or_copy_file(src, dst, try_clone=True) -> str:
+    """ copy the file src to dst using the fastest method available:
+        1. copy-on-write clone, see clone_file
+        2. os.copy_file_range (Linux), data is copied inside the kernel
+        3. shutil.copyfile, which uses fcopyfile/sendfile where available
+        Return the name of the method used: "clone", "copy_file_range", "copyfile" or "same_file" if src and dst are the same file.
+        symlinks are not followed - if src is a symlink, dst will be a symlink.
+    """
+    if not os.path.islink(src):
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            return "same_file"
+        if try_clone and clone_file(src, dst):
+            return "clone"
+        if hasattr(os, "copy_file_range"):
+            try:
+                with open(src, "rb", buffering=0) as src_fd, open(dst, "wb", buffering=0) as dst_fd:
+                    remaining = os.fstat(src_fd.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(src_fd.fileno(), dst_fd.fileno(), min(remaining, 1024*1024*1024))
+                        if copied == 0:
+                            break
+                        remaining -= copied
+                if remaining == 0:
+                    return "copy_file_range"
+            except OSError:  # e.g. file system does not support copy_file_range, continue with copyfile
+                pass
+    try:
+        shutil.copyfile(src, dst, follow_symlinks=False)
+    except shutil.SameFileError:
+        return "same_file"
+    return "copyfile"
+
+
 def find_split_files(first_file: Path):
     try:
         retVal = list()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3.9
+
+""" One HTTP layer for reading control files (index.yaml, info_maps, short index, includes):
+    - requests sessions are kept alive and shared, one per netloc and TLS verification mode
+    - failed requests are retried with exponential backoff and jitter
+    - conditional GET with ETag/Last-Modified validators of a previously downloaded copy
+    - TLS verification is on or off per request, instead of patching the ssl module
+"""
+
+import random
+import threading
+import time
+import urllib.parse
+import logging
+
+log = logging.getLogger()
+
+# requests is imported when first needed, so importing utils does not pay for importing requests
+
+http_retry_statuses = frozenset((408, 429, 500, 502, 503, 504))
+default_http_timeout = (33.05, 180.05)  # (connect, read) in seconds
+default_http_max_retries = 6
+default_http_backoff_base = 0.5  # seconds, delay before the first retry is up to this value
+default_http_backoff_max = 30.0  # seconds, maximal delay between retries
+
+_http_sessions = dict()
+_http_sessions_lock = threading.Lock()
+
+
+def get_http_session(url, verify_ssl=False):
+    """ return a keep-alive requests.Session for url's netloc, creating it on first use.
+        Sessions are shared by all threads, requests.Session connection pool is thread safe for get requests.
+    """
+    import requests
+    netloc = urllib.parse.urlparse(url).netloc
+    session_key = (netloc, bool(verify_ssl))
+    with _http_sessions_lock:
+        session = _http_sessions.get(session_key)
+        if session is None:
+            session = requests.Session()
+            session.verify = bool(verify_ssl)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _http_sessions[session_key] = session
+    if not verify_ssl:
+        import urllib3
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    return session
+
+
+def close_http_sessions():
+    with _http_sessions_lock:
+        for session in _http_sessions.values():
+            session.close()
+        _http_sessions.clear()
+
+
+def http_backoff_delay(attempt, backoff_base=default_http_backoff_base, backoff_max=default_http_backoff_max):
+    """ exponential backoff with full jitter: a random delay between 0 and backoff_base * 2**attempt, capped by backoff_max """
+    return random.uniform(0, min(backoff_max, backoff_base * (2 ** attempt)))
+
+
+def http_get(url, headers=None, verify_ssl=False, validators=None, stream=True, timeout=default_http_timeout,
+             max_retries=default_http_max_retries, backoff_base=default_http_backoff_base, backoff_max=default_http_backoff_max,
+             retry_callback=None):
+    """ GET url using a shared keep-alive session, retrying connection errors and transient statuses.
+        :param headers: dict or list of (name, value) tuples, added to the request
+        :param validators: dict with 'etag' and/or 'last_modified' of a previously downloaded copy,
+            if given a conditional GET is made and the response status can be 304 (not modified)
+        :param retry_callback: if given, called with the url and the status code or exception before each retry
+        :return: requests.Response with status 200 or 304, the caller should close it.
+        raises FileNotFoundError for status 404, requests.HTTPError for other error statuses,
+        requests.RequestException if all retries failed to connect
+    """
+    import requests
+    request_headers = dict(headers or {})
+    if validators:
+        if validators.get("etag"):
+            request_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            request_headers["If-Modified-Since"] = validators["last_modified"]
+    session = get_http_session(url, verify_ssl)
+    attempt = 0
+    while True:
+        try:
+            response = session.get(url, headers=request_headers, stream=stream, timeout=timeout)
+            if response.status_code not in http_retry_statuses or attempt >= max_retries:
+                break
+            response.close()
+            log.debug(f"http_get {url} returned {response.status_code}, retrying")
+            if retry_callback is not None:
+                retry_callback(url, response.status_code)
+        except (requests.ConnectionError, requests.Timeout) as ex:
+            if attempt >= max_retries:
+                raise
+            log.debug(f"http_get {url} failed {ex}, retrying")
+            if retry_callback is not None:
+                retry_callback(url, ex)
+        time.sleep(http_backoff_delay(attempt, backoff_base, backoff_max))
+        attempt += 1
+
+    if response.status_code == 404:
+        response.close()
+        raise FileNotFoundError(f"{url} was not found (404)")
+    if response.status_code != 304:
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+    return response
+
+
+def http_validators_from_response(response):
+    """ return the validators of response that can be used later for a conditional GET """
+    retVal = dict()
+    if response.headers.get("ETag"):
+        retVal["etag"] = response.headers["ETag"]
+    if response.headers.get("Last-Modified"):
+        retVal["last_modified"] = response.headers["Last-Modified"]
+    return retVal
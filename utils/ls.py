@@ -178,6 +178,7 @@ def translate_json_key_names(items_list):
 def unix_folder_ls(the_path, ls_format, root_folder=None):
     listing_lines = list()
     error_lines = list()
+    files_to_checksum = list() if 'C' in ls_format else None
     try:
         for root_path, dirs, files in os.walk(the_path, followlinks=False):
             dirs = sorted(dirs, key=lambda s: s.lower())
@@ -191,7 +192,7 @@ def unix_folder_ls(the_path, ls_format, root_folder=None):
                 files_to_list = sorted(files + [slink for slink in dirs if os.path.islink(os.path.join(root_path, slink))], key=lambda s: s.lower())
                 for file_to_list in files_to_list:
                     full_path = os.path.join(root_path, file_to_list)
-                    listings, errors = unix_item_ls(full_path, ls_format=ls_format, root_folder=root_folder)
+                    listings, errors = unix_item_ls(full_path, ls_format=ls_format, root_folder=root_folder, files_to_checksum=files_to_checksum)
                     if errors:
                         error_lines.append(errors)
                     else:
@@ -200,10 +201,16 @@ def unix_folder_ls(the_path, ls_format, root_folder=None):
     except Exception as ex:
         error_lines.append([the_path, ex.strerror])
 
+    if files_to_checksum:
+        fill_checksums(files_to_checksum, listing_lines, error_lines)
+
     return listing_lines, error_lines
 
 
-def unix_item_ls(the_path, ls_format, root_folder=None):
+def unix_item_ls(the_path, ls_format, root_folder=None, files_to_checksum=None):
+    """ if files_to_checksum is a list, checksum ('C') is not calculated, instead (the_parts, the_path)
+        is appended to files_to_checksum so checksums can be calculated later by fill_checksums
+    """
     import grp
     import pwd
 
@@ -255,7 +262,11 @@ def unix_item_ls(the_path, ls_format, root_folder=None):
                 the_parts[format_char] = time.strftime("%Y/%m/%d-%H:%M:%S", time.gmtime((the_stats[stat.ST_MTIME])))  # modification time
             elif format_char == 'C':
                 if not (stat.S_ISLNK(the_stats.st_mode) or stat.S_ISDIR(the_stats.st_mode)):
-                    the_parts[format_char] = utils.get_file_checksum(the_path)
+                    if files_to_checksum is not None:
+                        the_parts[format_char] = ""
+                        files_to_checksum.append((the_parts, the_path))
+                    else:
+                        the_parts[format_char] = utils.get_file_checksum(the_path)
                 else:
                     the_parts[format_char] = ""
             elif format_char == 'P' or format_char == 'p':
@@ -300,6 +311,7 @@ def unix_item_ls(the_path, ls_format, root_folder=None):
 def win_folder_ls(the_path, ls_format, root_folder=None):
     listing_lines = list()
     error_lines = list()
+    files_to_checksum = list() if 'C' in ls_format else None
     try:
         for root_path, dirs, files in os.walk(the_path, followlinks=False):
             dirs = sorted(dirs, key=lambda s: s.lower())
@@ -313,7 +325,7 @@ def win_folder_ls(the_path, ls_format, root_folder=None):
                 files_to_list = sorted(files + [slink for slink in dirs if os.path.islink(os.path.join(root_path, slink))], key=lambda s: s.lower())
                 for file_to_list in files_to_list:
                     full_path = os.path.join(root_path, file_to_list)
-                    listings, errors = win_item_ls(full_path, ls_format=ls_format, root_folder=root_folder)
+                    listings, errors = win_item_ls(full_path, ls_format=ls_format, root_folder=root_folder, files_to_checksum=files_to_checksum)
                     if errors:
                         error_lines.append(errors)
                     else:
@@ -322,11 +334,17 @@ def win_folder_ls(the_path, ls_format, root_folder=None):
     except Exception as ex:
         error_lines.append([the_path, ex.strerror])
 
+    if files_to_checksum:
+        fill_checksums(files_to_checksum, listing_lines, error_lines)
+
     return listing_lines, error_lines
 
 
 # noinspection PyUnresolvedReferences
-def win_item_ls(the_path, ls_format, root_folder=None):
+def win_item_ls(the_path, ls_format, root_folder=None, files_to_checksum=None):
+    """ if files_to_checksum is a list, checksum ('C') is not calculated, instead (the_parts, the_path)
+        is appended to files_to_checksum so checksums can be calculated later by fill_checksums
+    """
     import win32security
     the_parts = dict()
     the_error = None
@@ -370,7 +388,11 @@ def win_item_ls(the_path, ls_format, root_folder=None):
 
             elif format_char == 'C':
                 if not (stat.S_ISLNK(the_stats.st_mode) or stat.S_ISDIR(the_stats.st_mode)):
-                    the_parts[format_char] = utils.get_file_checksum(the_path)
+                    if files_to_checksum is not None:
+                        the_parts[format_char] = ""
+                        files_to_checksum.append((the_parts, the_path))
+                    else:
+                        the_parts[format_char] = utils.get_file_checksum(the_path)
                 else:
                     the_parts[format_char] = ""
             elif format_char == 'P':
@@ -400,6 +422,20 @@ def win_item_ls(the_path, ls_format, root_folder=None):
     return the_parts, the_error
 
 
+def fill_checksums(files_to_checksum, listing_lines, error_lines):
+    """ calculate, in parallel, the checksums for the items collected by unix_item_ls/win_item_ls.
+        Items whose checksum could not be calculated are moved from listing_lines to error_lines
+    """
+    checksums = utils.get_files_checksums([the_path for the_parts, the_path in files_to_checksum], return_exceptions=True)
+    for (the_parts, the_path), the_checksum in zip(files_to_checksum, checksums):
+        if isinstance(the_checksum, Exception):
+            error_lines.append([os.fspath(the_path), getattr(the_checksum, "strerror", str(the_checksum))])
+            if the_parts in listing_lines:
+                listing_lines.remove(the_parts)
+        else:
+            the_parts['C'] = the_checksum
+
+
 def wtar_ls_func(root_file_or_folder_path, ls_format):
     listing_lines = list()
     error_lines = list()
@@ -19,11 +19,11 @@ from functools import reduce, wraps, lru_cache
 import itertools
 import tarfile
 import types
-import asyncio
 import json
 import appdirs
 import time
 from contextlib import contextmanager
+from concurrent import futures
 
 from typing import Any, Dict, List, Set, Tuple
 
@@ -281,6 +281,9 @@ def ParallelContinuationIter(*iterables):
         yield list(map(next, continue_iterables))
 
 
+checksum_read_chunk_size = 1024 * 1024
+
+
 def get_buffer_checksum(buff):
     sha1ner = hashlib.sha1()
     sha1ner.update(buff)
@@ -303,8 +306,7 @@ def check_file_checksum(file_path, expected_checksum):
     retVal = False  # if file does not exist return False
     if file_path and expected_checksum:  # prevent reading the file if file_path or expected_checksum is None
         try:
-            with open(file_path, "rb") as rfd:
-                retVal = check_buffer_checksum(rfd.read(), expected_checksum)
+            retVal = compare_checksums(get_file_checksum(file_path), expected_checksum)
         except:
             pass
     return retVal
@@ -320,8 +322,69 @@ def get_file_checksum(file_path, follow_symlinks=True):
     if os.path.islink(file_path) and not follow_symlinks:
         retVal = get_buffer_checksum(os.readlink(file_path).encode())
     else:
+        # read in chunks so checksumming a big file does not require holding it all in memory
+        sha1ner = hashlib.sha1()
         with open(file_path, "rb") as rfd:
-            retVal = get_buffer_checksum(rfd.read())
+            for chunk in iter(lambda: rfd.read(checksum_read_chunk_size), b""):
+                sha1ner.update(chunk)
+        retVal = sha1ner.hexdigest()
+    return retVal
+
+
+def get_files_checksums(file_paths, follow_symlinks=True, max_workers=None, return_exceptions=False) -> List:
+    """ return a list of the sha1 checksums of file_paths, in the same order as file_paths.
+        Files are checksummed in parallel by max_workers threads (default: number of cpus),
+        hashlib releases the GIL while hashing so threads do run in parallel.
+        Files are handed to the threads in chunks to save the overhead of scheduling each small file separately.
+        If return_exceptions is True, an exception raised while checksumming a file is returned in place
+        of the file's checksum, otherwise the exception is raised.
+    """
+    def checksum_chunk(chunk_of_paths):
+        chunk_checksums = list()
+        for file_path in chunk_of_paths:
+            try:
+                chunk_checksums.append(get_file_checksum(file_path, follow_symlinks=follow_symlinks))
+            except Exception as ex:
+                if not return_exceptions:
+                    raise
+                chunk_checksums.append(ex)
+        return chunk_checksums
+
+    file_paths = list(file_paths)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1 or len(file_paths) <= 1:
+        return checksum_chunk(file_paths)
+
+    # at least 4 chunks per thread so a few big files do not end up in the same chunk
+    chunk_size = max(1, min(64, len(file_paths) // (max_workers * 4)))
+    chunks = [file_paths[i:i+chunk_size] for i in range(0, len(file_paths), chunk_size)]
+    retVal = list()
+    with futures.ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        for chunk_checksums in executor.map(checksum_chunk, chunks):
+            retVal.extend(chunk_checksums)
+    return retVal
+
+
+def get_file_s3_etag(file_path, multipart_threshold, multipart_chunksize):
+    """ return the ETag s3 would assign to the file if uploaded with the given multipart settings.
+        Files smaller than multipart_threshold are uploaded in one part and their ETag is the md5 of the contents,
+        bigger files are uploaded in parts and their ETag is the md5 of the concatenated md5s of the parts,
+        followed by '-' and the number of parts.
+        The returned ETag is quoted, the same as returned by s3.
+    """
+    if os.path.getsize(file_path) < multipart_threshold:
+        md5er = hashlib.md5()
+        with open(file_path, "rb") as rfd:
+            for chunk in iter(lambda: rfd.read(checksum_read_chunk_size), b""):
+                md5er.update(chunk)
+        retVal = f'"{md5er.hexdigest()}"'
+    else:
+        part_digests = list()
+        with open(file_path, "rb") as rfd:
+            for part in iter(lambda: rfd.read(multipart_chunksize), b""):
+                part_digests.append(hashlib.md5(part).digest())
+        retVal = f'"{hashlib.md5(b"".join(part_digests)).hexdigest()}-{len(part_digests)}"'
     return retVal
 
 
@@ -649,12 +712,15 @@ def get_recursive_checksums(some_path, ignore=None):
         if os.path.isfile(some_path):
             retVal[some_path_leaf] = get_file_checksum(some_path, follow_symlinks=False)
         elif os.path.isdir(some_path):
+            paths_to_checksum = list()
             for item in utils.scandir_walk(some_path, report_dirs=False):
                 item_path_dir, item_path_leaf = os.path.split(item.path)
                 if item_path_leaf not in ignore:
-                    the_checksum = get_file_checksum(item.path, follow_symlinks=False)
-                    normalized_path = PurePath(item.path).as_posix()
-                    retVal[normalized_path] = the_checksum
+                    paths_to_checksum.append(item.path)
+            checksums = get_files_checksums(paths_to_checksum, follow_symlinks=False)
+            for item_path, the_checksum in zip(paths_to_checksum, checksums):
+                normalized_path = PurePath(item_path).as_posix()
+                retVal[normalized_path] = the_checksum
 
         checksum_list = sorted(list(retVal.keys()) + list(retVal.values()))
         string_of_checksums = "".join(checksum_list)
@@ -673,7 +739,8 @@ def obj_memory_size(obj, seen=None):
             return 0
         seen.add(obj_id)
         size = sys.getsizeof(obj)
-        if isinstance(obj, (types.ModuleType, asyncio.Future)):
+        asyncio = sys.modules.get("asyncio")  # if asyncio was not imported there are no asyncio.Future objects
+        if isinstance(obj, types.ModuleType) or (asyncio is not None and isinstance(obj, asyncio.Future)):
             pass  # these types cause endless recursion
         elif isinstance(obj, dict):
             size += sum([obj_memory_size(k, seen) + obj_memory_size(v, seen) for k, v in obj.items()])
@@ -714,6 +781,36 @@ def extra_json_serializer(obj):
             f"object of type {type(obj)} is not serializable. Add code to utils.extra_json_serializer to make it json compatible.")
 
 
+def write_json_list_streamed(items, wfd, indent=1):
+    """ write items to wfd as a json list, one item at a time, so items can be a generator.
+        Written text is the same as json.dump(list(items), wfd, indent=indent, default=extra_json_serializer)
+    """
+    item_indent = " " * indent
+    wfd.write("[")
+    separator = "\n"
+    for item in items:
+        item_text = json.dumps(item, indent=indent, default=extra_json_serializer)
+        wfd.write(separator)
+        wfd.write(item_indent + item_text.replace("\n", "\n" + item_indent))
+        separator = ",\n"
+    wfd.write("\n]" if separator == ",\n" else "]")
+
+
+def write_rows_in_format(rows, output_format, wfd):
+    """ write rows one by one as json list, csv or text (values separated by ", ") """
+    if output_format == "json":
+        write_json_list_streamed(rows, wfd, indent=1)
+    elif output_format == "csv":
+        import csv
+        csv.writer(wfd, lineterminator="\n").writerows(rows)
+    else:  # output_format == "text":  text is the default format
+        separator = ""
+        for row in rows:
+            wfd.write(separator)
+            wfd.write(", ".join(str(value) for value in row))
+            separator = "\n"
+
+
 class JsonExtraTypesDecoder(json.JSONDecoder):
     """ json module does not know to decode deque """
 
@@ -7,8 +7,12 @@ import os
 import time
 import signal
 import logging
-import psutil
+import traceback
+from collections import deque
+from dataclasses import dataclass
 from itertools import repeat
+from pathlib import Path
+from typing import List, Optional
 from concurrent import futures
 from threading import Timer
 
@@ -171,6 +175,7 @@ def killall_and_exit():
 
 
 def kill_proc_tree(pid, including_parent=True):
+    import psutil
     parent = psutil.Process(pid)
     children = parent.children(recursive=True)
     for child in children:
@@ -184,3 +189,76 @@ def kill_proc_tree(pid, including_parent=True):
 def install_signal_handlers():
     for sig in (signal.SIGABRT, signal.SIGFPE, signal.SIGILL, signal.SIGINT, signal.SIGSEGV, signal.SIGTERM):
         signal.signal(sig, signal_handler)
+
+
+@dataclass
+class ForkedTaskResult:
+    index: int
+    description: str
+    output_path: Path
+    start_time: float = 0.0
+    seconds: float = 0.0
+    exit_code: Optional[int] = None
+
+
+def fork_task(task, output_path) -> int:
+    """ run task() in a forked child process, with stdout and stderr of the child written to output_path.
+        The child inherits all the state of the parent (config_vars, parsed index, db), so there is no need to read
+        it again. The child exits with 0 if task() succeeded, 1 if it raised an exception, or the code of SystemExit.
+        :return: pid of the child
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    new_pid = os.fork()
+    if new_pid == 0:
+        exit_code = 1
+        try:
+            with open(output_path, "w", encoding='utf-8') as wfd:
+                os.dup2(wfd.fileno(), sys.stdout.fileno())
+                os.dup2(wfd.fileno(), sys.stderr.fileno())
+                try:
+                    task()
+                    exit_code = 0
+                except SystemExit as sys_exit:
+                    # same as python's exit: None is success, other non int codes are printed and exit with 1
+                    if sys_exit.code is None:
+                        exit_code = 0
+                    elif isinstance(sys_exit.code, int):
+                        exit_code = sys_exit.code
+                    else:
+                        print(sys_exit.code, file=sys.stderr)
+                except BaseException:
+                    traceback.print_exc()
+                finally:
+                    sys.stdout.flush()
+                    sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+    return new_pid
+
+
+def run_forked_in_pool(tasks, max_workers, output_folder, descriptions=None) -> List[ForkedTaskResult]:
+    """ run each of tasks (callables) in a forked child process, no more than max_workers at the same time.
+        Output of each task is captured to a file in output_folder.
+        :return: list of ForkedTaskResult in the order of tasks, with exit code and running time of each task
+    """
+    output_folder = Path(output_folder)
+    output_folder.mkdir(parents=True, exist_ok=True)
+    max_workers = max(1, max_workers)
+    results = list()
+    for index, task in enumerate(tasks):
+        description = descriptions[index] if descriptions else str(index)
+        results.append(ForkedTaskResult(index, description, output_folder.joinpath(f"task-{index:04}.log")))
+    pending = deque(zip(tasks, results))
+    running = dict()  # pid -> ForkedTaskResult
+    while pending or running:
+        while pending and len(running) < max_workers:
+            task, result = pending.popleft()
+            result.start_time = time.monotonic()
+            running[fork_task(task, result.output_path)] = result
+        pid, wait_status = os.wait()
+        result = running.pop(pid, None)
+        if result is not None:  # might be some other child process
+            result.seconds = time.monotonic() - result.start_time
+            result.exit_code = os.waitstatus_to_exitcode(wait_status)
+    return results
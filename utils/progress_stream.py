@@ -0,0 +1,123 @@
+#!/usr/bin/env python3.9
+
+""" ProgressEvents: progress and telemetry as a stream of json lines, one event per line, e.g.:
+        {"event":"progress","time":1700000000.123,"pid":4321,"progress":120,"total":5000,"stage":"copy.Foo","command":"CopyFileToFile"}
+    The stream is opened when INSTL_PROGRESS_EVENTS is set in the environment to:
+        path/to/file        events are appended to the file, several processes can write to the same file
+        unix:path/to/socket events are sent to a listening unix socket
+        tcp:host:port       events are sent to a listening tcp socket
+    Processes launched by instl inherit the environment, so their events go to the same destination.
+    When nobody is listening, callers pay for one attribute check:
+        if utils.progress_events.listening:
+    High frequency events (progress, download) should be rate limited by checking due(event) before
+    preparing the event's fields. Events that were not emitted are counted and reported as "suppressed"
+    in the next event of the same kind.
+"""
+
+import os
+import json
+import threading
+import time
+import logging
+
+log = logging.getLogger()
+
+progress_events_env_var = "INSTL_PROGRESS_EVENTS"
+progress_events_interval_env_var = "INSTL_PROGRESS_EVENTS_INTERVAL_MS"
+default_progress_events_interval_sec = 0.2
+
+
+class ProgressEvents(object):
+    def __init__(self) -> None:
+        self.listening = False
+        self.destination = None
+        self.wfd = None
+        self.sock = None
+        self.min_interval_sec = default_progress_events_interval_sec
+        self.last_emit_times = dict()  # event -> time.monotonic() of last emit
+        self.suppressed = dict()       # event -> number of events not emitted since last emit
+        self.lock = threading.Lock()
+
+    def open_from_environment(self, environ=None):
+        """ open the destination given in INSTL_PROGRESS_EVENTS, if any. Return True if events will be written """
+        if environ is None:
+            environ = os.environ
+        destination = environ.get(progress_events_env_var)
+        if destination and destination != self.destination:
+            interval_ms = environ.get(progress_events_interval_env_var)
+            if interval_ms:
+                try:
+                    self.min_interval_sec = max(0.0, float(interval_ms) / 1000)
+                except ValueError:
+                    log.warning(f"{progress_events_interval_env_var}={interval_ms} is not a number")
+            self.open(destination)
+        return self.listening
+
+    def open(self, destination):
+        self.close()
+        try:
+            if destination.startswith(("unix:", "tcp:")):
+                import socket
+            if destination.startswith("unix:"):
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect(destination[len("unix:"):])
+            elif destination.startswith("tcp:"):
+                host, _, port = destination[len("tcp:"):].rpartition(":")
+                self.sock = socket.create_connection((host, int(port)), timeout=5)
+                self.sock.settimeout(None)
+            if self.sock is not None:
+                self.wfd = self.sock.makefile("w", encoding='utf-8', newline="\n")
+            else:
+                self.wfd = open(destination, "a", encoding='utf-8', newline="\n")
+        except (OSError, ValueError) as ex:
+            log.warning(f"progress events will not be reported, failed to open {destination}, {ex}")
+            self.close()
+            return
+        self.destination = destination
+        self.last_emit_times.clear()
+        self.suppressed.clear()
+        self.listening = True
+
+    def close(self):
+        self.listening = False
+        self.destination = None
+        for closeable in (self.wfd, self.sock):
+            if closeable is not None:
+                try:
+                    closeable.close()
+                except OSError:
+                    pass
+        self.wfd = None
+        self.sock = None
+
+    def due(self, event) -> bool:
+        """ rate limit for high frequency events: return True if event was not emitted in the last min_interval_sec,
+            otherwise count it as suppressed and return False
+        """
+        now = time.monotonic()
+        if now - self.last_emit_times.get(event, -self.min_interval_sec) >= self.min_interval_sec:
+            self.last_emit_times[event] = now
+            return True
+        self.suppressed[event] = self.suppressed.get(event, 0) + 1
+        return False
+
+    def emit(self, event, **fields):
+        """ write one event, fields should be json serializable, other values are written as str """
+        if not self.listening:
+            return
+        fields_to_write = {"event": event, "time": round(time.time(), 3), "pid": os.getpid()}
+        fields_to_write.update(fields)
+        suppressed = self.suppressed.pop(event, 0)
+        if suppressed:
+            fields_to_write["suppressed"] = suppressed
+        line = json.dumps(fields_to_write, separators=(',', ':'), default=str) + "\n"
+        with self.lock:
+            try:
+                self.wfd.write(line)
+                self.wfd.flush()
+            except (OSError, ValueError) as ex:  # listener went away, stop reporting but do not fail the run
+                log.debug(f"progress events stopped, failed writing to {self.destination}, {ex}")
+                self.close()
+
+
+progress_events = ProgressEvents()
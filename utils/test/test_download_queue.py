@@ -0,0 +1,205 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+from utils import *
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    """ serves files from a folder and records the requested paths """
+    requests_log = list()
+
+    def do_GET(self):
+        RecordingHandler.requests_log.append(self.path)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloadQueue(unittest.TestCase):
+    def setUp(self):
+        self.served_folder = tempfile.mkdtemp()
+        self.download_folder = Path(tempfile.mkdtemp())
+        self.file_names = [f"file_{i}.txt" for i in range(8)] + ["Info.xml"]
+        for file_name in self.file_names:
+            Path(self.served_folder, file_name).write_text(file_name * 1000)
+        RecordingHandler.requests_log.clear()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RecordingHandler, directory=self.served_folder))
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        close_http_sessions()
+        shutil.rmtree(self.served_folder, ignore_errors=True)
+        shutil.rmtree(self.download_folder, ignore_errors=True)
+
+    def make_queue(self):
+        queue = DownloadQueue()
+        for i, file_name in enumerate(self.file_names):
+            is_info_xml = file_name == "Info.xml"
+            priority = 0 if i in (5, 6) else 1  # file_5, file_6 were asked for first
+            queue.add(f"{self.base_url}/{file_name}", self.download_folder.joinpath(file_name),
+                      size=len(file_name) * 1000, priority=priority, last=is_info_xml)
+        return queue
+
+    def test_priority_order(self):
+        queue = self.make_queue()
+        statistics = queue.run(max_workers=1)
+        self.assertEqual(statistics["downloaded"], len(self.file_names))
+        expected_order = ["/file_5.txt", "/file_6.txt"] + [f"/file_{i}.txt" for i in (0, 1, 2, 3, 4, 7)] + ["/Info.xml"]
+        self.assertEqual(RecordingHandler.requests_log, expected_order)
+        for file_name in self.file_names:
+            self.assertEqual(self.download_folder.joinpath(file_name).read_text(), file_name * 1000)
+
+    def test_prioritize_and_cancel(self):
+        queue = self.make_queue()
+        queue.prioritize([self.download_folder.joinpath("file_7.txt")], priority=-1)
+        queue.cancel(os.fspath(self.download_folder.joinpath("file_0.txt")))
+        statistics = queue.run(max_workers=1)
+        self.assertEqual(statistics["cancelled"], 1)
+        self.assertFalse(self.download_folder.joinpath("file_0.txt").exists())
+        self.assertEqual(RecordingHandler.requests_log[0], "/file_7.txt")
+
+    def test_cancel_all(self):
+        queue = self.make_queue()
+        queue.cancel()
+        with self.assertRaises(DownloadQueueCancelled):
+            queue.run(max_workers=4)
+        self.assertEqual(RecordingHandler.requests_log, [])
+
+    def test_failed_download(self):
+        queue = self.make_queue()
+        queue.add(f"{self.base_url}/no_such_file.txt", self.download_folder.joinpath("no_such_file.txt"))
+        with self.assertRaises(RuntimeError):
+            queue.run(max_workers=4)
+        self.assertEqual(queue.statistics["failed"], 1)
+        self.assertEqual(queue.statistics["downloaded"], len(self.file_names))
+
+    def test_not_found_keeps_limit(self):
+        queue = DownloadQueue()
+        for i in range(4):
+            queue.add(f"{self.base_url}/no_such_file_{i}.txt", self.download_folder.joinpath(f"no_such_file_{i}.txt"))
+        with self.assertRaises(RuntimeError):
+            queue.run(max_workers=4, initial_workers=4)
+        self.assertEqual([host.limit for host in queue.hosts.values()], [4])
+
+    def test_checksum(self):
+        queue = DownloadQueue()
+        queue.add(f"{self.base_url}/file_0.txt", self.download_folder.joinpath("file_0.txt"), checksum=get_buffer_checksum(b"file_0.txt" * 1000))
+        queue.add(f"{self.base_url}/file_1.txt", self.download_folder.joinpath("file_1.txt"), checksum=get_buffer_checksum(b"not file_1.txt"))
+        with self.assertRaises(RuntimeError):
+            queue.run(max_workers=2)
+        self.assertEqual(queue.statistics["downloaded"], 1)
+        self.assertEqual(list(queue.failed), [os.fspath(self.download_folder.joinpath("file_1.txt"))])
+        self.assertEqual(sorted(path.name for path in self.download_folder.iterdir()), ["file_0.txt"])
+
+    def test_same_path_twice(self):
+        queue = DownloadQueue()
+        for i in range(8):
+            queue.add(f"{self.base_url}/file_0.txt", self.download_folder.joinpath("file_0.txt"))
+        statistics = queue.run(max_workers=8, initial_workers=8)
+        # once one thread finished, the others skip the path as already downloaded
+        self.assertEqual(statistics["downloaded"] + statistics["skipped"], 8)
+        self.assertEqual(sorted(path.name for path in self.download_folder.iterdir()), ["file_0.txt"])
+        self.assertEqual(self.download_folder.joinpath("file_0.txt").read_text(), "file_0.txt" * 1000)
+
+    def test_resume_from_saved_queue(self):
+        queue_file_path = self.download_folder.joinpath("dl.queue")
+        self.make_queue().save(queue_file_path)
+
+        queue = DownloadQueue.load(queue_file_path)
+        self.assertEqual([item.path for item in queue.items()], [item.path for item in self.make_queue().items()])
+        # cancel the download of some files as if the download was aborted
+        for file_name in self.file_names[:4]:
+            queue.cancel(os.fspath(self.download_folder.joinpath(file_name)))
+        queue.run(max_workers=2)
+        self.assertEqual(len(RecordingHandler.requests_log), len(self.file_names) - 4)
+
+        RecordingHandler.requests_log.clear()
+        resumed_queue = DownloadQueue.load(queue_file_path)
+        statistics = resumed_queue.run(max_workers=2)
+        self.assertEqual(statistics["skipped"], len(self.file_names) - 4)
+        self.assertEqual(statistics["downloaded"], 4)
+        self.assertEqual(sorted(RecordingHandler.requests_log), sorted(f"/{file_name}" for file_name in self.file_names[:4]))
+
+    def test_bandwidth_cap(self):
+        total_bytes = sum(len(file_name) * 1000 for file_name in self.file_names)
+        queue = self.make_queue()
+        start_time = time.monotonic()
+        # the bucket starts with one second worth of bytes, the other two thirds should take two more seconds
+        queue.run(max_workers=4, max_bytes_per_second=total_bytes // 3)
+        self.assertGreaterEqual(time.monotonic() - start_time, 1.5)
+
+
+class TestHostConcurrency(unittest.TestCase):
+    def test_not_adaptive(self):
+        host = HostConcurrency(8, initial=2, adaptive=False)
+        self.assertEqual(host.limit, 8)
+        host.report_error()
+        self.assertEqual(host.limit, 8)
+
+    def test_decrease_on_errors(self):
+        host = HostConcurrency(16, initial=8)
+        for i in range(8):
+            host.acquire()
+        # all 8 running downloads see the overload, the limit is halved once
+        for i in range(8):
+            host.report_error()
+        self.assertEqual(host.limit, 4)
+        # the window ends after 2 * limit downloads finished, and the limit can be halved again
+        for i in range(8):
+            host.release(None)
+        host.report_error()
+        self.assertEqual(host.limit, 2)
+        for i in range(4):
+            host.acquire()
+            host.release(None)
+            host.report_error()
+        self.assertEqual(host.limit, 1)
+
+    def test_cancelled_download_is_not_a_sample(self):
+        host = HostConcurrency(16, initial=8)
+        queue = DownloadQueue()
+        queue.add("http://127.0.0.1:1/file.txt", "file.txt")
+        queue.download_item = lambda item, *args: ("cancelled", 1000)
+        queue.worker(False, None, False, 0, 1024, None, lambda url: host)
+        self.assertEqual(queue.statistics["cancelled"], 1)
+        self.assertEqual(host.window_completed, 0)
+        self.assertEqual(host.window_released, 1)
+
+    def test_failed_download_keeps_limit(self):
+        host = HostConcurrency(16, initial=8)
+        for i in range(3):
+            host.acquire()
+            host.release(None)
+        self.assertEqual(host.limit, 8)
+        self.assertEqual(host.active, 0)
+        self.assertEqual(host.window_completed, 0)
+
+    def test_increase_while_throughput_grows(self):
+        host = HostConcurrency(4, initial=1)
+        for num_bytes in (1000, 1000, 10**6, 10**6, 10**6, 10**6, 10**9, 10**9, 10**9, 10**9, 10**9, 10**9):
+            host.acquire()
+            host.release(num_bytes)
+        self.assertEqual(host.limit, 4)
+
+    def test_acquire_blocks_at_limit(self):
+        host = HostConcurrency(2, initial=2)
+        host.acquire()
+        host.acquire()
+        acquired = threading.Event()
+        waiter = threading.Thread(target=lambda: (host.acquire(), acquired.set()))
+        waiter.start()
+        self.assertFalse(acquired.wait(0.2))
+        host.release(100)
+        self.assertTrue(acquired.wait(2))
+        waiter.join()
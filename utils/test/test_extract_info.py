@@ -0,0 +1,70 @@
+import os
+import plistlib
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from utils import *
+
+
+class TestCheckBinariesVersions(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.top_folder = self.test_folder.joinpath("Plug-Ins")
+        for i in range(12):
+            self.make_bundle(self.top_folder.joinpath(f"folder_{i % 4}", f"Plugin{i}.vst3"), f"{i}.0.1")
+            self.top_folder.joinpath(f"folder_{i % 4}", f"readme{i}.txt").write_text("not a binary")
+        self.make_bundle(self.top_folder.joinpath("folder_1", "sub", "Other.component"), "3.2.1")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def make_bundle(self, bundle_path, version):
+        bundle_path.joinpath("Contents").mkdir(parents=True, exist_ok=True)
+        with open(bundle_path.joinpath("Contents", "Info.plist"), "wb") as wfd:
+            plistlib.dump({"CFBundleGetInfoString": f"{version} some plugin"}, wfd)
+
+    def test_parallel_same_as_serial(self):
+        serial_infos = check_binaries_versions_in_folder("Mac", self.top_folder)
+        self.assertEqual(len(serial_infos), 13)
+        self.assertEqual(check_binaries_versions_in_folder("Mac", self.top_folder, max_workers=4), serial_infos)
+
+    def test_filter(self):
+        ignore_filter = check_binaries_versions_filter_with_ignore_regexes(ignore_folder_regexes=["folder_1$"])
+        infos = check_binaries_versions_in_folder("Mac", self.top_folder, ignore_filter, max_workers=4)
+        self.assertEqual(len(infos), 9)
+        self.assertFalse(any("folder_1" in os.fspath(info[0]) for info in infos))
+
+    def test_cache(self):
+        cache_path = self.test_folder.joinpath("cache.json")
+        cache = BinaryInfoCache(cache_path)
+        infos = check_binaries_versions_in_folder("Mac", self.top_folder, max_workers=4, cache=cache)
+        cache.save()
+        self.assertEqual(cache.num_hits, 0)
+
+        cache = BinaryInfoCache(cache_path)
+        self.assertEqual(check_binaries_versions_in_folder("Mac", self.top_folder, max_workers=4, cache=cache), infos)
+        self.assertEqual(cache.num_misses, 0)
+
+        # a replaced plugin is parsed again
+        replaced_bundle = self.top_folder.joinpath("folder_2", "Plugin6.vst3")
+        shutil.rmtree(replaced_bundle)
+        self.make_bundle(replaced_bundle, "7.7.7")
+        os.utime(replaced_bundle.joinpath("Contents"), ns=(1, 1))
+        cache = BinaryInfoCache(cache_path)
+        new_infos = check_binaries_versions_in_folder("Mac", self.top_folder, max_workers=4, cache=cache)
+        self.assertEqual(cache.num_misses, 1)
+        self.assertIn((replaced_bundle, "7.7.7", None), new_infos)
+        cache.save()
+
+        # Info.plist replaced inside a bundle, times of the bundle and it's Contents folder did not change
+        changed_bundle = self.top_folder.joinpath("folder_3", "Plugin7.vst3")
+        folders_stat = [os.stat(folder) for folder in (changed_bundle, changed_bundle.joinpath("Contents"))]
+        self.make_bundle(changed_bundle, "8.8.8")
+        os.utime(changed_bundle.joinpath("Contents", "Info.plist"), ns=(2, 2))
+        for folder, folder_stat in zip((changed_bundle, changed_bundle.joinpath("Contents")), folders_stat):
+            os.utime(folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+        cache = BinaryInfoCache(cache_path)
+        new_infos = check_binaries_versions_in_folder("Mac", self.top_folder, max_workers=4, cache=cache)
+        self.assertEqual(cache.num_misses, 1)
+        self.assertIn((changed_bundle, "8.8.8", None), new_infos)
@@ -0,0 +1,139 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zlib
+from pathlib import Path, PurePath
+from utils import *
+
+
+class TestPathPatternMatcher(unittest.TestCase):
+    def setUp(self):
+        self.patterns = ["*.wtar.??", "*.wtar", "._*", "*Info.xml", "desktop.ini", "Contents/*.plist", "[ab]*.txt", "/x/*/c"]
+        self.paths = ["/a/b.wtar", "/a/b.wtar.aa", "/a/b.wtar.aaa", "/a/._b", "/a/Info.xml", "/a/WavesInfo.xml",
+                      "/a/desktop.ini", "/a/Contents/Info.plist", "/a/Info.plist", "/Contents/b/Info.plist",
+                      "/a/b.txt", "/a/c.txt", "/x/y/c", "/z/x/y/c", "desktop.ini", "Contents/Info.plist"]
+
+    def tearDown(self):
+        pass
+
+    def test_match_same_as_path_match(self):
+        matcher = PathPatternMatcher(self.patterns)
+        for a_path in self.paths:
+            expected = any(PurePath(a_path).match(pattern) for pattern in self.patterns)
+            self.assertEqual(expected, matcher.match(a_path), f"PathPatternMatcher.match({a_path}) should return {expected}")
+            self.assertEqual(expected, matcher.match(PurePath(a_path)), f"PathPatternMatcher.match(PurePath({a_path})) should return {expected}")
+
+    def test_match_name(self):
+        matcher = PathPatternMatcher(self.patterns)
+        self.assertTrue(matcher.match_name("b.wtar"))
+        self.assertTrue(matcher.match_name("._b"))
+        self.assertFalse(matcher.match_name("Info.plist"))  # only matched by Contents/*.plist
+        self.assertFalse(matcher.match_name("c"))  # only matched by /x/*/c
+
+    def test_matching_pattern(self):
+        matcher = PathPatternMatcher(self.patterns)
+        self.assertEqual(matcher.matching_pattern("/a/Contents/Info.plist"), "Contents/*.plist")
+        self.assertIsNone(matcher.matching_pattern("/a/Info.plist"))
+
+    def test_no_patterns(self):
+        matcher = PathPatternMatcher([])
+        self.assertFalse(matcher)
+        self.assertFalse(matcher.match("/a/b.wtar"))
+        self.assertFalse(matcher.match_name("b.wtar"))
+
+
+class TestWzip(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp()
+        self.text = "".join(f"Mac/folder_{i // 100}/file_{i}.txt, f, {i}, {i:040x}, {i * 7}\n" for i in range(20000))
+        self.wzip_path = os.path.join(self.test_folder, "info_map.txt.wzip")
+        with open(self.wzip_path, "wb") as wfd:
+            wfd.write(zlib.compress(self.text.encode(), 8))
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_unwzip_fd_to_fd(self):
+        # small read_size so decompression is done in many steps
+        with open(self.wzip_path, "rb") as rfd:
+            decompressed = io.BytesIO()
+            unwzip_fd_to_fd(rfd, decompressed, read_size=1000)
+        self.assertEqual(decompressed.getvalue().decode(), self.text)
+
+    def test_open_wzip_for_read(self):
+        with open(self.wzip_path, "rb") as rfd:
+            lines = list(open_wzip_for_read(rfd, read_size=4096))
+        self.assertEqual(lines, self.text.splitlines(keepends=True))
+
+    def test_truncated_wzip(self):
+        with open(self.wzip_path, "rb") as rfd:
+            truncated = io.BytesIO(rfd.read()[:-100])
+        with self.assertRaises(zlib.error):
+            unwzip_fd_to_fd(truncated, io.BytesIO())
+
+    def test_download_to_file(self):
+        target_path = Path(self.test_folder, "downloaded.wzip")
+        expected_checksum = get_file_checksum(self.wzip_path)
+        download_to_file(self.wzip_path, None, target_path, expected_checksum=expected_checksum)
+        self.assertEqual(get_file_checksum(target_path), expected_checksum)
+
+        target_path.unlink()
+        with self.assertRaises(IOError):
+            download_to_file(self.wzip_path, None, target_path, expected_checksum="0" * 40)
+        self.assertFalse(target_path.exists())
+        self.assertEqual(os.listdir(self.test_folder), ["info_map.txt.wzip"])
+
+
+class ShortWriter(io.RawIOBase):
+    """ raw binary file that writes at most max_write bytes in each call to write """
+    def __init__(self, max_write):
+        self.max_write = max_write
+        self.written = bytearray()
+        self.name = "short-writer"
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        num_bytes = min(len(b), self.max_write)
+        self.written.extend(bytes(b[:num_bytes]))
+        return num_bytes
+
+
+class TestCopyFilePortion(unittest.TestCase):
+    def setUp(self):
+        self.data = bytes(range(256)) * 100
+
+    def test_short_writes(self):
+        src_fd = io.BytesIO(self.data)
+        src_fd.seek(10)
+        dst_fd = ShortWriter(max_write=7)
+        checksum = copy_file_portion(src_fd, dst_fd, 20000, checksum=True, buffer_size=1024)
+        self.assertEqual(bytes(dst_fd.written), self.data[10:20010])
+        self.assertEqual(checksum, hashlib.sha1(self.data[10:20010]).hexdigest())
+
+    def test_write_fails(self):
+        dst_fd = ShortWriter(max_write=0)
+        with self.assertRaises(OSError):
+            copy_file_portion(io.BytesIO(self.data), dst_fd, 100, checksum=True)
+
+
+class TestCloneFile(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.src = self.test_folder.joinpath("src.txt")
+        self.src.write_text("new contents")
+        self.dst = self.test_folder.joinpath("dst.txt")
+        self.dst.write_text("old contents")
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_existing_dst(self):
+        """ dst is replaced by the clone, or left as is if the file system cannot clone """
+        cloned = clone_file(self.src, self.dst)
+        self.assertEqual(self.dst.read_text(), "new contents" if cloned else "old contents")
+        self.assertEqual(sorted(path.name for path in self.test_folder.iterdir()), ["dst.txt", "src.txt"])
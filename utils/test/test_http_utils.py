@@ -0,0 +1,116 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from functools import partial
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+from utils import *
+
+
+class RecordingHandler(SimpleHTTPRequestHandler):
+    """ serves files from a folder, records the requests and fails the first requests to paths in fail_first """
+    requests_log = list()
+    fail_first = dict()  # {path: number of times to fail with 503}
+
+    def do_GET(self):
+        RecordingHandler.requests_log.append((self.path, self.headers.get("If-Modified-Since")))
+        if RecordingHandler.fail_first.get(self.path, 0) > 0:
+            RecordingHandler.fail_first[self.path] -= 1
+            self.send_error(503)
+            return
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpUtils(unittest.TestCase):
+    def setUp(self):
+        self.served_folder = tempfile.mkdtemp()
+        self.cache_folder = Path(tempfile.mkdtemp())
+        Path(self.served_folder, "index.yaml").write_text("--- !index\n" * 100)
+        RecordingHandler.requests_log.clear()
+        RecordingHandler.fail_first.clear()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RecordingHandler, directory=self.served_folder))
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        close_http_sessions()
+        shutil.rmtree(self.served_folder, ignore_errors=True)
+        shutil.rmtree(self.cache_folder, ignore_errors=True)
+
+    def test_session_is_shared(self):
+        self.assertIs(get_http_session(self.base_url + "/a"), get_http_session(self.base_url + "/b"))
+        self.assertIsNot(get_http_session(self.base_url + "/a", verify_ssl=False), get_http_session(self.base_url + "/a", verify_ssl=True))
+
+    def test_retry_with_backoff(self):
+        RecordingHandler.fail_first["/index.yaml"] = 2
+        with http_get(self.base_url + "/index.yaml", stream=False, backoff_base=0.01) as response:
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(RecordingHandler.requests_log), 3)
+
+    def test_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            http_get(self.base_url + "/no_such_file.yaml", backoff_base=0.01)
+        with self.assertRaises(FileNotFoundError):
+            read_from_file_or_url(self.base_url + "/no_such_file.yaml", None, encoding=None)
+
+    def test_conditional_download(self):
+        url = self.base_url + "/index.yaml"
+        cached_path = download_and_cache_file_or_url(url, None, self.cache_folder)
+        self.assertEqual(cached_path.read_text(), Path(self.served_folder, "index.yaml").read_text())
+        # second download should send If-Modified-Since and keep the cached copy
+        download_and_cache_file_or_url(url, None, self.cache_folder)
+        self.assertIsNone(RecordingHandler.requests_log[0][1])
+        self.assertIsNotNone(RecordingHandler.requests_log[1][1])
+        self.assertEqual(cached_path.read_text(), Path(self.served_folder, "index.yaml").read_text())
+
+        # when the file changes it should be downloaded again
+        served_path = Path(self.served_folder, "index.yaml")
+        served_path.write_text("--- !define\n")
+        os.utime(served_path, (served_path.stat().st_atime, served_path.stat().st_mtime + 10))
+        download_and_cache_file_or_url(url, None, self.cache_folder)
+        self.assertEqual(cached_path.read_text(), "--- !define\n")
+
+    def test_cache_metadata(self):
+        url = self.base_url + "/index.yaml"
+        cached_path = download_and_cache_file_or_url(url, None, self.cache_folder)
+        metadata = read_http_cache_metadata(cached_path, url)
+        self.assertEqual(metadata["checksum"], get_file_checksum(cached_path))
+        self.assertIn("last_modified", metadata["validators"])
+        self.assertIsNone(read_http_cache_metadata(cached_path, self.base_url + "/other/index.yaml"))
+
+        # the copy downloaded without checksum is used when the checksum becomes known
+        checksum_cached_path = download_and_cache_file_or_url(url, None, self.cache_folder, expected_checksum=metadata["checksum"])
+        self.assertEqual(checksum_cached_path, cached_path)
+        self.assertEqual(len(RecordingHandler.requests_log), 1)
+
+    def test_read_file_or_url_utf8_with_cache(self):
+        url = self.base_url + "/index.yaml"
+        for i in range(3):
+            buffer, actual_path = read_file_or_url_utf8(url, None, cache_folder=self.cache_folder)
+            self.assertEqual(buffer, Path(self.served_folder, "index.yaml").read_text())
+            self.assertEqual(actual_path, url)
+        self.assertIsNone(RecordingHandler.requests_log[0][1])
+        self.assertTrue(all(if_modified_since is not None for _, if_modified_since in RecordingHandler.requests_log[1:]))
+
+    def test_offline_mode(self):
+        from configVar import private_config_vars
+        url = self.base_url + "/index.yaml"
+        with private_config_vars() as offline_config_vars:
+            offline_config_vars["HTTP_OFFLINE_MODE"] = "yes"
+            with self.assertRaises(FileNotFoundError):
+                download_and_cache_file_or_url(url, offline_config_vars, self.cache_folder)
+            with self.assertRaises(FileNotFoundError):
+                download_and_cache_file_or_url(url, offline_config_vars, self.cache_folder, expected_checksum="0" * 40)
+            self.assertEqual(len(RecordingHandler.requests_log), 0)
+
+            cached_path = download_and_cache_file_or_url(url, None, self.cache_folder)
+            self.assertEqual(download_and_cache_file_or_url(url, offline_config_vars, self.cache_folder), cached_path)
+            self.assertEqual(len(RecordingHandler.requests_log), 1)
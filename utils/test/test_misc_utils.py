@@ -0,0 +1,52 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import PurePath
+from utils import *
+
+
+class TestChecksums(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = tempfile.mkdtemp()
+        self.file_paths = list()
+        for i in range(100):
+            sub_folder = os.path.join(self.test_folder, f"folder_{i % 7}")
+            os.makedirs(sub_folder, exist_ok=True)
+            file_path = os.path.join(sub_folder, f"file_{i}")
+            with open(file_path, "wb") as wfd:
+                wfd.write(os.urandom(i * 131))
+            self.file_paths.append(file_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_get_files_checksums_keeps_order(self):
+        serial_checksums = [get_file_checksum(file_path) for file_path in self.file_paths]
+        self.assertEqual(serial_checksums, get_files_checksums(self.file_paths, max_workers=1))
+        self.assertEqual(serial_checksums, get_files_checksums(self.file_paths, max_workers=8))
+
+    def test_get_files_checksums_exceptions(self):
+        file_paths = self.file_paths[:3] + [os.path.join(self.test_folder, "no_such_file")]
+        with self.assertRaises(FileNotFoundError):
+            get_files_checksums(file_paths, max_workers=4)
+        checksums = get_files_checksums(file_paths, max_workers=4, return_exceptions=True)
+        self.assertEqual(checksums[:3], [get_file_checksum(file_path) for file_path in file_paths[:3]])
+        self.assertIsInstance(checksums[3], FileNotFoundError)
+
+    def test_get_recursive_checksums(self):
+        checksums = get_recursive_checksums(self.test_folder)
+        self.assertEqual(len(checksums), len(self.file_paths) + 1)  # +1 for total_checksum
+        for file_path in self.file_paths:
+            self.assertEqual(checksums[PurePath(file_path).as_posix()], get_file_checksum(file_path))
+        self.assertEqual(checksums["total_checksum"], get_recursive_checksums(self.test_folder)["total_checksum"])
+
+
+class TestJsonStreamed(unittest.TestCase):
+    def test_same_as_json_dump(self):
+        for items in ([], [("IID", "guid", 7)], [("IID", "guid"), ("A", None), ("B", PurePath("a/b"))], [[], {"a": [1, 2]}]):
+            wfd = io.StringIO()
+            write_json_list_streamed((item for item in items), wfd)
+            self.assertEqual(wfd.getvalue(), json.dumps(items, indent=1, default=extra_json_serializer))
@@ -0,0 +1,58 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from utils import *
+
+
+def print_and_return(text):
+    print(text)
+
+
+def print_and_fail(text):
+    print(text)
+    raise ValueError(f"{text} failed")
+
+
+def record_concurrency(folder, index):
+    """ leave a marker while running, and record how many markers exist """
+    marker = Path(folder, f"running-{index}")
+    marker.touch()
+    time.sleep(0.2)
+    print(len(list(Path(folder).glob("running-*"))))
+    marker.unlink()
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "requires os.fork")
+class TestRunForkedInPool(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def test_output_and_exit_codes(self):
+        tasks = [lambda: print_and_return("one"), lambda: print_and_fail("two"), lambda: sys.exit(3)]
+        results = run_forked_in_pool(tasks, 2, self.test_folder.joinpath("output"), descriptions=["one", "two", "three"])
+        self.assertEqual([result.exit_code for result in results], [0, 1, 3])
+        self.assertEqual([result.description for result in results], ["one", "two", "three"])
+        self.assertEqual(results[0].output_path.read_text(), "one\n")
+        self.assertIn("ValueError: two failed", results[1].output_path.read_text())
+
+    def test_system_exit_codes(self):
+        tasks = [lambda: sys.exit(), lambda: sys.exit(None), lambda: sys.exit("exit message"), lambda: sys.exit(0)]
+        results = run_forked_in_pool(tasks, 2, self.test_folder.joinpath("output"))
+        self.assertEqual([result.exit_code for result in results], [0, 0, 1, 0])
+        self.assertEqual(results[2].output_path.read_text(), "exit message\n")
+
+    def test_max_workers(self):
+        running_folder = self.test_folder.joinpath("running")
+        running_folder.mkdir()
+        tasks = [lambda i=i: record_concurrency(running_folder, i) for i in range(6)]
+        results = run_forked_in_pool(tasks, 2, self.test_folder.joinpath("output"))
+        self.assertTrue(all(result.exit_code == 0 for result in results))
+        max_concurrency = max(int(result.output_path.read_text()) for result in results)
+        self.assertLessEqual(max_concurrency, 2)
@@ -0,0 +1,84 @@
+import os
+import json
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from utils import *
+
+instl_launcher_path = os.path.realpath(os.path.join(__file__, os.pardir, os.pardir, os.pardir, "instl"))
+
+
+class TestProgressEvents(unittest.TestCase):
+    def setUp(self):
+        self.test_folder = Path(tempfile.mkdtemp())
+        self.events_file = self.test_folder.joinpath("events.jsonl")
+        self.events = ProgressEvents()
+
+    def tearDown(self):
+        self.events.close()
+        shutil.rmtree(self.test_folder, ignore_errors=True)
+
+    def read_events(self):
+        with open(self.events_file, "r", encoding='utf-8') as rfd:
+            return [json.loads(line) for line in rfd]
+
+    def test_not_listening(self):
+        self.assertFalse(self.events.open_from_environment({}))
+        self.events.emit("progress", progress=1)
+        self.assertFalse(self.events_file.exists())
+
+    def test_file(self):
+        self.assertTrue(self.events.open_from_environment({"INSTL_PROGRESS_EVENTS": os.fspath(self.events_file)}))
+        self.events.emit("stage_start", stage="copy")
+        self.events.emit("error", path=Path("a/b"), exception_str="failed")
+        self.events.close()
+        events = self.read_events()
+        self.assertEqual([event["event"] for event in events], ["stage_start", "error"])
+        self.assertEqual(events[0]["stage"], "copy")
+        self.assertEqual(events[1]["path"], os.fspath(Path("a/b")))
+        self.assertEqual(events[0]["pid"], os.getpid())
+
+    def test_rate_limit(self):
+        self.events.open_from_environment({"INSTL_PROGRESS_EVENTS": os.fspath(self.events_file), "INSTL_PROGRESS_EVENTS_INTERVAL_MS": "60000"})
+        for progress in range(1, 101):
+            if self.events.due("progress"):
+                self.events.emit("progress", progress=progress)
+        self.events.min_interval_sec = 0
+        self.assertTrue(self.events.due("progress"))
+        self.events.emit("progress", progress=101)
+        self.events.close()
+        events = self.read_events()
+        self.assertEqual([event["progress"] for event in events], [1, 101])
+        self.assertEqual(events[1]["suppressed"], 99)
+
+    def test_bad_destination(self):
+        with self.assertLogs(level='WARNING'):
+            self.assertFalse(self.events.open_from_environment({"INSTL_PROGRESS_EVENTS": os.fspath(self.test_folder.joinpath("no", "such", "folder", "events.jsonl"))}))
+        self.events.emit("progress", progress=1)
+
+    @unittest.skipIf(not hasattr(socket, "AF_UNIX"), "needs unix sockets")
+    def test_unix_socket(self):
+        socket_path = self.test_folder.joinpath("events.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+            listener.bind(os.fspath(socket_path))
+            listener.listen(1)
+            self.assertTrue(self.events.open_from_environment({"INSTL_PROGRESS_EVENTS": f"unix:{socket_path}"}))
+            conn, _ = listener.accept()
+            with conn, conn.makefile("r", encoding='utf-8') as rfd:
+                self.events.emit("download", files=3, total_files=10)
+                self.assertEqual(json.loads(rfd.readline())["files"], 3)
+            # listener went away, events stop without failing
+            for i in range(10):
+                self.events.emit("download", files=4, total_files=10)
+            self.assertFalse(self.events.listening)
+
+    def test_instl_run(self):
+        environ = dict(os.environ, INSTL_PROGRESS_EVENTS=os.fspath(self.events_file))
+        subprocess.run([sys.executable, instl_launcher_path, "version", "--no-system-log"], env=environ, stdout=subprocess.DEVNULL, check=True)
+        events = self.read_events()
+        self.assertEqual([event["event"] for event in events if event["event"].startswith("run_")], ["run_start", "run_end"])
+        self.assertEqual(events[0]["argv"][0], "version")